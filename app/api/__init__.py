@@ -0,0 +1,11 @@
+from starlette.applications import Starlette
+from starlette.routing import Route
+from .exports import export_fields
+from .tiles import vector_tile
+
+api = Starlette(
+    routes=[
+        Route("/api/tiles/{z:int}/{x:int}/{y:int}.mvt", vector_tile, methods=["GET"]),
+        Route("/api/export/fields.{extension}", export_fields, methods=["GET"]),
+    ]
+)
\ No newline at end of file
@@ -0,0 +1,84 @@
+import zlib
+from typing import AsyncIterator
+from starlette.requests import Request
+from starlette.responses import Response, StreamingResponse
+from app.exporters import EXPORTERS, export_layers
+from app.geo import Box
+from app.store import field_repo, field_table, ticket_store, visibility_index
+
+# Layers that may be added to an export with ``?include=``.
+OPTIONAL_LAYERS = ("timeline", "pois")
+# Field attributes an export may be narrowed to, as ``?crop=Cocoa``.
+FILTERS = ("farmer_id", "crop")
+# The purpose of the tickets the export route redeems.
+EXPORT_TICKET = "export"
+
+
+def _permitted_fields(coop_ids: list[str] | None) -> list:
+    """Get the fields of some cooperatives, or of all for None."""
+    if coop_ids is None:
+        return field_repo.all()
+    return visibility_index.fields_for(coop_ids)
+
+
+def _bbox(value: str | None) -> Box | None:
+    """Parse a "west,south,east,north" box, raising ValueError if malformed."""
+    if not value:
+        return None
+    west, south, east, north = (float(v) for v in value.split(","))
+    return west, south, east, north
+
+
+async def _gzip(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    async for chunk in chunks:
+        # Sync-flush each chunk so the client gets it without waiting.
+        yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
+
+
+def _accepts_gzip(request: Request) -> bool:
+    encodings = request.headers.get("accept-encoding", "").split(",")
+    return any(e.split(";")[0].strip() == "gzip" for e in encodings)
+
+
+async def export_fields(request: Request) -> Response:
+    """Serve /api/export/fields.<extension> for the export ticket in
+    ``?ticket=``.
+
+    The ticket is single-use and names the cooperatives whose fields the
+    user who asked for it may see. The extension picks the exporter;
+    ``?include=timeline,pois`` adds those layers.
+    ``?bbox=west,south,east,north`` and the attributes in FILTERS narrow
+    the fields, through the database's indexes. Exporters write chunk by chunk as the response is
+    read, so the download starts at once, and text formats are
+    gzip-encoded for clients that accept it.
+    """
+    exporter = EXPORTERS.get(request.path_params["extension"])
+    if exporter is None or not exporter.available():
+        return Response(status_code=404)
+    grant = ticket_store.redeem(request.query_params.get("ticket"), EXPORT_TICKET)
+    if grant is None:
+        return Response(status_code=401)
+    include = request.query_params.get("include", "").split(",")
+    try:
+        box = _bbox(request.query_params.get("bbox"))
+    except ValueError:
+        return Response("bbox must be west,south,east,north.", status_code=400)
+    values = {k: v for k in FILTERS if (v := request.query_params.get(k))}
+    fields = _permitted_fields(grant["cooperative_ids"])
+    if box is not None or values:
+        matching = set(field_table.query(box, **values))
+        fields = [f for f in fields if f["id"] in matching]
+    layers = export_layers(fields, [i for i in include if i in OPTIONAL_LAYERS])
+    filename = f"agritrace_fields.{exporter.extension}"
+    headers = {
+        "Content-Disposition": f'attachment; filename="{filename}"',
+        "Cache-Control": "no-store",
+        "Vary": "Accept-Encoding",
+    }
+    body = exporter.write(layers)
+    if exporter.compressible and _accepts_gzip(request):
+        headers["Content-Encoding"] = "gzip"
+        body = _gzip(body)
+    return StreamingResponse(body, media_type=exporter.media_type, headers=headers)
\ No newline at end of file
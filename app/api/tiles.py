@@ -0,0 +1,35 @@
+from starlette.requests import Request
+from starlette.responses import Response
+from app.store import current_version, ticket_store
+from app.store.tiles import MAX_TILE_ZOOM, field_tile
+
+MVT_MEDIA_TYPE = "application/vnd.mapbox-vector-tile"
+# The purpose of the tickets the tile route checks.
+TILE_TICKET = "tiles"
+# Seconds a tile ticket lasts. A map fetches many tiles with one, so it is
+# checked on every request rather than used up.
+TILE_TICKET_LIFETIME = 3600.0
+
+
+async def vector_tile(request: Request) -> Response:
+    """Serve /api/tiles/{z}/{x}/{y}.mvt for the tile ticket in ``?ticket=``.
+
+    The ticket names the cooperatives whose fields the user who asked for
+    it may see, exactly as for the map's permissioned fields, and serves
+    any number of tiles until it expires. Tiles carry an ETag of the data
+    version and role, so clients can revalidate them cheaply.
+    """
+    z, x, y = (request.path_params[k] for k in ("z", "x", "y"))
+    if z > MAX_TILE_ZOOM or not (0 <= x < 2**z and 0 <= y < 2**z):
+        return Response(status_code=404)
+    grant = ticket_store.check(request.query_params.get("ticket"), TILE_TICKET)
+    if grant is None:
+        return Response(status_code=401)
+    coop_ids = grant["cooperative_ids"]
+    role_key = "*" if coop_ids is None else ",".join(sorted(set(coop_ids)))
+    etag = f'"{current_version()}:{role_key}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    tile = await field_tile(z, x, y, coop_ids)
+    return Response(tile, media_type=MVT_MEDIA_TYPE, headers=headers)
\ No newline at end of file
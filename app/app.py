@@ -1,14 +1,18 @@
 import reflex as rx
 import reflex_enterprise as rxe
+from app.api import api
+from app.components.field_sync import field_sync
 from app.components.map_view import map_view
 from app.components.sidebar import sidebar
 from app.pages.producer_page import producer_page
 from app.pages.admin_page import admin_page
+from app.states.map_state import MapState
 
 
 def index() -> rx.Component:
     """The main dashboard page."""
     return rx.el.div(
+        field_sync(),
         sidebar(),
         rx.el.main(map_view(), class_name="flex-1 h-screen p-4 bg-gray-50"),
         class_name="flex h-screen w-screen font-['Inter'] bg-gray-50",
@@ -31,7 +35,8 @@ app = rxe.App(
             cross_origin="",
         ),
     ],
+    api_transformer=api,
 )
-app.add_page(index)
+app.add_page(index, on_load=[MapState.sync_data, MapState.issue_tile_url])
 app.add_page(producer_page, route="/producers/[producer_id]")
 app.add_page(admin_page, route="/admin")
\ No newline at end of file
@@ -0,0 +1,51 @@
+from typing import Any
+import reflex as rx
+from reflex.experimental.client_state import ClientStateVar
+from app.states.map_state import POLYLINE_DECIMALS, Field, MapState
+from app.store import Patch
+
+
+class KeyedSync(rx.Component):
+    """Keeps a client-side copy of a record list in step with its patches.
+
+    Renders nothing. The records are handed to ``set_records``, and a patch
+    that doesn't follow the copy's version fires ``on_resync``. Record keys
+    named in ``polylines`` hold encoded polylines, or lists of them, which
+    are decoded to LatLng lists at the given decimal places.
+    """
+
+    library = "$/public" + rx.asset("keyed_sync.js")
+    tag = "KeyedSync"
+    patch: rx.Var[Patch]
+    set_records: rx.Var[Any]
+    polylines: rx.Var[dict[str, int]]
+    on_resync: rx.EventHandler[rx.event.no_args_event_spec]
+
+
+# The browser's copies of the field lists, rendered like any list var.
+listed_fields_copy = ClientStateVar.create("listed_fields", default=[])
+map_fields_copy = ClientStateVar.create("map_fields", default=[])
+listed_fields: rx.Var[list[Field]] = listed_fields_copy.value.to(list[Field])
+map_fields: rx.Var[list[Field]] = map_fields_copy.value.to(list[Field])
+
+
+def field_sync() -> rx.Component:
+    """Apply the field list patches MapState sends to the browser's copies."""
+    polylines = {}
+    if POLYLINE_DECIMALS is not None:
+        polylines = {"polygon": POLYLINE_DECIMALS, "holes": POLYLINE_DECIMALS}
+    return rx.fragment(
+        listed_fields_copy,
+        map_fields_copy,
+        KeyedSync.create(
+            patch=MapState.field_list_patch,
+            set_records=listed_fields_copy.set,
+            on_resync=MapState.resync_fields("field_list"),
+        ),
+        KeyedSync.create(
+            patch=MapState.map_field_patch,
+            set_records=map_fields_copy.set,
+            polylines=polylines,
+            on_resync=MapState.resync_fields("map_fields"),
+        ),
+    )
\ No newline at end of file
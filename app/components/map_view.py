@@ -1,6 +1,14 @@
 import reflex as rx
 import reflex_enterprise as rxe
-from app.states.map_state import MapState, Field, PointOfInterest
+from reflex_enterprise.components.map.types import LatLng
+from app.states.map_state import (
+    MapState,
+    Field,
+    FieldCluster,
+    PointOfInterest,
+    PoiCluster,
+)
+from app.components.field_sync import map_fields
 
 
 def map_view() -> rx.Component:
@@ -12,9 +20,24 @@ def field_polygon(field: Field) -> rx.Component:
     map_api = rxe.map.api("traceability-map")
     return rxe.map.polygon(
         rxe.map.tooltip(
-            f"Producer: {field['farmer_name']}\nCrop: {field['crop']} | Area: {field['area']} ha"
+            f"Producer: {field['farmer_name']}\nCrop: {field['crop']} | Area: {field['area']} ha",
+            rx.cond(
+                field["area_mismatch"],
+                f"\nMeasured: {field['computed_area']} ha",
+                "",
+            ),
+            rx.cond(
+                field["risk_layers"].length() > 0,
+                f"\nRisk: overlaps {field['risk_layers'].join(', ')}",
+                "",
+            ),
+        ),
+        positions=rx.cond(
+            field["holes"].length() > 0,
+            # Leaflet takes the outline and its holes as a list of rings.
+            (rx.Var.create([field["polygon"]]) + field["holes"]).to(list[LatLng]),
+            field["polygon"],
         ),
-        positions=field["polygon"],
         path_options=rxe.map.path_options(
             color=rx.cond(is_selected, "#F3340B", "#2B79D1"),
             fill_color=rx.cond(is_selected, "#F97A58", "#5595e0"),
@@ -28,8 +51,40 @@ def field_polygon(field: Field) -> rx.Component:
     )
 
 
+def cluster_marker(
+    cluster: FieldCluster | PoiCluster, label: str, color: str
+) -> rx.Component:
+    map_api = rxe.map.api("traceability-map")
+    return rxe.map.circle_marker(
+        rxe.map.tooltip(label),
+        center=cluster["location"],
+        radius=rx.cond(
+            cluster["count"] >= 100, 22.0, rx.cond(cluster["count"] >= 10, 16.0, 11.0)
+        ),
+        path_options=rxe.map.path_options(
+            color=color, fill_color=color, fill_opacity=0.6, weight=2
+        ),
+        on_click=map_api.fly_to(cluster["location"], cluster["zoom"]),
+    )
+
+
+def field_cluster_marker(cluster: FieldCluster) -> rx.Component:
+    return cluster_marker(
+        cluster,
+        f"{cluster['count']} fields | {cluster['area']} ha\nMostly {cluster['crop']}",
+        "#2B79D1",
+    )
+
+
+def poi_cluster_marker(cluster: PoiCluster) -> rx.Component:
+    return cluster_marker(
+        cluster, f"{cluster['count']} sites\nMostly {cluster['type']}", "#7C3AED"
+    )
+
+
 def map_view() -> rx.Component:
     """The map view component for the dashboard."""
+    map_api = rxe.map.api("traceability-map")
     return rxe.map(
         rxe.map.tile_layer(
             url="https://{s}.basemaps.cartocdn.com/rastertiles/voyager/{z}/{x}/{y}{r}.png",
@@ -37,23 +92,34 @@ def map_view() -> rx.Component:
         ),
         rx.cond(
             MapState.show_fields,
-            rx.foreach(MapState.filtered_fields, field_polygon),
+            rx.fragment(
+                rx.foreach(map_fields, field_polygon),
+                rx.foreach(MapState.field_clusters, field_cluster_marker),
+            ),
             None,
         ),
         rx.cond(
             MapState.show_pois,
-            rx.foreach(
-                MapState.points_of_interest,
-                lambda poi: rxe.map.marker(
-                    rxe.map.tooltip(f"{poi['type']}: {poi['name']}"),
-                    position=poi["location"],
+            rx.fragment(
+                rx.foreach(
+                    MapState.poi_markers,
+                    lambda poi: rxe.map.marker(
+                        rxe.map.tooltip(f"{poi['type']}: {poi['name']}"),
+                        position=poi["location"],
+                    ),
                 ),
+                rx.foreach(MapState.poi_clusters, poi_cluster_marker),
             ),
             None,
         ),
         rxe.map.zoom_control(position="topright"),
         rxe.map.scale_control(position="bottomleft"),
         id="traceability-map",
+        on_load=map_api.get_bounds(callback=MapState.set_viewport),
+        on_move_end=lambda event: [
+            MapState.update_zoom(event["target"]["zoom"]),
+            map_api.get_bounds(callback=MapState.set_viewport),
+        ],
         center=MapState.center,
         zoom=MapState.zoom,
         height="100%",
@@ -6,6 +6,8 @@ from app.states.map_state import MapState, Field
 from app.states.auth_state import AuthState, User
 from app.components.analytics_view import analytics_view
 from app.components.traceability_view import traceability_view
+from app.components.field_sync import listed_fields
+from app.exporters import available_exporters
 
 
 def stat_card(icon: str, label: str, value: rx.Var[str | int]) -> rx.Component:
@@ -53,6 +55,17 @@ def layer_toggle(
     )
 
 
+def export_layer_checkbox(
+    text: str, state_var: rx.Var[bool], on_change_event: rx.event.EventType
+) -> rx.Component:
+    """A checkbox adding an extra layer to the export."""
+    return rx.el.label(
+        rx.el.input(type="checkbox", checked=state_var, on_change=on_change_event),
+        text,
+        class_name="flex items-center gap-2 text-xs text-gray-600",
+    )
+
+
 def field_list_item(field: Field) -> rx.Component:
     is_selected = MapState.selected_field_id == field["id"]
     map_api = rxe.map.api("traceability-map")
@@ -75,7 +88,7 @@ def field_list_item(field: Field) -> rx.Component:
         ),
         on_click=[
             MapState.select_field(field["id"]),
-            map_api.fly_to(field["polygon"][0], 14.0),
+            map_api.fly_to(field["centroid"], 14.0),
             MapState.go_to_producer_page(field["farmer_id"]),
         ],
     )
@@ -128,14 +141,14 @@ def sidebar() -> rx.Component:
                 ),
                 rx.el.div(
                     rx.el.input(
-                        placeholder="Search Farmer or Crop...",
+                        placeholder="Search Farmer, Crop or Cooperative...",
                         on_change=MapState.set_search_query,
                         class_name="w-full px-3 py-2 text-sm border border-gray-200 rounded-lg focus:ring-2 focus:ring-blue-300 outline-none",
                     ),
                     class_name="px-3 pb-2",
                 ),
                 rx.el.div(
-                    rx.foreach(MapState.filtered_fields, field_list_item),
+                    rx.foreach(listed_fields, field_list_item),
                     class_name="flex flex-col gap-1 px-2 pb-4",
                 ),
                 class_name="flex flex-col",
@@ -146,17 +159,30 @@ def sidebar() -> rx.Component:
         ),
         rx.el.div(
             rx.el.div(
+                rx.el.select(
+                    [
+                        rx.el.option(exporter.label, value=exporter.extension)
+                        for exporter in available_exporters()
+                    ],
+                    value=TraceabilityState.export_format,
+                    on_change=TraceabilityState.set_export_format,
+                    class_name="w-full text-xs p-1 border border-gray-200 rounded-md",
+                ),
                 rx.el.button(
                     rx.icon("download", class_name="h-4 w-4 mr-2"),
-                    "Export CSV",
-                    on_click=TraceabilityState.export_fields_csv,
+                    "Export",
+                    on_click=TraceabilityState.export_fields,
                     class_name="flex items-center text-xs font-medium text-gray-600 hover:text-blue-600 p-2 rounded-md bg-gray-100 hover:bg-gray-200 transition-colors",
                 ),
-                rx.el.button(
-                    rx.icon("file-json-2", class_name="h-4 w-4 mr-2"),
-                    "Export JSON",
-                    on_click=TraceabilityState.export_fields_json,
-                    class_name="flex items-center text-xs font-medium text-gray-600 hover:text-blue-600 p-2 rounded-md bg-gray-100 hover:bg-gray-200 transition-colors",
+                export_layer_checkbox(
+                    "Timeline",
+                    TraceabilityState.export_timeline,
+                    TraceabilityState.toggle_export_timeline,
+                ),
+                export_layer_checkbox(
+                    "POIs",
+                    TraceabilityState.export_pois,
+                    TraceabilityState.toggle_export_pois,
                 ),
                 class_name="grid grid-cols-2 gap-2 p-2",
             ),
@@ -64,6 +64,15 @@ def traceability_view() -> rx.Component:
                         index == TraceabilityState.selected_field_timeline.length() - 1,
                     ),
                 ),
+                rx.cond(
+                    TraceabilityState.timeline_has_more,
+                    rx.el.button(
+                        "Show older events",
+                        on_click=TraceabilityState.show_older_events,
+                        class_name="w-full text-xs font-medium text-gray-600 hover:text-blue-600 p-2 rounded-md bg-gray-100 hover:bg-gray-200 transition-colors",
+                    ),
+                    None,
+                ),
                 class_name="p-4",
             ),
             rx.el.div(
@@ -0,0 +1,27 @@
+from .base import (
+    CHUNK_SIZE,
+    ExportLayer,
+    Exporter,
+    Feature,
+    Geometry,
+    export_layers,
+    merged_columns,
+)
+from .tabular import CsvExporter
+from .geojson import GeoJSONExporter, geometry_json
+from .flatgeobuf import FlatGeobufExporter
+from .geoparquet import GeoParquetExporter
+
+EXPORTERS: dict[str, Exporter] = {
+    exporter.extension: exporter
+    for exporter in (
+        CsvExporter(),
+        GeoJSONExporter(),
+        FlatGeobufExporter(),
+        GeoParquetExporter(),
+    )
+}
+
+
+def available_exporters() -> list[Exporter]:
+    return [e for e in EXPORTERS.values() if e.available()]
\ No newline at end of file
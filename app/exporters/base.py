@@ -0,0 +1,168 @@
+from typing import AsyncIterator, Callable, Iterable, Iterator
+import numpy as np
+from app.store import (
+    field_repo,
+    poi_repo,
+    polygon_store,
+    reference_layers,
+    timeline_store,
+)
+
+# Features gathered per chunk, between writes to the output stream.
+CHUNK_SIZE = 1000
+
+# A geometry as ("Polygon", unclosed (n, 2) outer ring then holes) or
+# ("Point", (lng, lat)).
+Geometry = tuple[str, np.ndarray | list[np.ndarray]]
+Feature = tuple[Geometry | None, dict]
+
+FIELD_COLUMNS = {
+    "id": str,
+    "farmer_id": str,
+    "farmer_name": str,
+    "crop": str,
+    "area": float,
+    "computed_area": float,
+    "risk_layers": str,
+}
+POI_COLUMNS = {"id": str, "name": str, "type": str}
+TIMELINE_COLUMNS = {
+    "field_id": str,
+    "date": str,
+    "stage": str,
+    "description": str,
+    "location": str,
+}
+
+
+class ExportLayer:
+    """A named layer of an export: its typed columns and its features.
+
+    Each call of ``chunks`` starts a pass over the layer, yielding lists of
+    features, so writers only ever hold one chunk of records at a time.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        columns: dict[str, type],
+        chunks: Callable[[], Iterator[list[Feature]]],
+    ):
+        self.name = name
+        self.columns = columns
+        self.chunks = chunks
+
+
+def _field_chunks(fields: list) -> Iterator[list[Feature]]:
+    """The exported fields as they are when each chunk is read. Fields
+    removed since the export started are left out."""
+    for start in range(0, len(fields), CHUNK_SIZE):
+        chunk = [
+            field
+            for f in fields[start : start + CHUNK_SIZE]
+            if (field := field_repo.get(f["id"])) is not None
+            and f["id"] in polygon_store
+        ]
+        risk_layers = reference_layers.risk_layers([f["id"] for f in chunk])
+        yield [
+            (
+                ("Polygon", polygon_store.rings(f["id"])),
+                {
+                    "id": f["id"],
+                    "farmer_id": f["farmer_id"],
+                    "farmer_name": f["farmer_name"],
+                    "crop": f["crop"],
+                    "area": f["area"],
+                    "computed_area": f["computed_area"],
+                    "risk_layers": ";".join(risk_layers.get(f["id"], [])),
+                },
+            )
+            for f in chunk
+        ]
+
+
+def _poi_chunks() -> Iterator[list[Feature]]:
+    pois = poi_repo.all()
+    for start in range(0, len(pois), CHUNK_SIZE):
+        yield [
+            (
+                ("Point", np.array([p["location"]["lng"], p["location"]["lat"]])),
+                {"id": p["id"], "name": p["name"], "type": p["type"]},
+            )
+            for p in pois[start : start + CHUNK_SIZE]
+        ]
+
+
+def _timeline_chunks(field_ids: list[str]) -> Iterator[list[Feature]]:
+    """Timeline events of the exported fields, each field's in date order,
+    placed at the field's centroid. Events of a field removed since the
+    export started keep no geometry."""
+    chunk: list[Feature] = []
+    for event in timeline_store.for_fields(field_ids):
+        field = field_repo.get(event["field_id"])
+        centroid = field["centroid"] if field is not None else None
+        geometry = None
+        if centroid is not None:
+            geometry = ("Point", np.array([centroid["lng"], centroid["lat"]]))
+        chunk.append((geometry, {k: event[k] for k in TIMELINE_COLUMNS}))
+        if len(chunk) == CHUNK_SIZE:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def export_layers(fields: list, include: Iterable[str] = ()) -> list[ExportLayer]:
+    """Get the layers of an export of ``fields``, with "timeline" and "pois"
+    added when included."""
+    include = set(include)
+    layers = [ExportLayer("fields", FIELD_COLUMNS, lambda: _field_chunks(fields))]
+    if "timeline" in include:
+        field_ids = [f["id"] for f in fields]
+        layers.append(
+            ExportLayer(
+                "timeline", TIMELINE_COLUMNS, lambda: _timeline_chunks(field_ids)
+            )
+        )
+    if "pois" in include:
+        layers.append(ExportLayer("pois", POI_COLUMNS, _poi_chunks))
+    return layers
+
+
+def merged_columns(layers: list[ExportLayer]) -> dict[str, type]:
+    """Get the columns of all layers, led by "layer" when there are several."""
+    columns: dict[str, type] = {"layer": str} if len(layers) > 1 else {}
+    for layer in layers:
+        columns.update(layer.columns)
+    return columns
+
+
+def closed(ring: np.ndarray) -> np.ndarray:
+    return np.concatenate([ring, ring[:1]])
+
+
+def geometry_bounds(geometry: Geometry) -> tuple[float, float, float, float]:
+    """Get the (west, south, east, north) box of a geometry."""
+    kind, coordinates = geometry
+    points = coordinates[0] if kind == "Polygon" else coordinates.reshape(-1, 2)
+    (west, south), (east, north) = points.min(axis=0), points.max(axis=0)
+    return float(west), float(south), float(east), float(north)
+
+
+class Exporter:
+    """Writes the layers of an export in one file format, as a byte stream.
+
+    ``compressible`` formats are gzip-encoded for clients that accept it.
+    """
+
+    extension = ""
+    label = ""
+    media_type = "application/octet-stream"
+    compressible = True
+
+    def available(self) -> bool:
+        """Whether the libraries the format needs are installed."""
+        return True
+
+    def write(self, layers: list[ExportLayer]) -> AsyncIterator[bytes]:
+        raise NotImplementedError
\ No newline at end of file
@@ -0,0 +1,288 @@
+import math
+import struct
+from typing import AsyncIterator
+import numpy as np
+from app.importers.flatgeobuf import MAGIC
+from .base import (
+    ExportLayer,
+    Exporter,
+    Feature,
+    closed,
+    geometry_bounds,
+    merged_columns,
+)
+
+# Children per node of the packed Hilbert R-tree written before the features.
+INDEX_NODE_SIZE = 16
+HILBERT_MAX = (1 << 16) - 1
+_GEOMETRY_CODES = {"Point": 1, "Polygon": 3}
+_COLUMN_TYPES = {float: 10, str: 11}
+_NODE = np.dtype([("box", "<f8", 4), ("offset", "<u8")])
+
+
+def _table(*slots) -> tuple:
+    """A table of (struct format, value) or ("offset", object) slots."""
+    return ("table", slots)
+
+
+def _string(text: str) -> tuple:
+    return ("string", text.encode("utf-8"))
+
+
+def _vector(values: np.ndarray) -> tuple:
+    return ("vector", values)
+
+
+def _tables(items: list) -> tuple:
+    return ("tables", items)
+
+
+def _serialize(root: tuple) -> bytes:
+    """Lay out a FlatBuffer front to back.
+
+    Every object is written before the objects it points to, so offsets
+    always point forward, and each value is aligned to its size relative
+    to the start of the buffer.
+    """
+    data = bytearray(4)
+
+    def pad(size: int):
+        data.extend(bytes(-len(data) % size))
+
+    def emit(obj: tuple) -> int:
+        kind, value = obj
+        if kind == "string":
+            pad(4)
+            pos = len(data)
+            data.extend(struct.pack("<I", len(value)) + value + b"\0")
+            return pos
+        if kind == "vector":
+            pad(4)
+            if (len(data) + 4) % value.itemsize:
+                data.extend(bytes(4))
+            pos = len(data)
+            data.extend(struct.pack("<I", len(value)) + value.tobytes())
+            return pos
+        if kind == "tables":
+            pad(4)
+            pos = len(data)
+            data.extend(struct.pack("<I", len(value)) + bytes(4 * len(value)))
+            for i, item in enumerate(value):
+                slot = pos + 4 + 4 * i
+                struct.pack_into("<I", data, slot, emit(item) - slot)
+            return pos
+        pad(2)
+        vtable = len(data)
+        data.extend(bytes(4 + 2 * len(value)))
+        pad(4)
+        table = len(data)
+        data.extend(struct.pack("<i", table - vtable))
+        offsets = []
+        children = []
+        for slot in value:
+            if slot is None:
+                offsets.append(0)
+                continue
+            fmt, slot_value = slot
+            pad(4 if fmt == "offset" else struct.calcsize(fmt))
+            offsets.append(len(data) - table)
+            if fmt == "offset":
+                children.append((len(data), slot_value))
+                data.extend(bytes(4))
+            else:
+                data.extend(struct.pack(fmt, slot_value))
+        struct.pack_into(
+            f"<HH{len(value)}H",
+            data,
+            vtable,
+            4 + 2 * len(value),
+            len(data) - table,
+            *offsets,
+        )
+        for at, child in children:
+            struct.pack_into("<I", data, at, emit(child) - at)
+        return table
+
+    struct.pack_into("<I", data, 0, emit(root))
+    return bytes(data)
+
+
+def _hilbert(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """Get the positions of 16-bit grid cells along a Hilbert curve."""
+    x = x.astype(np.uint32)
+    y = y.astype(np.uint32)
+    a = x ^ y
+    b = 0xFFFF ^ a
+    c = 0xFFFF ^ (x | y)
+    d = x & (y ^ 0xFFFF)
+    a, b, c, d = (
+        a | (b >> 1),
+        (a >> 1) ^ a,
+        ((c >> 1) ^ (b & (d >> 1))) ^ c,
+        ((a & (c >> 1)) ^ (d >> 1)) ^ d,
+    )
+    for shift in (2, 4):
+        a, b, c, d = (
+            (a & (a >> shift)) ^ (b & (b >> shift)),
+            (a & (b >> shift)) ^ (b & ((a ^ b) >> shift)),
+            c ^ (a & (c >> shift)) ^ (b & (d >> shift)),
+            d ^ (b & (c >> shift)) ^ ((a ^ b) & (d >> shift)),
+        )
+    c = c ^ (a & (c >> 8)) ^ (b & (d >> 8))
+    d = d ^ (b & (c >> 8)) ^ ((a ^ b) & (d >> 8))
+    a = c ^ (c >> 1)
+    b = d ^ (d >> 1)
+    i0 = x ^ y
+    i1 = b | (0xFFFF ^ (i0 | a))
+
+    def spread(i):
+        i = (i | (i << 8)) & 0x00FF00FF
+        i = (i | (i << 4)) & 0x0F0F0F0F
+        i = (i | (i << 2)) & 0x33333333
+        return (i | (i << 1)) & 0x55555555
+
+    return (spread(i1) << 1) | spread(i0)
+
+
+def _packed_rtree(boxes: np.ndarray, offsets: np.ndarray) -> bytes:
+    """Build the FlatGeobuf index over features already in Hilbert order.
+
+    Levels are stored from the root down; a leaf holds its feature's byte
+    offset and a parent the node number of its first child.
+    """
+    counts = [len(boxes)]
+    while True:
+        counts.append(math.ceil(counts[-1] / INDEX_NODE_SIZE))
+        if counts[-1] == 1:
+            break
+    nodes = np.zeros(sum(counts), dtype=_NODE)
+    start = len(nodes) - counts[0]
+    nodes["box"][start:] = boxes
+    nodes["offset"][start:] = offsets
+    for below, count in zip(counts, counts[1:]):
+        parent = start - count
+        level = nodes["box"][start : start + below]
+        groups = np.arange(0, below, INDEX_NODE_SIZE)
+        nodes["box"][parent:start] = np.column_stack(
+            [
+                np.minimum.reduceat(level[:, 0], groups),
+                np.minimum.reduceat(level[:, 1], groups),
+                np.maximum.reduceat(level[:, 2], groups),
+                np.maximum.reduceat(level[:, 3], groups),
+            ]
+        )
+        nodes["offset"][parent:start] = start + groups
+        start = parent
+    return nodes.tobytes()
+
+
+def _properties(properties: dict, columns: dict[str, type]) -> np.ndarray:
+    data = bytearray()
+    for index, (name, kind) in enumerate(columns.items()):
+        value = properties.get(name)
+        if value is None:
+            continue
+        data.extend(struct.pack("<H", index))
+        if kind is float:
+            data.extend(struct.pack("<d", value))
+        else:
+            text = str(value).encode("utf-8")
+            data.extend(struct.pack("<I", len(text)) + text)
+    return np.frombuffer(bytes(data), dtype=np.uint8)
+
+
+def _geometry(kind: str, coordinates: np.ndarray) -> tuple:
+    ends = None
+    if kind == "Polygon":
+        rings = [closed(ring) for ring in coordinates]
+        lengths = np.cumsum([len(ring) for ring in rings]).astype("<u4")
+        ends = ("offset", _vector(lengths))
+        coordinates = np.concatenate(rings)
+    xy = ("offset", _vector(coordinates.astype("<f8").reshape(-1)))
+    return _table(ends, xy, None, None, None, None, ("<B", _GEOMETRY_CODES[kind]))
+
+
+def _feature(feature: Feature, columns: dict[str, type]) -> bytes:
+    geometry, properties = feature
+    slots = [None, ("offset", _vector(_properties(properties, columns)))]
+    if geometry is not None:
+        slots[0] = ("offset", _geometry(*geometry))
+    return _serialize(_table(*slots))
+
+
+class FlatGeobufExporter(Exporter):
+    """A FlatGeobuf file with its packed Hilbert R-tree, written without GDAL.
+
+    The index comes before the features and holds their byte offsets, so
+    features are encoded and Hilbert-sorted in memory before anything is
+    sent. Exports with features lacking a geometry are written unindexed.
+    """
+
+    extension = "fgb"
+    label = "FlatGeobuf"
+    compressible = False
+
+    async def write(self, layers: list[ExportLayer]) -> AsyncIterator[bytes]:
+        columns = merged_columns(layers)
+        encoded: list[bytes] = []
+        boxes: list[tuple] = []
+        kinds: set[str] = set()
+        for layer in layers:
+            extra = {"layer": layer.name} if "layer" in columns else {}
+            for chunk in layer.chunks():
+                for geometry, properties in chunk:
+                    encoded.append(
+                        _feature((geometry, {**extra, **properties}), columns)
+                    )
+                    if geometry is None:
+                        boxes.append((np.nan,) * 4)
+                        continue
+                    kinds.add(geometry[0])
+                    boxes.append(geometry_bounds(geometry))
+        box = np.array(boxes, dtype=np.float64).reshape(-1, 4)
+        indexed = len(encoded) > 0 and not np.isnan(box).any()
+        order = np.arange(len(encoded))
+        envelope = None
+        if indexed:
+            west, south = box[:, 0].min(), box[:, 1].min()
+            east, north = box[:, 2].max(), box[:, 3].max()
+            envelope = ("offset", _vector(np.array([west, south, east, north])))
+            width = (east - west) or 1.0
+            height = (north - south) or 1.0
+            x = HILBERT_MAX * ((box[:, 0] + box[:, 2]) / 2 - west) / width
+            y = HILBERT_MAX * ((box[:, 1] + box[:, 3]) / 2 - south) / height
+            order = np.argsort(-_hilbert(x, y).astype(np.int64), kind="stable")
+        kind = _GEOMETRY_CODES[kinds.pop()] if len(kinds) == 1 else 0
+        header = _serialize(
+            _table(
+                ("offset", _string(layers[0].name if len(layers) == 1 else "export")),
+                envelope,
+                ("<B", kind),
+                None,
+                None,
+                None,
+                None,
+                (
+                    "offset",
+                    _tables(
+                        [
+                            _table(("offset", _string(name)), ("<B", _COLUMN_TYPES[t]))
+                            for name, t in columns.items()
+                        ]
+                    ),
+                ),
+                ("<Q", len(encoded)),
+                ("<H", INDEX_NODE_SIZE if indexed else 0),
+                ("offset", _table(("offset", _string("EPSG")), ("<i", 4326))),
+            )
+        )
+        yield MAGIC + b"\x00" + struct.pack("<I", len(header)) + header
+        if indexed:
+            sizes = np.array([4 + len(encoded[i]) for i in order], dtype=np.uint64)
+            offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(np.uint64)
+            yield _packed_rtree(box[order], offsets)
+        for start in range(0, len(order), 1000):
+            yield b"".join(
+                struct.pack("<I", len(encoded[i])) + encoded[i]
+                for i in order[start : start + 1000].tolist()
+            )
\ No newline at end of file
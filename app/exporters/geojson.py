@@ -0,0 +1,66 @@
+import json
+from typing import AsyncIterator
+import numpy as np
+from .base import ExportLayer, Exporter, Geometry, closed
+
+_encode = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False).encode
+
+
+def _wound(ring: np.ndarray, clockwise: bool) -> list:
+    """Close an unclosed ring, winding it one way or the other."""
+    local = ring - ring[0]
+    following = np.roll(local, -1, axis=0)
+    doubled_area = np.sum(local[:, 0] * following[:, 1] - following[:, 0] * local[:, 1])
+    if (doubled_area < 0) != clockwise:
+        ring = ring[::-1]
+    return closed(ring).tolist()
+
+
+def geometry_json(geometry: Geometry | None) -> dict | None:
+    """Get a geometry as GeoJSON, its polygons wound by the right-hand rule
+    of RFC 7946: outer rings counter-clockwise and holes clockwise."""
+    if geometry is None:
+        return None
+    kind, coordinates = geometry
+    if kind == "Polygon":
+        return {
+            "type": "Polygon",
+            "coordinates": [
+                _wound(ring, clockwise=k > 0) for k, ring in enumerate(coordinates)
+            ],
+        }
+    return {"type": kind, "coordinates": coordinates.tolist()}
+
+
+class GeoJSONExporter(Exporter):
+    """An RFC 7946 FeatureCollection with compact separators, streamed.
+
+    Features are encoded a chunk at a time between the collection's
+    opening and closing text. With extra layers every feature carries its
+    layer's name in the "layer" property.
+    """
+
+    extension = "geojson"
+    label = "GeoJSON"
+    media_type = "application/geo+json"
+
+    async def write(self, layers: list[ExportLayer]) -> AsyncIterator[bytes]:
+        yield b'{"type":"FeatureCollection","features":['
+        separator = ""
+        for layer in layers:
+            extra = {"layer": layer.name} if len(layers) > 1 else {}
+            for chunk in layer.chunks():
+                text = ",".join(
+                    _encode(
+                        {
+                            "type": "Feature",
+                            "geometry": geometry_json(geometry),
+                            "properties": {**extra, **properties},
+                        }
+                    )
+                    for geometry, properties in chunk
+                )
+                if text:
+                    yield (separator + text).encode("utf-8")
+                    separator = ","
+        yield b"]}"
\ No newline at end of file
@@ -0,0 +1,120 @@
+import importlib.util
+import json
+import math
+import struct
+from typing import AsyncIterator
+from .base import (
+    ExportLayer,
+    Exporter,
+    Geometry,
+    closed,
+    geometry_bounds,
+    merged_columns,
+)
+
+GEOPARQUET_VERSION = "1.0.0"
+
+
+def _wkb(geometry: Geometry | None) -> bytes | None:
+    if geometry is None:
+        return None
+    kind, coordinates = geometry
+    if kind == "Point":
+        return struct.pack("<BI", 1, 1) + coordinates.astype("<f8").tobytes()
+    wkb = struct.pack("<BII", 1, 3, len(coordinates))
+    for ring in coordinates:
+        ring = closed(ring)
+        wkb += struct.pack("<I", len(ring)) + ring.astype("<f8").tobytes()
+    return wkb
+
+
+class _Sink:
+    """A write-only file for pyarrow whose contents are taken as they come."""
+
+    def __init__(self):
+        self.data = bytearray()
+        self.closed = False
+
+    def write(self, data) -> int:
+        self.data.extend(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = bytes(self.data)
+        self.data.clear()
+        return data
+
+
+class GeoParquetExporter(Exporter):
+    """A GeoParquet 1.0 file with WKB geometries, one row group per chunk.
+
+    Needs pyarrow, which is optional (requirements-extras.txt): without it
+    the format isn't offered.
+    The "geo" schema metadata is fixed when the writer opens, so a first
+    pass over the layers finds the geometry types and bounding box.
+    """
+
+    extension = "parquet"
+    label = "GeoParquet"
+    media_type = "application/vnd.apache.parquet"
+    compressible = False
+
+    def available(self) -> bool:
+        return importlib.util.find_spec("pyarrow") is not None
+
+    async def write(self, layers: list[ExportLayer]) -> AsyncIterator[bytes]:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        columns = merged_columns(layers)
+        kinds: set[str] = set()
+        west = south = math.inf
+        east = north = -math.inf
+        for layer in layers:
+            for chunk in layer.chunks():
+                for geometry, _ in chunk:
+                    if geometry is None:
+                        continue
+                    kinds.add(geometry[0])
+                    box = geometry_bounds(geometry)
+                    west, south = min(west, box[0]), min(south, box[1])
+                    east, north = max(east, box[2]), max(north, box[3])
+        geo = {
+            "version": GEOPARQUET_VERSION,
+            "primary_column": "geometry",
+            "columns": {
+                "geometry": {
+                    "encoding": "WKB",
+                    "geometry_types": sorted(kinds),
+                },
+            },
+        }
+        if kinds:
+            geo["columns"]["geometry"]["bbox"] = [west, south, east, north]
+        schema = pa.schema(
+            [
+                pa.field(name, pa.float64() if kind is float else pa.string())
+                for name, kind in columns.items()
+            ]
+            + [pa.field("geometry", pa.binary())],
+            metadata={"geo": json.dumps(geo)},
+        )
+        sink = _Sink()
+        writer = pq.ParquetWriter(sink, schema, compression="zstd")
+        try:
+            for layer in layers:
+                extra = {"layer": layer.name} if "layer" in columns else {}
+                for chunk in layer.chunks():
+                    rows = [{**extra, **p, "geometry": _wkb(g)} for g, p in chunk]
+                    writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+                    yield sink.drain()
+        finally:
+            writer.close()
+        # Closing writes the footer, without which the file can't be read.
+        yield sink.drain()
\ No newline at end of file
@@ -0,0 +1,37 @@
+import csv
+import io
+from typing import AsyncIterator
+from .base import ExportLayer, Exporter, merged_columns
+
+
+def _drain(buffer: io.StringIO) -> bytes:
+    data = buffer.getvalue().encode("utf-8")
+    buffer.seek(0)
+    buffer.truncate()
+    return data
+
+
+class CsvExporter(Exporter):
+    """Attribute rows without geometry, escaped by ``csv.writer``.
+
+    The header goes out first and then one chunk of rows at a time. Extra
+    layers share the file, told apart by a leading "layer" column.
+    """
+
+    extension = "csv"
+    label = "CSV"
+    media_type = "text/csv"
+
+    async def write(self, layers: list[ExportLayer]) -> AsyncIterator[bytes]:
+        columns = list(merged_columns(layers))
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, columns)
+        writer.writeheader()
+        yield _drain(buffer)
+        for layer in layers:
+            for chunk in layer.chunks():
+                if "layer" in columns:
+                    writer.writerows({"layer": layer.name, **p} for _, p in chunk)
+                else:
+                    writer.writerows(p for _, p in chunk)
+                yield _drain(buffer)
\ No newline at end of file
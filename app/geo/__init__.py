@@ -0,0 +1,15 @@
+from .spatial_index import (
+    Box,
+    PackedRTree,
+    STRtree,
+    polygon_bbox,
+    intersects,
+    expand,
+)
+from .simplify import degrees_per_pixel, simplify_line, simplify_ring
+from .mvt import LayerEncoder, TileProjection, encode_tile, tile_bbox
+from .geodesic import AREA_TOLERANCE, measure_fields, pack_rings, ring_metrics
+from .validity import RING_ISSUES, RingCheck, validate_rings
+from .overlap import intersection_area
+from .clip import subdivide
+from .polyline import COORDINATE_DECIMALS, encode_polyline, quantize
\ No newline at end of file
@@ -0,0 +1,61 @@
+import numpy as np
+
+# Deepest split of one polygon by ``subdivide``, to stop at vertex clusters.
+MAX_SUBDIVIDE_DEPTH = 24
+
+
+def _clip_half(ring: np.ndarray, axis: int, value: float, below: bool) -> np.ndarray:
+    """Clip an unclosed ring to one side of an axis-aligned line.
+
+    One Sutherland-Hodgman pass over all edges at once: every edge adds
+    its end when that is inside, preceded by the point where it crosses
+    the line when it enters or leaves.
+    """
+    if len(ring) == 0:
+        return ring
+    coord = ring[:, axis]
+    inside = coord <= value if below else coord >= value
+    end = np.roll(ring, -1, axis=0)
+    end_inside = np.roll(inside, -1)
+    crosses = inside != end_inside
+    delta = end[:, axis] - coord
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = np.where(crosses, (value - coord) / delta, 0.0)
+    meet = ring + t[:, None] * (end - ring)
+    meet[:, axis] = value
+    points = np.stack([np.where(crosses[:, None], meet, end), end], axis=1)
+    keep = np.column_stack([inside | end_inside, ~inside & end_inside])
+    clipped = points[keep]
+    if len(clipped) > 1:
+        clipped = clipped[(clipped != np.roll(clipped, 1, axis=0)).any(axis=1)]
+    return clipped
+
+
+def subdivide(polygon: list[np.ndarray], max_vertices: int) -> list[list[np.ndarray]]:
+    """Cut a polygon into pieces of at most about ``max_vertices`` vertices.
+
+    ``polygon`` is an outer ring followed by its holes. Its box is halved
+    across the longer side until each piece is small enough, so a test
+    against a huge outline only touches the pieces near the other shape.
+    The pieces cover the polygon exactly and each keeps its own holes;
+    where a concave outline leaves and re-enters a piece, the piece has
+    edges running both ways along the cut, which enclose no area.
+    """
+    pieces = []
+    stack = [(polygon, 0)]
+    while stack:
+        rings, depth = stack.pop()
+        outer = rings[0]
+        if len(outer) < 3:
+            continue
+        if sum(len(r) for r in rings) <= max_vertices or depth >= MAX_SUBDIVIDE_DEPTH:
+            pieces.append(rings)
+            continue
+        west, south = outer.min(axis=0)
+        east, north = outer.max(axis=0)
+        axis = 0 if east - west >= north - south else 1
+        middle = (west + east) / 2 if axis == 0 else (south + north) / 2
+        for below in (True, False):
+            half = [_clip_half(r, axis, middle, below) for r in rings]
+            stack.append(([half[0], *(h for h in half[1:] if len(h) >= 3)], depth + 1))
+    return pieces
\ No newline at end of file
@@ -0,0 +1,158 @@
+from typing import Sequence, TypedDict
+import numpy as np
+
+# Radius in metres of the sphere with the same surface area as WGS84.
+EARTH_RADIUS = 6_371_007.2
+SQUARE_METRES_PER_HECTARE = 10_000
+# Relative difference from which a declared area is flagged as wrong.
+AREA_TOLERANCE = 0.1
+
+
+class RingMetrics(TypedDict):
+    area: np.ndarray
+    perimeter: np.ndarray
+    centroid: np.ndarray
+    bbox: np.ndarray
+
+
+def pack_rings(rings: Sequence[Sequence]) -> tuple[np.ndarray, np.ndarray]:
+    """Pack rings into one (n, 2) array of (lng, lat) and ring offsets.
+
+    Rings are lists of LatLng or (m, 2) coordinate arrays. Ring ``i`` is
+    ``coords[offsets[i]:offsets[i + 1]]``.
+    """
+    lengths = np.fromiter((len(r) for r in rings), dtype=np.int64, count=len(rings))
+    offsets = np.zeros(len(rings) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    coords = np.empty((int(offsets[-1]), 2))
+    for ring, start, end in zip(rings, offsets[:-1].tolist(), offsets[1:].tolist()):
+        if isinstance(ring, np.ndarray):
+            coords[start:end] = ring
+        elif ring:
+            coords[start:end] = np.fromiter(
+                (c for p in ring for c in (p["lng"], p["lat"])),
+                dtype=np.float64,
+                count=2 * (end - start),
+            ).reshape(-1, 2)
+    return coords, offsets
+
+
+def ring_metrics(coords: np.ndarray, offsets: np.ndarray) -> RingMetrics:
+    """Measure every ring of a packed batch at once.
+
+    Area (m²) uses the Chamberlain-Duquette formula on the authalic sphere,
+    perimeter (m) sums haversine distances, and the centroid is the area
+    centroid in a local equirectangular projection, which is exact enough
+    at field scale. Rings may be open or closed. Rings with fewer than three
+    vertices get zero area and perimeter and a NaN centroid and bbox.
+    """
+    count = len(offsets) - 1
+    area = np.zeros(count)
+    perimeter = np.zeros(count)
+    centroid = np.full((count, 2), np.nan)
+    bbox = np.full((count, 4), np.nan)
+    lengths = np.diff(offsets)
+    valid = lengths >= 3
+    if not valid.any():
+        return {
+            "area": area,
+            "perimeter": perimeter,
+            "centroid": centroid,
+            "bbox": bbox,
+        }
+    ring_lengths = lengths[valid]
+    points = coords if valid.all() else coords[np.repeat(valid, lengths)]
+    lng_deg, lat_deg = points[:, 0], points[:, 1]
+    local_offsets = np.zeros(len(ring_lengths) + 1, dtype=np.int64)
+    np.cumsum(ring_lengths, out=local_offsets[1:])
+    first, last = local_offsets[:-1], local_offsets[1:] - 1
+
+    lng = np.radians(lng_deg)
+    lat = np.radians(lat_deg)
+    nxt = np.arange(1, len(points) + 1)
+    nxt[last] = first
+    prv = np.arange(-1, len(points) - 1)
+    prv[first] = last
+
+    excess = (lng[nxt] - lng[prv]) * np.sin(lat)
+    area[valid] = np.abs(np.add.reduceat(excess, first)) * EARTH_RADIUS**2 / 2
+
+    half_dlat = (lat[nxt] - lat) / 2
+    half_dlng = (lng[nxt] - lng) / 2
+    h = np.sin(half_dlat) ** 2 + np.cos(lat) * np.cos(lat[nxt]) * np.sin(half_dlng) ** 2
+    segment = 2 * EARTH_RADIUS * np.arcsin(np.sqrt(np.clip(h, 0, 1)))
+    perimeter[valid] = np.add.reduceat(segment, first)
+
+    ring_of = np.repeat(np.arange(len(ring_lengths)), ring_lengths)
+    origin_lng = lng_deg[first]
+    origin_lat = lat_deg[first]
+    scale = np.cos(np.radians(origin_lat))
+    x = (lng_deg - origin_lng[ring_of]) * scale[ring_of]
+    y = lat_deg - origin_lat[ring_of]
+    cross = x * y[nxt] - x[nxt] * y
+    doubled_area = np.add.reduceat(cross, first)
+    cx = np.add.reduceat((x + x[nxt]) * cross, first)
+    cy = np.add.reduceat((y + y[nxt]) * cross, first)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cx = np.where(doubled_area != 0, cx / (3 * doubled_area), 0)
+        cy = np.where(doubled_area != 0, cy / (3 * doubled_area), 0)
+    centroid[valid, 0] = origin_lng + cx / scale
+    centroid[valid, 1] = origin_lat + cy
+
+    bbox[valid, 0] = np.minimum.reduceat(lng_deg, first)
+    bbox[valid, 1] = np.minimum.reduceat(lat_deg, first)
+    bbox[valid, 2] = np.maximum.reduceat(lng_deg, first)
+    bbox[valid, 3] = np.maximum.reduceat(lat_deg, first)
+    return {"area": area, "perimeter": perimeter, "centroid": centroid, "bbox": bbox}
+
+
+def measure_fields(
+    fields: Sequence[dict],
+    tolerance: float = AREA_TOLERANCE,
+    packed: tuple[np.ndarray, np.ndarray] | None = None,
+    holes: Sequence[Sequence] | None = None,
+) -> list[dict]:
+    """Get copies of fields with their measured geometry added.
+
+    Each copy gains ``computed_area`` (ha), ``perimeter`` (m), ``centroid``
+    (LatLng), ``bbox`` ([west, south, east, north]) and ``area_mismatch``,
+    which is set when the declared ``area`` is off from the computed one by
+    more than ``tolerance`` of it. Centroid and bbox are None for polygons
+    with fewer than three vertices. ``packed`` gives the polygons as
+    returned by ``pack_rings`` when the fields do not carry them, and
+    ``holes`` their holes, else taken from each field's ``holes``. Holes
+    are taken out of the area and add to the perimeter; the centroid and
+    bbox are those of the outer ring.
+    """
+    if not fields:
+        return []
+    coords, offsets = packed or pack_rings([f["polygon"] for f in fields])
+    metrics = ring_metrics(coords, offsets)
+    if holes is None:
+        holes = [f.get("holes") or () for f in fields]
+    owners = [i for i, rings in enumerate(holes) for _ in rings]
+    if owners:
+        hole_metrics = ring_metrics(*pack_rings([r for rings in holes for r in rings]))
+        np.subtract.at(metrics["area"], owners, hole_metrics["area"])
+        np.add.at(metrics["perimeter"], owners, hole_metrics["perimeter"])
+        np.maximum(metrics["area"], 0, out=metrics["area"])
+    hectares = metrics["area"] / SQUARE_METRES_PER_HECTARE
+    declared = np.array([f["area"] for f in fields], dtype=np.float64)
+    mismatch = np.abs(declared - hectares) > tolerance * hectares
+    has_shape = (np.diff(offsets) >= 3).tolist()
+    centroids = metrics["centroid"].tolist()
+    boxes = metrics["bbox"].tolist()
+    measured = []
+    for i, field in enumerate(fields):
+        lng, lat = centroids[i]
+        measured.append(
+            {
+                **field,
+                "computed_area": round(float(hectares[i]), 2),
+                "perimeter": round(float(metrics["perimeter"][i]), 1),
+                "centroid": {"lat": lat, "lng": lng} if has_shape[i] else None,
+                "bbox": boxes[i] if has_shape[i] else None,
+                "area_mismatch": bool(mismatch[i]),
+            }
+        )
+    return measured
\ No newline at end of file
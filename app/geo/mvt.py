@@ -0,0 +1,217 @@
+import math
+import struct
+from typing import Any, Iterable, Sequence
+import numpy as np
+
+# Tile coordinates run from 0 to EXTENT along each axis.
+EXTENT = 4096
+
+_MOVE_TO, _LINE_TO, _CLOSE_PATH = 1, 2, 7
+_POINT, _POLYGON = 1, 3
+
+
+def tile_bbox(z: int, x: int, y: int):
+    """Get the (west, south, east, north) bounds of a Web Mercator tile."""
+    n = 2**z
+
+    def lat(row: int) -> float:
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * row / n))))
+
+    return (x / n * 360 - 180, lat(y + 1), (x + 1) / n * 360 - 180, lat(y))
+
+
+class TileProjection:
+    """Projects LatLng points to integer coordinates within one tile.
+
+    Call it on one point, or use ``ring`` for an array of coordinates.
+    """
+
+    def __init__(self, z: int, x: int, y: int, extent: int = EXTENT):
+        self.scale = 2**z
+        self.x = x
+        self.y = y
+        self.extent = extent
+
+    def __call__(self, point) -> tuple[int, int]:
+        lat = max(-85.0511, min(85.0511, point["lat"]))
+        sin_lat = math.sin(math.radians(lat))
+        tx = (point["lng"] + 180) / 360 * self.scale
+        ty = (
+            0.5 - math.log((1 + sin_lat) / (1 - sin_lat)) / (4 * math.pi)
+        ) * self.scale
+        return (
+            round((tx - self.x) * self.extent),
+            round((ty - self.y) * self.extent),
+        )
+
+    def ring(self, coords: np.ndarray) -> list[tuple[int, int]]:
+        """Project an (n, 2) array of (lng, lat) coordinates at once."""
+        lat = np.clip(coords[:, 1], -85.0511, 85.0511)
+        sin_lat = np.sin(np.radians(lat))
+        tx = (coords[:, 0] + 180) / 360 * self.scale
+        ty = (0.5 - np.log((1 + sin_lat) / (1 - sin_lat)) / (4 * math.pi)) * self.scale
+        projected = np.column_stack(
+            [(tx - self.x) * self.extent, (ty - self.y) * self.extent]
+        )
+        return list(map(tuple, np.rint(projected).astype(np.int64).tolist()))
+
+
+def _varint(value: int) -> bytes:
+    out = bytearray()
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def _zigzag(value: int) -> int:
+    return (value << 1) ^ (value >> 63)
+
+
+def _key(field_number: int, wire_type: int) -> bytes:
+    return _varint((field_number << 3) | wire_type)
+
+
+def _length_delimited(field_number: int, payload: bytes) -> bytes:
+    return _key(field_number, 2) + _varint(len(payload)) + payload
+
+
+def _packed(field_number: int, values: Iterable[int]) -> bytes:
+    return _length_delimited(field_number, b"".join(_varint(v) for v in values))
+
+
+def _command(command: int, count: int) -> int:
+    return (command & 0x7) | (count << 3)
+
+
+def _ring_area(ring: Sequence[tuple[int, int]]) -> int:
+    """Get twice the signed area of a ring, positive when clockwise on screen."""
+    return sum(
+        x1 * y2 - x2 * y1 for (x1, y1), (x2, y2) in zip(ring, [*ring[1:], ring[0]])
+    )
+
+
+def _dedupe(ring: Sequence[tuple[int, int]]) -> list[tuple[int, int]]:
+    points = [p for i, p in enumerate(ring) if i == 0 or p != ring[i - 1]]
+    while len(points) > 1 and points[-1] == points[0]:
+        points.pop()
+    return points
+
+
+def polygon_geometry(
+    ring: Sequence[tuple[int, int]],
+    holes: Iterable[Sequence[tuple[int, int]]] = (),
+) -> list[int] | None:
+    """Encode an unclosed exterior ring and its holes, or None if the
+    exterior collapses at this zoom. Collapsed holes are left out."""
+    rings = []
+    for index, points in enumerate([ring, *holes]):
+        points = _dedupe(points)
+        area = _ring_area(points) if len(points) >= 3 else 0
+        if area == 0:
+            if index == 0:
+                return None
+            continue
+        # Exteriors wind clockwise on screen and holes counter-clockwise.
+        if (area < 0) == (index == 0):
+            points = points[::-1]
+        rings.append(points)
+    geometry = []
+    cx, cy = 0, 0
+    for points in rings:
+        geometry.append(_command(_MOVE_TO, 1))
+        for i, (x, y) in enumerate(points):
+            if i == 1:
+                geometry.append(_command(_LINE_TO, len(points) - 1))
+            geometry += [_zigzag(x - cx), _zigzag(y - cy)]
+            cx, cy = x, y
+        geometry.append(_command(_CLOSE_PATH, 1))
+    return geometry
+
+
+def point_geometry(point: tuple[int, int]) -> list[int]:
+    return [_command(_MOVE_TO, 1), _zigzag(point[0]), _zigzag(point[1])]
+
+
+def _value(value: Any) -> bytes:
+    if isinstance(value, bool):
+        return _key(7, 0) + _varint(int(value))
+    if isinstance(value, int):
+        return _key(6, 0) + _varint(_zigzag(value))
+    if isinstance(value, float):
+        return _key(3, 1) + struct.pack("<d", value)
+    return _length_delimited(1, str(value).encode())
+
+
+class LayerEncoder:
+    """Collects the features of one vector tile layer.
+
+    Property keys and values are shared across the layer's features, as the
+    Mapbox Vector Tile 2.1 format expects.
+    """
+
+    def __init__(self, name: str, extent: int = EXTENT):
+        self.name = name
+        self.extent = extent
+        self._features: list[bytes] = []
+        self._keys: dict[str, int] = {}
+        self._values: dict[tuple[type, Any], int] = {}
+
+    def __len__(self) -> int:
+        return len(self._features)
+
+    def _tags(self, properties: dict) -> list[int]:
+        tags = []
+        for key, value in properties.items():
+            if value is None:
+                continue
+            tags.append(self._keys.setdefault(key, len(self._keys)))
+            tags.append(
+                self._values.setdefault((type(value), value), len(self._values))
+            )
+        return tags
+
+    def add(self, geometry_type: int, geometry: list[int], properties: dict):
+        feature = (
+            _key(1, 0)
+            + _varint(len(self._features) + 1)
+            + _packed(2, self._tags(properties))
+            + _key(3, 0)
+            + _varint(geometry_type)
+            + _packed(4, geometry)
+        )
+        self._features.append(feature)
+
+    def add_polygon(
+        self,
+        ring: Sequence[tuple[int, int]],
+        properties: dict,
+        holes: Iterable[Sequence[tuple[int, int]]] = (),
+    ) -> bool:
+        geometry = polygon_geometry(ring, holes)
+        if geometry is None:
+            return False
+        self.add(_POLYGON, geometry, properties)
+        return True
+
+    def add_point(self, point: tuple[int, int], properties: dict):
+        self.add(_POINT, point_geometry(point), properties)
+
+    def encode(self) -> bytes:
+        layer = (
+            _key(15, 0)
+            + _varint(2)
+            + _length_delimited(1, self.name.encode())
+            + b"".join(_length_delimited(2, f) for f in self._features)
+            + b"".join(_length_delimited(3, k.encode()) for k in self._keys)
+            + b"".join(_length_delimited(4, _value(v)) for _, v in self._values)
+            + _key(5, 0)
+            + _varint(self.extent)
+        )
+        return _length_delimited(3, layer)
+
+
+def encode_tile(layers: Iterable[LayerEncoder]) -> bytes:
+    """Encode a Mapbox Vector Tile, leaving out empty layers."""
+    return b"".join(layer.encode() for layer in layers if len(layer))
\ No newline at end of file
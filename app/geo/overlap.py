@@ -0,0 +1,151 @@
+import math
+import numpy as np
+from .geodesic import EARTH_RADIUS, SQUARE_METRES_PER_HECTARE
+
+# Distance in metres within which a point counts as on an outline.
+ON_EDGE_TOLERANCE = 1e-6
+# Sine of the angle below which two edges are treated as parallel.
+PARALLEL_TOLERANCE = 1e-9
+
+
+def _local_metres(ring: np.ndarray, origin: np.ndarray) -> np.ndarray:
+    """Project (lng, lat) degrees to metres east and north of ``origin``."""
+    scale = EARTH_RADIUS * math.pi / 180
+    return np.column_stack(
+        [
+            (ring[:, 0] - origin[0]) * scale * math.cos(math.radians(origin[1])),
+            (ring[:, 1] - origin[1]) * scale,
+        ]
+    )
+
+
+def _counter_clockwise(ring: np.ndarray) -> np.ndarray:
+    following = np.roll(ring, -1, axis=0)
+    doubled_area = np.sum(ring[:, 0] * following[:, 1] - following[:, 0] * ring[:, 1])
+    return ring[::-1] if doubled_area < 0 else ring
+
+
+def _cross(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return a[..., 0] * b[..., 1] - a[..., 1] * b[..., 0]
+
+
+def _edges_near(start: np.ndarray, end: np.ndarray, points: np.ndarray) -> np.ndarray:
+    """Flag the edges whose bounding box meets that of ``points``."""
+    low = points.min(axis=0) - ON_EDGE_TOLERANCE
+    high = points.max(axis=0) + ON_EDGE_TOLERANCE
+    return (np.minimum(start, end) <= high).all(axis=1) & (
+        np.maximum(start, end) >= low
+    ).all(axis=1)
+
+
+def _boundary_inside(p: np.ndarray, q: np.ndarray, keep_shared: bool) -> float:
+    """Sum the cross products of the parts of ring p's edges inside ring q.
+
+    Each edge of p is split where it meets q's edges, and each piece is kept
+    when its midpoint lies inside q. Pieces running along an edge of q are
+    kept only with ``keep_shared`` and when both edges point the same way,
+    so an outline the two rings share is counted once. Only edges near
+    the other ring's bounding box take part in the pairwise tests.
+    """
+    start, end = p, np.roll(p, -1, axis=0)
+    q_start, q_end = q, np.roll(q, -1, axis=0)
+    near = _edges_near(start, end, q)
+    if not near.any():
+        return 0.0
+    start, end = start[near], end[near]
+    near = _edges_near(q_start, q_end, np.concatenate([start, end]))
+    all_q_start, all_q_end = q_start, q_end
+    q_start, q_end = q_start[near], q_end[near]
+    d, e = end - start, q_end - q_start
+    offset = q_start[None, :, :] - start[:, None, :]
+    denom = _cross(d[:, None, :], e[None, :, :])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = _cross(offset, e[None, :, :]) / denom
+        u = _cross(offset, d[:, None, :]) / denom
+    # Parallel edges only meet where an end of one lies on the other.
+    length_sq = np.einsum("ij,ij->i", d, d)
+    e_sq = np.einsum("ij,ij->i", e, e)
+    parallel = np.abs(denom) <= PARALLEL_TOLERANCE * np.sqrt(
+        length_sq[:, None] * e_sq[None, :]
+    )
+    crossing = ~parallel & (t > 0) & (t < 1) & (u >= 0) & (u <= 1)
+    edge, _ = np.nonzero(crossing)
+    params = [t[crossing]]
+    edges = [edge]
+    # Ends of q's edges lying on p's edges, for shared and touching outlines.
+    for ends in (q_start, q_end):
+        rel = ends[None, :, :] - start[:, None, :]
+        along = np.einsum("ijk,ik->ij", rel, d) / length_sq[:, None]
+        off = np.abs(_cross(rel, d[:, None, :])) / np.sqrt(length_sq)[:, None]
+        on = (off <= ON_EDGE_TOLERANCE) & (along > 0) & (along < 1)
+        edge, _ = np.nonzero(on)
+        params.append(along[on])
+        edges.append(edge)
+    count = len(start)
+    params.append(np.zeros(count))
+    params.append(np.ones(count))
+    edges.append(np.arange(count))
+    edges.append(np.arange(count))
+    params = np.concatenate(params)
+    edges = np.concatenate(edges)
+    order = np.lexsort((params, edges))
+    params, edges = params[order], edges[order]
+    same_edge = edges[1:] == edges[:-1]
+    lo = params[:-1][same_edge]
+    hi = params[1:][same_edge]
+    edge = edges[:-1][same_edge]
+    piece = hi > lo
+    lo, hi, edge = lo[piece], hi[piece], edge[piece]
+    # Whole edges keep their exact ends, so shared vertices stay identical.
+    a = np.where((lo == 0)[:, None], start[edge], start[edge] + lo[:, None] * d[edge])
+    b = np.where((hi == 1)[:, None], end[edge], start[edge] + hi[:, None] * d[edge])
+    mid = (a + b) / 2
+
+    # Crossing-number test of each midpoint against q.
+    y0, y1 = all_q_start[:, 1], all_q_end[:, 1]
+    x0, x1 = all_q_start[:, 0], all_q_end[:, 0]
+    straddles = (y0[None, :] > mid[:, 1:2]) != (y1[None, :] > mid[:, 1:2])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x_at = (
+            x0[None, :]
+            + (mid[:, 1:2] - y0[None, :]) / (y1 - y0)[None, :] * (x1 - x0)[None, :]
+        )
+    keep = (np.count_nonzero(straddles & (mid[:, 0:1] < x_at), axis=1) % 2) == 1
+    if len(q_start) == 0:
+        return float(np.sum(_cross(a[keep], b[keep])))
+
+    # Pieces within reach of an edge of q run along it.
+    rel = mid[:, None, :] - q_start[None, :, :]
+    along = np.clip(np.einsum("kjd,jd->kj", rel, e) / e_sq[None, :], 0, 1)
+    gap = rel - along[..., None] * e[None, :, :]
+    distance = np.sqrt(np.einsum("kjd,kjd->kj", gap, gap))
+    nearest = distance.argmin(axis=1)
+    on_edge = distance[np.arange(len(mid)), nearest] <= ON_EDGE_TOLERANCE
+    same_way = np.einsum("kd,kd->k", b - a, e[nearest]) > 0
+    keep = np.where(on_edge, keep_shared & same_way, keep)
+    return float(np.sum(_cross(a[keep], b[keep])))
+
+
+def intersection_area(a: np.ndarray, b: np.ndarray) -> float:
+    """Get the area in hectares shared by two simple polygon rings.
+
+    Rings are unclosed (n, 2) arrays of (lng, lat) in either winding. The
+    boundary of the intersection is made of the parts of each outline that
+    lie inside the other, and its area follows from the shoelace sum over
+    those parts, in a local projection that is exact enough at field scale.
+    """
+    if len(a) < 3 or len(b) < 3:
+        return 0.0
+    origin = a[0]
+    p = _counter_clockwise(_local_metres(a, origin))
+    q = _counter_clockwise(_local_metres(b, origin))
+    if len(p) == len(q):
+        # The same parcel imported twice, possibly starting elsewhere.
+        for shift in np.flatnonzero((q == p[0]).all(axis=1)).tolist():
+            if np.array_equal(np.roll(q, -shift, axis=0), p):
+                doubled = _cross(p, np.roll(p, -1, axis=0)).sum()
+                return float(doubled) / 2 / SQUARE_METRES_PER_HECTARE
+    doubled = _boundary_inside(p, q, keep_shared=True) + _boundary_inside(
+        q, p, keep_shared=False
+    )
+    return max(doubled / 2, 0.0) / SQUARE_METRES_PER_HECTARE
\ No newline at end of file
@@ -0,0 +1,36 @@
+import numpy as np
+
+# Decimal places coordinates are stored and sent with: 1e-6° is about 11 cm.
+COORDINATE_DECIMALS = 6
+
+# A zigzagged delta below 2**35 takes at most seven 5-bit chunks.
+_MAX_CHUNKS = 7
+
+
+def quantize(coords: np.ndarray, decimals: int = COORDINATE_DECIMALS) -> np.ndarray:
+    """Round coordinates to ``decimals`` places, the precision kept on ingest."""
+    return np.round(np.asarray(coords, dtype=np.float64), decimals)
+
+
+def encode_polyline(ring: np.ndarray, decimals: int = COORDINATE_DECIMALS) -> str:
+    """Encode an (n, 2) array of (lng, lat) with the Google polyline algorithm.
+
+    Points are written as (lat, lng) integers at ``decimals`` places, each
+    the difference from the previous one, zigzagged and cut into 5-bit
+    chunks of one character each. A vertex costs a few characters instead
+    of a ``{"lat": ..., "lng": ...}`` object. All rows are encoded at once.
+    """
+    if not len(ring):
+        return ""
+    ints = np.round(np.asarray(ring)[:, ::-1] * 10**decimals).astype(np.int64)
+    deltas = np.diff(ints, axis=0, prepend=0).ravel()
+    values = ((deltas << 1) ^ (deltas >> 63)).astype(np.uint64)
+    shifts = np.arange(_MAX_CHUNKS, dtype=np.uint64) * np.uint64(5)
+    shifted = values[:, None] >> shifts
+    chunks = shifted & np.uint64(31)
+    # A value runs up to its highest non-zero chunk, and always has one.
+    used = 1 + np.count_nonzero(shifted[:, 1:], axis=1)
+    index = np.arange(_MAX_CHUNKS)
+    chunks |= np.where(index < used[:, None] - 1, 0x20, 0).astype(np.uint64)
+    chunks += np.uint64(63)
+    return chunks[index < used[:, None]].astype(np.uint8).tobytes().decode("ascii")
\ No newline at end of file
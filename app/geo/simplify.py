@@ -0,0 +1,66 @@
+import numpy as np
+
+# Web Mercator tiles are 256 px wide and cover 360 degrees at zoom 0.
+TILE_SIZE = 256
+
+
+def degrees_per_pixel(zoom: float) -> float:
+    return 360 / (TILE_SIZE * 2**zoom)
+
+
+def _segment_distances(points: np.ndarray, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Get the planar distances in degrees from points to segment a-b."""
+    d = b - a
+    p = points - a
+    length_sq = d @ d
+    if length_sq == 0:
+        return np.hypot(p[:, 0], p[:, 1])
+    t = np.clip(p @ d / length_sq, 0.0, 1.0)
+    return np.hypot(p[:, 0] - t * d[0], p[:, 1] - t * d[1])
+
+
+def simplify_line(points: np.ndarray, tolerance: float) -> np.ndarray:
+    """Simplify a polyline with the Douglas-Peucker algorithm.
+
+    ``points`` is an (n, 2) coordinate array. The first and last points are
+    always kept, as is every point that lies further than ``tolerance``
+    degrees from the simplified line.
+    """
+    if len(points) < 3:
+        return points
+    keep = np.zeros(len(points), dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        distances = _segment_distances(
+            points[start + 1 : end], points[start], points[end]
+        )
+        index = int(distances.argmax())
+        if distances[index] > tolerance:
+            index += start + 1
+            keep[index] = True
+            stack.append((start, index))
+            stack.append((index, end))
+    return points[keep]
+
+
+def simplify_ring(ring: np.ndarray, tolerance: float) -> np.ndarray:
+    """Simplify an unclosed polygon ring, keeping at least a triangle.
+
+    ``ring`` is an (n, 2) coordinate array. It is split at the vertex
+    furthest from its first vertex so that both anchors of the
+    Douglas-Peucker pass lie on the outline.
+    """
+    if len(ring) <= 4:
+        return ring
+    offsets = ring - ring[0]
+    split = int((offsets * offsets).sum(axis=1).argmax())
+    head = simplify_line(ring[: split + 1], tolerance)
+    tail = simplify_line(np.concatenate([ring[split:], ring[:1]]), tolerance)
+    simplified = np.concatenate([head[:-1], tail[:-1]])
+    if len(simplified) < 3:
+        return ring[[0, len(ring) // 3, 2 * len(ring) // 3]]
+    return simplified
\ No newline at end of file
@@ -0,0 +1,180 @@
+import math
+from typing import Any, Iterable, Sequence
+import numpy as np
+
+# An axis-aligned box as (west, south, east, north) in degrees.
+Box = tuple[float, float, float, float]
+
+
+def polygon_bbox(points: Iterable) -> Box | None:
+    """Get the bounding box of a ring of LatLng points, or None if it is empty."""
+    lats = []
+    lngs = []
+    for p in points:
+        lats.append(p["lat"])
+        lngs.append(p["lng"])
+    if not lats:
+        return None
+    return (min(lngs), min(lats), max(lngs), max(lats))
+
+
+def intersects(a: Box, b: Box) -> bool:
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+
+def expand(box: Box, margin: float) -> Box:
+    """Grow a box by a fraction of its width and height on every side."""
+    dx = (box[2] - box[0]) * margin
+    dy = (box[3] - box[1]) * margin
+    return (box[0] - dx, box[1] - dy, box[2] + dx, box[3] + dy)
+
+
+def _union(boxes: Iterable[Box]) -> Box:
+    west, south, east, north = zip(*boxes)
+    return (min(west), min(south), max(east), max(north))
+
+
+class STRtree:
+    """A static R-tree bulk-loaded with the Sort-Tile-Recursive algorithm.
+
+    Items are packed into full nodes by sorting on x into vertical slices and
+    then on y within each slice, which gives near-optimal query cost for a
+    fixed set of boxes. The tree cannot be modified after construction.
+    """
+
+    def __init__(self, entries: Sequence[tuple[Box, Any]], node_capacity: int = 16):
+        self.node_capacity = node_capacity
+        self._size = len(entries)
+        level = [(box, item, True) for box, item in entries]
+        while len(level) > node_capacity:
+            level = self._pack(level)
+        self._root = level
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _pack(self, nodes: list) -> list:
+        capacity = self.node_capacity
+        node_count = math.ceil(len(nodes) / capacity)
+        slice_count = math.ceil(math.sqrt(node_count))
+        slice_size = slice_count * capacity
+        by_x = sorted(nodes, key=lambda n: n[0][0] + n[0][2])
+        parents = []
+        for i in range(0, len(by_x), slice_size):
+            column = sorted(by_x[i : i + slice_size], key=lambda n: n[0][1] + n[0][3])
+            for j in range(0, len(column), capacity):
+                children = column[j : j + capacity]
+                parents.append((_union(c[0] for c in children), children, False))
+        return parents
+
+    def query(self, box: Box) -> list:
+        """Get every item whose box intersects ``box``."""
+        results = []
+        stack = [self._root]
+        while stack:
+            for node_box, child, is_leaf in stack.pop():
+                if not intersects(node_box, box):
+                    continue
+                if is_leaf:
+                    results.append(child)
+                else:
+                    stack.append(child)
+        return results
+
+
+class PackedRTree:
+    """A static R-tree held in three flat arrays, for memory-mapping.
+
+    Boxes are (n, 4) rows of (west, south, east, north). Leaves are put in
+    Sort-Tile-Recursive order and every ``node_capacity`` consecutive
+    nodes of a level share a parent, so the tree needs no pointers:
+    ``boxes`` holds the levels from the root down, ``levels`` their start
+    rows, and ``order`` the item index of each leaf. A tree saved with
+    ``arrays`` can be rebuilt from ``np.load(..., mmap_mode="r")`` copies
+    without reading them into memory.
+    """
+
+    def __init__(
+        self,
+        boxes: np.ndarray,
+        levels: np.ndarray,
+        order: np.ndarray,
+        node_capacity: int = 16,
+    ):
+        self.boxes = boxes
+        self.levels = levels
+        self.order = order
+        self.node_capacity = node_capacity
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    @classmethod
+    def build(cls, boxes: np.ndarray, node_capacity: int = 16) -> "PackedRTree":
+        count = len(boxes)
+        slice_size = node_capacity * math.ceil(
+            math.sqrt(math.ceil(count / node_capacity) or 1)
+        )
+        by_x = np.argsort(boxes[:, 0] + boxes[:, 2], kind="stable")
+        column = np.empty(count, dtype=np.int64)
+        column[by_x] = np.arange(count) // slice_size
+        order = np.lexsort((boxes[:, 1] + boxes[:, 3], column))
+        level = boxes[order]
+        tiers = [level]
+        while len(level) > node_capacity:
+            starts = np.arange(0, len(level), node_capacity)
+            level = np.column_stack(
+                [
+                    np.minimum.reduceat(level[:, 0], starts),
+                    np.minimum.reduceat(level[:, 1], starts),
+                    np.maximum.reduceat(level[:, 2], starts),
+                    np.maximum.reduceat(level[:, 3], starts),
+                ]
+            )
+            tiers.append(level)
+        tiers.reverse()
+        levels = np.zeros(len(tiers) + 1, dtype=np.int64)
+        np.cumsum([len(t) for t in tiers], out=levels[1:])
+        return cls(np.concatenate(tiers).reshape(-1, 4), levels, order, node_capacity)
+
+    def arrays(self) -> dict[str, np.ndarray]:
+        return {"boxes": self.boxes, "levels": self.levels, "order": self.order}
+
+    def query_many(self, queries: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Join (m, 4) query boxes against the tree in one pass per level.
+
+        Returns the query rows and item indexes of every intersecting pair.
+        """
+        empty = np.zeros(0, dtype=np.int64)
+        if len(self.order) == 0 or len(queries) == 0:
+            return empty, empty
+        queries = np.asarray(queries, dtype=np.float64)
+        first, last = int(self.levels[0]), int(self.levels[1])
+        query = np.repeat(np.arange(len(queries)), last - first)
+        node = np.tile(np.arange(last - first), len(queries))
+        for depth in range(len(self.levels) - 1):
+            start, end = int(self.levels[depth]), int(self.levels[depth + 1])
+            box = self.boxes[start + node]
+            q = queries[query]
+            hit = (
+                (box[:, 0] <= q[:, 2])
+                & (q[:, 0] <= box[:, 2])
+                & (box[:, 1] <= q[:, 3])
+                & (q[:, 1] <= box[:, 3])
+            )
+            query, node = query[hit], node[hit]
+            if depth == len(self.levels) - 2:
+                break
+            below = int(self.levels[depth + 2]) - end
+            children = np.minimum(self.node_capacity, below - node * self.node_capacity)
+            first_child = np.repeat(node * self.node_capacity, children)
+            step = np.arange(int(children.sum())) - np.repeat(
+                np.cumsum(children) - children, children
+            )
+            query = np.repeat(query, children)
+            node = first_child + step
+        return query, np.asarray(self.order)[node]
+
+    def query(self, box: Box) -> np.ndarray:
+        """Get the indexes of the items whose box intersects ``box``."""
+        return self.query_many(np.array([box]))[1]
\ No newline at end of file
@@ -0,0 +1,193 @@
+from typing import Sequence, TypedDict
+import numpy as np
+from .geodesic import pack_rings
+
+# Problems a ring can have, and the message reported for each.
+RING_ISSUES = {
+    "unclosed": "ring is not closed",
+    "duplicate_vertices": "ring repeats a vertex",
+    "clockwise": "ring runs clockwise",
+    "too_few_vertices": "ring has fewer than 3 distinct vertices",
+    "degenerate": "ring encloses no area",
+    "self_intersection": "ring crosses or touches itself",
+}
+# Issues that ``validate_rings`` can fix when asked to repair.
+REPAIRABLE = frozenset({"unclosed", "duplicate_vertices", "clockwise"})
+
+
+class RingCheck(TypedDict):
+    ring: np.ndarray | None
+    errors: list[str]
+    repaired: list[str]
+
+
+def _ring_ids(offsets: np.ndarray) -> np.ndarray:
+    return np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+
+
+def _compact(coords: np.ndarray, offsets: np.ndarray, keep: np.ndarray):
+    """Drop vertices where ``keep`` is False and recompute the ring offsets."""
+    counts = np.bincount(_ring_ids(offsets)[keep], minlength=len(offsets) - 1)
+    new_offsets = np.zeros_like(offsets)
+    np.cumsum(counts, out=new_offsets[1:])
+    return coords[keep], new_offsets
+
+
+def _neighbours(offsets: np.ndarray, total: int) -> tuple[np.ndarray, np.ndarray]:
+    """Get the next and previous vertex of every vertex, wrapping per ring."""
+    lengths = np.diff(offsets)
+    nonempty = lengths > 0
+    first, last = offsets[:-1][nonempty], offsets[1:][nonempty] - 1
+    nxt = np.arange(1, total + 1)
+    nxt[last] = first
+    prv = np.arange(-1, total - 1)
+    prv[first] = last
+    return nxt, prv
+
+
+def _orient(ax, ay, bx, by, cx, cy) -> np.ndarray:
+    return np.sign((bx - ax) * (cy - ay) - (by - ay) * (cx - ax))
+
+
+def self_intersecting(coords: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """Flag the unclosed rings of a packed batch whose edges cross or touch.
+
+    A sweep along x over the edges of all rings at once: edges are sorted
+    by their west end within each ring, each one is paired with the later
+    edges of its ring that start before it ends, and only pairs whose
+    boxes also overlap in y get the exact orientation test. Edges sharing
+    a vertex are skipped, so rings must not repeat consecutive vertices.
+    """
+    count = len(offsets) - 1
+    flagged = np.zeros(count, dtype=bool)
+    lengths = np.diff(offsets)
+    if len(coords) == 0:
+        return flagged
+    nxt, _ = _neighbours(offsets, len(coords))
+    ring = _ring_ids(offsets)
+    position = np.arange(len(coords)) - np.repeat(offsets[:-1], lengths)
+    ax, ay = coords[:, 0], coords[:, 1]
+    bx, by = ax[nxt], ay[nxt]
+    west, east = np.minimum(ax, bx), np.maximum(ax, bx)
+    south, north = np.minimum(ay, by), np.maximum(ay, by)
+
+    order = np.lexsort((west, ring))
+    # Merge edge starts and ends per ring, starts first on ties, so the
+    # starts counted up to an edge's end are the edges that begin before it.
+    kind = np.repeat([0, 1], len(order))
+    values = np.concatenate([west[order], east[order]])
+    rings = np.concatenate([ring[order], ring[order]])
+    events = np.lexsort((kind, values, rings))
+    starts_before = np.cumsum(kind[events] == 0)
+    end = np.empty(len(order), dtype=np.int64)
+    is_end = kind[events] == 1
+    end[events[is_end] - len(order)] = starts_before[is_end]
+    candidates = end - np.arange(len(order)) - 1
+    total = int(candidates.sum())
+    if total == 0:
+        return flagged
+    i = np.repeat(np.arange(len(order)), candidates)
+    j = (
+        i
+        + 1
+        + np.arange(total)
+        - np.repeat(np.cumsum(candidates) - candidates, candidates)
+    )
+    i, j = order[i], order[j]
+
+    n = lengths[ring[i]]
+    gap = np.abs(position[i] - position[j])
+    keep = (south[i] <= north[j]) & (south[j] <= north[i]) & (gap != 1) & (gap != n - 1)
+    i, j = i[keep], j[keep]
+    crosses = (
+        _orient(ax[i], ay[i], bx[i], by[i], ax[j], ay[j])
+        * _orient(ax[i], ay[i], bx[i], by[i], bx[j], by[j])
+        <= 0
+    ) & (
+        _orient(ax[j], ay[j], bx[j], by[j], ax[i], ay[i])
+        * _orient(ax[j], ay[j], bx[j], by[j], bx[i], by[i])
+        <= 0
+    )
+    flagged[ring[i[crosses]]] = True
+    return flagged
+
+
+def validate_rings(
+    rings: Sequence, closed: bool = False, repair: bool = False, orient: bool = False
+) -> list[RingCheck]:
+    """Check a batch of polygon rings in one pass.
+
+    Rings are lists of LatLng or (n, 2) arrays of (lng, lat). With
+    ``closed`` the last vertex must repeat the first, as in GeoJSON.
+    Repeated vertices, clockwise winding and a missing closing vertex are
+    fixed when ``repair`` is set and listed in ``repaired``; otherwise they
+    are errors like the rest of RING_ISSUES. With ``orient``, for sources
+    whose winding means nothing, clockwise rings are reversed without
+    being reported at all. Every valid ring is returned unclosed and, when
+    repaired or oriented, counter-clockwise; ``ring`` is None for rings
+    with errors.
+    """
+    if not rings:
+        return []
+    coords, offsets = pack_rings(rings)
+    count = len(offsets) - 1
+    issues = [set() for _ in range(count)]
+
+    def flag(code: str, mask: np.ndarray):
+        for index in np.flatnonzero(mask).tolist():
+            issues[index].add(code)
+
+    lengths = np.diff(offsets)
+    nonempty = lengths > 1
+    first, last = offsets[:-1], offsets[1:] - 1
+    is_closed = np.zeros(count, dtype=bool)
+    is_closed[nonempty] = (coords[first[nonempty]] == coords[last[nonempty]]).all(
+        axis=1
+    )
+    if closed:
+        flag("unclosed", nonempty & ~is_closed)
+    keep = np.ones(len(coords), dtype=bool)
+    keep[last[is_closed]] = False
+    coords, offsets = _compact(coords, offsets, keep)
+
+    _, prv = _neighbours(offsets, len(coords))
+    repeats = (coords == coords[prv]).all(axis=1)
+    repeats[prv == np.arange(len(coords))] = False
+    ring = _ring_ids(offsets)
+    flag("duplicate_vertices", np.bincount(ring[repeats], minlength=count) > 0)
+    coords, offsets = _compact(coords, offsets, ~repeats)
+
+    lengths = np.diff(offsets)
+    shaped = lengths >= 3
+    flag("too_few_vertices", ~shaped)
+    # Shoelace sums relative to each ring's first vertex, to keep precision.
+    ring = _ring_ids(offsets)
+    local = coords - coords[offsets[:-1][ring]]
+    nxt, _ = _neighbours(offsets, len(coords))
+    shoelace = local[:, 0] * local[nxt, 1] - local[nxt, 0] * local[:, 1]
+    doubled_area = np.bincount(ring, weights=shoelace, minlength=count)
+    magnitude = np.bincount(ring, weights=np.abs(shoelace), minlength=count)
+    flag("degenerate", shaped & (np.abs(doubled_area) <= 1e-9 * magnitude))
+    clockwise = doubled_area < 0
+    if not orient:
+        flag("clockwise", clockwise)
+    flag("self_intersection", shaped & self_intersecting(coords, offsets))
+
+    checks: list[RingCheck] = []
+    for index in range(count):
+        found = issues[index]
+        fixed = found & REPAIRABLE if repair else set()
+        errors = found - fixed
+        ring_coords = None
+        if not errors:
+            ring_coords = coords[offsets[index] : offsets[index + 1]]
+            if "clockwise" in fixed or orient and clockwise[index]:
+                ring_coords = ring_coords[::-1]
+        checks.append(
+            {
+                "ring": ring_coords,
+                "errors": [RING_ISSUES[c] for c in RING_ISSUES if c in errors],
+                "repaired": [RING_ISSUES[c] for c in RING_ISSUES if c in fixed],
+            }
+        )
+    return checks
\ No newline at end of file
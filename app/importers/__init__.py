@@ -0,0 +1,16 @@
+from .geojson import FeatureStream, GeoJSONError, geometry_polygons
+from .flatgeobuf import FlatGeobufError, FlatGeobufReader
+from .wkt import WKTError, parse_wkt
+from .tabular import CsvWktReader
+from .kml import KMLError, KMLReader
+from .gpx import GPXError, GPXReader
+from .shapefile import ShapefileError, ShapefileReader
+from .formats import (
+    IMPORT_FORMATS,
+    ImportFormat,
+    ImportFormatError,
+    detect_format,
+    upload_types,
+)
+from .farmers import FarmerNameIndex, name_key
+from .fields import IMPORT_BATCH_SIZE, import_fields, parse_feature
\ No newline at end of file
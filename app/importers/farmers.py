@@ -0,0 +1,67 @@
+import difflib
+import heapq
+from collections import Counter
+from typing import Iterable
+from app.store import normalize
+
+# Candidates compared character by character in a fuzzy lookup.
+FUZZY_CANDIDATES = 20
+
+
+def name_key(name: str) -> str:
+    """Case-fold a name, strip its accents and collapse its whitespace."""
+    return " ".join(normalize(name).split())
+
+
+def _grams(key: str) -> set[str]:
+    padded = f"  {key} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class FarmerNameIndex:
+    """Farmers keyed by normalized name, for matching imported records.
+
+    "Amani  Dufatanyé" and "amani dufatanye" share a key, so exact lookups
+    are a dict hit. ``closest`` finds names that differ by a typo or two,
+    using a trigram index to pick a few candidates and then comparing those
+    character by character.
+    """
+
+    def __init__(self, farmers: Iterable[dict] = ()):
+        self._by_key: dict[str, dict] = {}
+        self._grams: dict[str, set[str]] = {}
+        for farmer in farmers:
+            self.add(farmer)
+
+    def __len__(self) -> int:
+        return len(self._by_key)
+
+    def add(self, farmer: dict):
+        key = name_key(farmer["name"])
+        if key in self._by_key:
+            return
+        self._by_key[key] = farmer
+        for gram in _grams(key):
+            self._grams.setdefault(gram, set()).add(key)
+
+    def get(self, name: str) -> dict | None:
+        return self._by_key.get(name_key(name))
+
+    def closest(self, name: str, threshold: float) -> tuple[dict, float] | None:
+        """Get the most similar farmer and its similarity, if at least ``threshold``.
+
+        Similarity is difflib's ratio between the normalized names, from 0
+        to 1.
+        """
+        key = name_key(name)
+        shared = Counter(
+            other for gram in _grams(key) for other in self._grams.get(gram, ())
+        )
+        best, best_score = None, threshold
+        for other in heapq.nlargest(FUZZY_CANDIDATES, shared, key=shared.get):
+            score = difflib.SequenceMatcher(None, key, other).ratio()
+            if score >= best_score:
+                best, best_score = other, score
+        if best is None:
+            return None
+        return self._by_key[best], best_score
\ No newline at end of file
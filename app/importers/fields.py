@@ -0,0 +1,331 @@
+import itertools
+import logging
+import os
+import time
+import uuid
+import numpy as np
+from app.geo import pack_rings, quantize, ring_metrics, validate_rings
+from app.importers.farmers import FarmerNameIndex
+from app.importers.formats import IMPORT_FORMATS
+from app.importers.geojson import geometry_polygons
+from app.store import (
+    Job,
+    cooperative_repo,
+    farmer_repo,
+    field_repo,
+    field_text,
+    overlap_index,
+    polygon_store,
+    search_index,
+    tokenize,
+)
+
+# Features read between commits to the shared store during an import.
+IMPORT_BATCH_SIZE = 500
+# Imported fields stored per call into the event loop.
+IMPORT_COMMIT_SIZE = 50
+# Imported fields checked for overlaps per call into the event loop.
+OVERLAP_CHECK_BATCH = 25
+# Rejected features and likely duplicate farmers listed in an import's report.
+MAX_REPORTED_WARNINGS = 50
+# dBASE cuts column names to this many characters, so a shapefile's
+# "farmer_name" arrives as "farmer_nam", often upper-cased as well.
+DBF_NAME_LENGTH = 10
+
+
+def _progress_estimate(
+    bytes_read: int, total_bytes: int | None, started: float
+) -> dict[str, int]:
+    """Estimate how far an import is and the seconds left, or -1 if unknown."""
+    if not total_bytes or not bytes_read:
+        return {"percent": -1, "eta_seconds": -1}
+    elapsed = time.monotonic() - started
+    remaining = max(total_bytes - bytes_read, 0)
+    return {
+        "percent": min(100, bytes_read * 100 // total_bytes),
+        "eta_seconds": round(elapsed / bytes_read * remaining),
+    }
+
+
+def _property(props: dict, key: str):
+    """Get a property by its key, or else by a name matching it regardless
+    of case or as cut to a dBASE column name."""
+    if key in props:
+        return props[key]
+    names = (key, key[:DBF_NAME_LENGTH])
+    return next((v for k, v in props.items() if str(k).lower() in names), None)
+
+
+def parse_feature(feature: dict) -> dict | None:
+    """Get the farmer name, crop, area and polygons of a GeoJSON feature.
+
+    A Polygon gives one polygon and a MultiPolygon one per part, each its
+    outer ring and then its holes as (n, 2) arrays of (lng, lat), ready for
+    the field repository's coordinate store. Returns None when the feature
+    lacks one of them or is malformed. Coordinates are rounded to the
+    precision the store keeps, so rings are validated as they are stored.
+    Property names are matched regardless of case and as a shapefile's
+    dBASE table cuts them.
+    """
+    props = feature.get("properties") or {}
+    farmer_name, crop, area = (
+        _property(props, key) for key in ("farmer_name", "crop", "area")
+    )
+    if not all([farmer_name, crop, area]):
+        return None
+    try:
+        area = float(area)
+        polygons = geometry_polygons(feature.get("geometry"))
+    except (TypeError, ValueError):
+        return None
+    if not polygons:
+        return None
+    return {
+        "farmer_name": str(farmer_name),
+        "crop": crop,
+        "area": area,
+        "polygons": [[quantize(ring) for ring in polygon] for polygon in polygons],
+    }
+
+
+def _rings_to_check(
+    polygons: list[list[np.ndarray]], right_hand_rule: bool
+) -> list[np.ndarray]:
+    """Get a feature's rings as ring validation expects them, outer rings
+    counter-clockwise.
+
+    Holes wind clockwise, so they are checked reversed. In formats without
+    the GeoJSON right-hand rule, winding means nothing and every ring is
+    oriented by the validation instead.
+    """
+    return [
+        ring[::-1] if k and right_hand_rule else ring
+        for polygon in polygons
+        for k, ring in enumerate(polygon)
+    ]
+
+
+def _part_shares(polygons: list[list[np.ndarray]]) -> list[float]:
+    """Get each polygon's share of their total area, holes left out."""
+    if len(polygons) == 1:
+        return [1.0]
+    rings = [ring for polygon in polygons for ring in polygon]
+    owners = np.repeat(np.arange(len(polygons)), [len(p) for p in polygons])
+    signs = np.array([-1.0 if k else 1.0 for p in polygons for k in range(len(p))])
+    areas = np.zeros(len(polygons))
+    np.add.at(areas, owners, signs * ring_metrics(*pack_rings(rings))["area"])
+    total = areas.sum()
+    if total <= 0:
+        return [1 / len(polygons)] * len(polygons)
+    return (areas / total).tolist()
+
+
+def _import_context() -> tuple[list[dict], list[dict]]:
+    """Get the farmers and cooperatives as they are, to be read off the loop."""
+    return farmer_repo.all(), cooperative_repo.all()
+
+
+def _commit(
+    new_farmers: list[dict],
+    new_fields: list[dict],
+    tokens: dict[str, tuple[str, list[str]]],
+):
+    """Store a slice of measured and tokenized fields with their new farmers."""
+    farmer_repo.extend(new_farmers)
+    with search_index.pretokenized(tokens):
+        field_repo.extend(new_fields)
+
+
+def _commit_batch(
+    job: Job,
+    new_farmers: list[dict],
+    new_fields: list[dict],
+    tokens: dict[str, tuple[str, list[str]]],
+) -> int:
+    """Store a batch, IMPORT_COMMIT_SIZE fields per call into the event
+    loop, and get how many of its fields have a wrong declared area.
+
+    The fields are measured here, off the loop, and ``tokens`` were taken
+    there too, so each call only stores them. Each new farmer is stored
+    with its first field.
+    """
+    farmers = {farmer["id"]: farmer for farmer in new_farmers}
+    fields = polygon_store.measure(new_fields)
+    for start in range(0, len(fields), IMPORT_COMMIT_SIZE):
+        chunk = fields[start : start + IMPORT_COMMIT_SIZE]
+        chunk_farmers = [
+            farmers.pop(farmer_id)
+            for farmer_id in dict.fromkeys(f["farmer_id"] for f in chunk)
+            if farmer_id in farmers
+        ]
+        chunk_tokens = {f["id"]: tokens[f["id"]] for f in chunk}
+        job.call(_commit, chunk_farmers, chunk, chunk_tokens)
+    return sum(f["area_mismatch"] for f in fields)
+
+
+def import_fields(
+    job: Job,
+    path: str,
+    import_format: str = "geojson",
+    fuzzy_threshold: float | None = None,
+    repair: bool = False,
+) -> str:
+    """Import the fields of a file as a background job.
+
+    ``import_format`` is the IMPORT_FORMATS key of the file, whose reader
+    streams its features. They are handled IMPORT_BATCH_SIZE at a time:
+    their rings, holes included, are validated together, and the features
+    whose rings are all valid are committed to the shared store. Each part
+    of a multi-part feature becomes a field of its own, declaring its share
+    of the feature's area. With ``repair``, unclosed, clockwise and
+    repeated-vertex rings are fixed instead of rejected. Farmers are
+    matched by normalized name and created when missing. With
+    ``fuzzy_threshold``, a farmer created for a name that nearly matches an
+    existing farmer's is flagged with ``possible_duplicate_of`` and reported
+    as a likely duplicate; its fields are imported all the same.
+    Fields are measured and tokenized here and stored a few at a time, so
+    no call into the event loop does more than store them. Each committed
+    batch is checked for overlaps with the fields already stored, a few
+    fields per call into the event loop. Cancelling keeps the batches
+    already committed. Fields whose declared area is off from their
+    measured one are imported and counted in the message.
+    """
+    known_farmers, cooperatives = job.call(_import_context)
+    farmers = FarmerNameIndex(known_farmers)
+    cooperatives_by_id = {coop["id"]: coop for coop in cooperatives}
+    default_coop_id = cooperatives[0]["id"] if cooperatives else "coop-001"
+    processed = rejected = duplicates = fields_added = farmers_added = 0
+    mismatched = repaired = split = 0
+    warnings: list[str] = []
+
+    def warn(message: str):
+        if len(warnings) < MAX_REPORTED_WARNINGS:
+            warnings.append(message)
+
+    started = time.monotonic()
+    with open(path, "rb") as file:
+        total_bytes = os.fstat(file.fileno()).st_size
+        source = IMPORT_FORMATS[import_format]
+        stream = source.reader(file)
+        features = enumerate(stream, 1)
+        while batch := list(itertools.islice(features, IMPORT_BATCH_SIZE)):
+            job.check_cancelled()
+            processed += len(batch)
+            parsed_batch = []
+            for number, feature in batch:
+                parsed = parse_feature(feature)
+                if parsed is None:
+                    logging.warning(f"Skipping invalid feature: {str(feature)[:200]}")
+                    rejected += 1
+                else:
+                    parsed_batch.append((number, parsed))
+            checks = iter(
+                validate_rings(
+                    [
+                        ring
+                        for _, parsed in parsed_batch
+                        for ring in _rings_to_check(
+                            parsed["polygons"], source.right_hand_rule
+                        )
+                    ],
+                    closed=True,
+                    repair=repair,
+                    orient=not source.right_hand_rule,
+                )
+            )
+            new_farmers: list[dict] = []
+            new_fields: list[dict] = []
+            tokens: dict[str, tuple[str, list[str]]] = {}
+            for number, parsed in parsed_batch:
+                polygon_checks = [
+                    [next(checks) for _ in polygon] for polygon in parsed["polygons"]
+                ]
+                errors = [
+                    error
+                    for polygon in polygon_checks
+                    for check in polygon
+                    for error in check["errors"]
+                    if check["ring"] is None
+                ]
+                if errors:
+                    rejected += 1
+                    warn(f"Feature {number}: {', '.join(dict.fromkeys(errors))}.")
+                    continue
+                repaired += any(c["repaired"] for p in polygon_checks for c in p)
+                polygons = [
+                    [c["ring"] if k == 0 else c["ring"][::-1] for k, c in enumerate(p)]
+                    for p in polygon_checks
+                ]
+                name = parsed["farmer_name"]
+                farmer = farmers.get(name)
+                if farmer is None:
+                    farmer = {
+                        "id": f"farmer-{uuid.uuid4().hex}",
+                        "name": name,
+                        "cooperative_id": default_coop_id,
+                    }
+                    match = None
+                    if fuzzy_threshold is not None:
+                        match = farmers.closest(name, fuzzy_threshold)
+                    if match:
+                        duplicates += 1
+                        similar, score = match
+                        farmer["possible_duplicate_of"] = similar["id"]
+                        warn(
+                            f'New farmer "{name}" ({farmer["id"]}) looks like '
+                            f"{similar['name']} ({similar['id']}, {score:.0%} similar)"
+                        )
+                    farmers.add(farmer)
+                    new_farmers.append(farmer)
+                split += len(polygons) > 1
+                coop = cooperatives_by_id.get(farmer["cooperative_id"])
+                for (ring, *holes), share in zip(polygons, _part_shares(polygons)):
+                    field = {
+                        "id": f"field-{uuid.uuid4().hex}",
+                        "farmer_id": farmer["id"],
+                        "farmer_name": farmer["name"],
+                        "crop": parsed["crop"],
+                        "area": round(parsed["area"] * share, 2),
+                        "polygon": ring,
+                        "holes": holes,
+                    }
+                    text = field_text(field, coop)
+                    tokens[field["id"]] = (text, tokenize(text))
+                    new_fields.append(field)
+            fields_added += len(new_fields)
+            farmers_added += len(new_farmers)
+            mismatched += _commit_batch(job, new_farmers, new_fields, tokens)
+            while job.call(overlap_index.refresh, OVERLAP_CHECK_BATCH):
+                job.check_cancelled()
+            job.report(
+                processed=processed,
+                rejected=rejected,
+                duplicates=duplicates,
+                warnings=list(warnings),
+                **_progress_estimate(stream.bytes_read, total_bytes, started),
+            )
+    job.report(
+        processed=processed,
+        rejected=rejected,
+        duplicates=duplicates,
+        warnings=warnings,
+    )
+    message = (
+        f"Imported {fields_added} fields and {farmers_added} farmers; "
+        f"skipped {rejected} invalid features."
+    )
+    if split:
+        message += f" Split {split} multi-part features into a field per part."
+    if repaired:
+        message += f" Repaired the outline of {repaired} features."
+    if mismatched:
+        message += (
+            f" {mismatched} fields declare an area that differs from their "
+            "measured area."
+        )
+    if duplicates:
+        message += (
+            f" {duplicates} new farmers nearly match an existing farmer's name and "
+            "are flagged as possible duplicates."
+        )
+    return message
\ No newline at end of file
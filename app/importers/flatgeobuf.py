@@ -0,0 +1,241 @@
+import json
+import math
+import struct
+from typing import Any, BinaryIO, Iterator
+import numpy as np
+
+MAGIC = b"fgb\x03fgb"
+# Bytes taken by one node of a FlatGeobuf packed Hilbert R-tree.
+NODE_SIZE = 40
+
+GEOMETRY_TYPES = {
+    1: "Point",
+    2: "LineString",
+    3: "Polygon",
+    4: "MultiPoint",
+    5: "MultiLineString",
+    6: "MultiPolygon",
+}
+# Struct formats of the fixed-size column types, by type code.
+_COLUMN_FORMATS = {
+    0: "<b",
+    1: "<B",
+    2: "<?",
+    3: "<h",
+    4: "<H",
+    5: "<i",
+    6: "<I",
+    7: "<q",
+    8: "<Q",
+    9: "<f",
+    10: "<d",
+}
+_JSON_COLUMN = 12
+_BINARY_COLUMN = 14
+
+
+class FlatGeobufError(ValueError):
+    pass
+
+
+class _Table:
+    """A FlatBuffers table, read by field slot from its vtable."""
+
+    def __init__(self, buf: memoryview, pos: int):
+        self.buf = buf
+        self.pos = pos
+        self.vtable = pos - struct.unpack_from("<i", buf, pos)[0]
+        self.vtable_size = struct.unpack_from("<H", buf, self.vtable)[0]
+
+    @classmethod
+    def root(cls, buf: memoryview) -> "_Table":
+        return cls(buf, struct.unpack_from("<I", buf, 0)[0])
+
+    def _field(self, slot: int) -> int:
+        entry = 4 + 2 * slot
+        if entry >= self.vtable_size:
+            return 0
+        offset = struct.unpack_from("<H", self.buf, self.vtable + entry)[0]
+        return self.pos + offset if offset else 0
+
+    def _target(self, slot: int) -> int:
+        pos = self._field(slot)
+        return pos + struct.unpack_from("<I", self.buf, pos)[0] if pos else 0
+
+    def scalar(self, slot: int, fmt: str, default=0):
+        pos = self._field(slot)
+        return struct.unpack_from(fmt, self.buf, pos)[0] if pos else default
+
+    def string(self, slot: int) -> str | None:
+        pos = self._target(slot)
+        if not pos:
+            return None
+        length = struct.unpack_from("<I", self.buf, pos)[0]
+        return bytes(self.buf[pos + 4 : pos + 4 + length]).decode("utf-8")
+
+    def vector(self, slot: int, dtype: str) -> np.ndarray | None:
+        pos = self._target(slot)
+        if not pos:
+            return None
+        length = struct.unpack_from("<I", self.buf, pos)[0]
+        return np.frombuffer(self.buf, dtype=dtype, count=length, offset=pos + 4)
+
+    def table(self, slot: int) -> "_Table | None":
+        pos = self._target(slot)
+        return _Table(self.buf, pos) if pos else None
+
+    def tables(self, slot: int) -> list["_Table"]:
+        pos = self._target(slot)
+        if not pos:
+            return []
+        length = struct.unpack_from("<I", self.buf, pos)[0]
+        items = []
+        for i in range(length):
+            item = pos + 4 + 4 * i
+            items.append(
+                _Table(self.buf, item + struct.unpack_from("<I", self.buf, item)[0])
+            )
+        return items
+
+
+def _columns(table: _Table, slot: int) -> list[tuple[str, int]]:
+    return [(c.string(0), c.scalar(1, "<B")) for c in table.tables(slot)]
+
+
+def _properties(data: np.ndarray | None, columns: list[tuple[str, int]]) -> dict:
+    """Decode a feature's properties: column indexes each followed by a value."""
+    properties: dict[str, Any] = {}
+    if data is None:
+        return properties
+    buf = data.tobytes()
+    pos = 0
+    while pos < len(buf):
+        index = struct.unpack_from("<H", buf, pos)[0]
+        pos += 2
+        if index >= len(columns):
+            raise FlatGeobufError("Invalid FlatGeobuf: unknown property column.")
+        name, kind = columns[index]
+        fmt = _COLUMN_FORMATS.get(kind)
+        if fmt is not None:
+            properties[name] = struct.unpack_from(fmt, buf, pos)[0]
+            pos += struct.calcsize(fmt)
+            continue
+        length = struct.unpack_from("<I", buf, pos)[0]
+        raw = buf[pos + 4 : pos + 4 + length]
+        pos += 4 + length
+        if kind == _BINARY_COLUMN:
+            properties[name] = raw
+        elif kind == _JSON_COLUMN:
+            properties[name] = json.loads(raw)
+        else:
+            properties[name] = raw.decode("utf-8")
+    return properties
+
+
+def _coordinates(geometry: _Table, kind: int) -> Any:
+    """Rebuild the GeoJSON coordinates of a geometry from its flat arrays."""
+    if kind == 6:
+        return [_coordinates(part, 3) for part in geometry.tables(7)]
+    xy = geometry.vector(1, "<f8")
+    points = np.zeros((0, 2)) if xy is None else xy.reshape(-1, 2)
+    if kind == 1:
+        return points[0].tolist() if len(points) else []
+    if kind in (2, 4):
+        return points.tolist()
+    ends = geometry.vector(0, "<u4")
+    if ends is None or not len(ends):
+        return [points.tolist()]
+    starts = np.concatenate([[0], ends[:-1]])
+    return [points[s:e].tolist() for s, e in zip(starts.tolist(), ends.tolist())]
+
+
+def _crs(header: _Table) -> str | None:
+    """Get the CRS of a header as "org:code", or its WKT, or None if unset."""
+    crs = header.table(10)
+    if crs is None:
+        return None
+    code = crs.scalar(1, "<i") or crs.string(5)
+    if code:
+        return f"{crs.string(0) or 'EPSG'}:{code}"
+    return crs.string(4)
+
+
+def _calc_index_size(count: int, node_capacity: int) -> int:
+    node_capacity = min(max(node_capacity, 2), 65535)
+    n = nodes = count
+    while True:
+        n = math.ceil(n / node_capacity)
+        nodes += n
+        if n == 1:
+            return nodes * NODE_SIZE
+
+
+class FlatGeobufReader:
+    """Reads the features of a FlatGeobuf file one at a time, as GeoJSON.
+
+    Features are decoded straight from the FlatBuffers tables without an
+    extra dependency; the file's spatial index is skipped, since features
+    are read in order. Each feature comes out as a GeoJSON Feature dict
+    with its properties. Point, line and polygon types are supported, in
+    two dimensions: Z and M values are dropped. ``crs`` is the header's
+    coordinate reference system, if it names one. ``bytes_read`` tracks
+    the input consumed, for progress.
+    """
+
+    def __init__(self, file: BinaryIO):
+        self._file = file
+        self.bytes_read = 0
+        magic = self._read(8)
+        if magic[:7] != MAGIC:
+            raise FlatGeobufError("Invalid FlatGeobuf: bad magic bytes.")
+        data = self._sized()
+        if data is None:
+            raise FlatGeobufError("Invalid FlatGeobuf: missing header.")
+        header = _Table.root(memoryview(data))
+        self.name = header.string(0)
+        self.geometry_type = header.scalar(2, "<B")
+        self.columns = _columns(header, 7)
+        self.crs = _crs(header)
+        self.features_count = header.scalar(8, "<Q")
+        index_node_size = header.scalar(9, "<H", 16)
+        if index_node_size and self.features_count:
+            self._read(_calc_index_size(self.features_count, index_node_size))
+
+    def _read(self, size: int) -> bytes:
+        data = self._file.read(size)
+        self.bytes_read += len(data)
+        if len(data) < size:
+            raise FlatGeobufError("Invalid FlatGeobuf: unexpected end of file.")
+        return data
+
+    def _sized(self) -> bytes | None:
+        """Read one size-prefixed FlatBuffer, or None at the end of the file."""
+        prefix = self._file.read(4)
+        self.bytes_read += len(prefix)
+        if not prefix:
+            return None
+        if len(prefix) < 4:
+            raise FlatGeobufError("Invalid FlatGeobuf: unexpected end of file.")
+        return self._read(struct.unpack("<I", prefix)[0])
+
+    def __iter__(self) -> Iterator[dict]:
+        while (data := self._sized()) is not None:
+            feature = _Table.root(memoryview(data))
+            columns = _columns(feature, 2) or self.columns
+            geometry = None
+            table = feature.table(0)
+            if table is not None:
+                kind = table.scalar(6, "<B") or self.geometry_type
+                if kind not in GEOMETRY_TYPES:
+                    raise FlatGeobufError(
+                        f"Invalid FlatGeobuf: unsupported geometry type {kind}."
+                    )
+                geometry = {
+                    "type": GEOMETRY_TYPES[kind],
+                    "coordinates": _coordinates(table, kind),
+                }
+            yield {
+                "type": "Feature",
+                "properties": _properties(feature.vector(1, "<u1"), columns),
+                "geometry": geometry,
+            }
\ No newline at end of file
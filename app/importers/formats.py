@@ -0,0 +1,98 @@
+import re
+import struct
+import zipfile
+from typing import BinaryIO, Callable, Iterable, NamedTuple
+from .flatgeobuf import MAGIC, FlatGeobufReader
+from .geojson import FeatureStream
+from .gpx import GPXReader
+from .kml import KMLReader
+from .shapefile import SHP_FILE_CODE, ShapefileReader
+from .tabular import CsvWktReader
+
+# Bytes read from the start of an upload to tell its format.
+SNIFF_SIZE = 4096
+
+_XML_ROOT = re.compile(rb"<(?:[\w.-]+:)?(kml|gpx)[\s>/]")
+
+
+class ImportFormatError(ValueError):
+    pass
+
+
+class ImportFormat(NamedTuple):
+    """A file format fields can be imported from.
+
+    ``reader`` opens a binary file and gives an iterable of GeoJSON Feature
+    dicts with a ``bytes_read`` attribute, for progress. Formats following
+    the GeoJSON ``right_hand_rule`` have their ring winding checked.
+    """
+
+    label: str
+    media_type: str
+    extensions: tuple[str, ...]
+    reader: Callable[[BinaryIO], Iterable[dict]]
+    right_hand_rule: bool = False
+
+
+IMPORT_FORMATS: dict[str, ImportFormat] = {
+    "geojson": ImportFormat(
+        "GeoJSON",
+        "application/geo+json",
+        (".geojson", ".json"),
+        lambda file: FeatureStream(file.read),
+        right_hand_rule=True,
+    ),
+    "flatgeobuf": ImportFormat(
+        "FlatGeobuf", "application/octet-stream", (".fgb",), FlatGeobufReader
+    ),
+    "shapefile": ImportFormat(
+        "Shapefile", "application/zip", (".zip",), ShapefileReader
+    ),
+    "kml": ImportFormat(
+        "KML", "application/vnd.google-earth.kml+xml", (".kml", ".kmz"), KMLReader
+    ),
+    "gpx": ImportFormat("GPX", "application/gpx+xml", (".gpx",), GPXReader),
+    "csv": ImportFormat("CSV", "text/csv", (".csv",), CsvWktReader),
+}
+
+
+def _sniff(file: BinaryIO) -> str:
+    head = file.read(SNIFF_SIZE)
+    if head.startswith(MAGIC):
+        return "flatgeobuf"
+    if len(head) >= 4 and struct.unpack_from(">i", head)[0] == SHP_FILE_CODE:
+        return "shapefile"
+    if zipfile.is_zipfile(file):
+        names = [n.lower() for n in zipfile.ZipFile(file).namelist()]
+        if any(n.endswith(".kml") for n in names):
+            return "kml"
+        if any(n.endswith(".shp") for n in names):
+            return "shapefile"
+        raise ImportFormatError("The archive holds neither a shapefile nor KML.")
+    text = head.removeprefix(b"\xef\xbb\xbf").lstrip()
+    if text.startswith(b"{"):
+        return "geojson"
+    if text.startswith(b"<"):
+        match = _XML_ROOT.search(text)
+        if match is None:
+            raise ImportFormatError("Unsupported XML: expected KML or GPX.")
+        return match.group(1).decode()
+    return "csv"
+
+
+def detect_format(path: str) -> str:
+    """Get the IMPORT_FORMATS key of a file, judged by its content.
+
+    Zip archives are told apart by their members, XML by its root element;
+    anything else that isn't GeoJSON or FlatGeobuf is read as CSV.
+    """
+    with open(path, "rb") as file:
+        return _sniff(file)
+
+
+def upload_types() -> dict[str, list[str]]:
+    """Get the media types and extensions the upload field accepts."""
+    types: dict[str, list[str]] = {}
+    for import_format in IMPORT_FORMATS.values():
+        types.setdefault(import_format.media_type, []).extend(import_format.extensions)
+    return types
\ No newline at end of file
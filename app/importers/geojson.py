@@ -0,0 +1,143 @@
+import codecs
+import json
+from typing import Any, Callable, Iterator
+import numpy as np
+
+CHUNK_SIZE = 1 << 16
+
+_WHITESPACE = " \t\n\r"
+
+
+class GeoJSONError(ValueError):
+    pass
+
+
+class FeatureStream:
+    """Reads the features of a GeoJSON FeatureCollection one at a time.
+
+    Only the current feature and one read chunk are held in memory, so a
+    cadastre of any size is parsed in constant space. ``bytes_read`` tracks
+    how much of the input has been consumed, for progress reporting.
+    Members other than ``features`` are decoded whole and ``type`` must be
+    "FeatureCollection"; writers normally put it first, and when it comes
+    last the error is only raised after the features have been read. The
+    name of a legacy ``crs`` member is kept as ``crs`` once it is read.
+    """
+
+    def __init__(self, read: Callable[[int], bytes], chunk_size: int = CHUNK_SIZE):
+        self._read = read
+        self._chunk_size = chunk_size
+        self._decoder = codecs.getincrementaldecoder("utf-8-sig")()
+        self._json = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+        self.bytes_read = 0
+        self.crs: str | None = None
+
+    def _fill(self) -> bool:
+        """Read another chunk into the buffer, or return False at the end."""
+        if self._eof:
+            return False
+        chunk = self._read(self._chunk_size)
+        self.bytes_read += len(chunk)
+        if not chunk:
+            self._eof = True
+        if self._pos:
+            self._buffer = self._buffer[self._pos :]
+            self._pos = 0
+        self._buffer += self._decoder.decode(chunk, final=not chunk)
+        return True
+
+    def _peek(self) -> str:
+        """Skip whitespace and get the next character, or "" at the end."""
+        while True:
+            while self._pos < len(self._buffer):
+                if self._buffer[self._pos] not in _WHITESPACE:
+                    return self._buffer[self._pos]
+                self._pos += 1
+            if not self._fill():
+                return ""
+
+    def _expect(self, chars: str) -> str:
+        char = self._peek()
+        if not char or char not in chars:
+            found = repr(char) if char else "end of file"
+            raise GeoJSONError(f"Invalid GeoJSON: expected {chars!r}, found {found}.")
+        self._pos += 1
+        return char
+
+    def _value(self) -> Any:
+        self._peek()
+        while True:
+            try:
+                value, end = self._json.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError as e:
+                if not self._fill():
+                    raise GeoJSONError(f"Invalid GeoJSON: {e.msg}.") from e
+                continue
+            # A number at the end of the buffer may continue in the next chunk.
+            if end < len(self._buffer) or not self._fill():
+                self._pos = end
+                return value
+
+    def __iter__(self) -> Iterator[dict]:
+        self._expect("{")
+        collection_type = None
+        if self._peek() == "}":
+            raise GeoJSONError("Invalid GeoJSON: Must be a FeatureCollection.")
+        while True:
+            key = self._value()
+            self._expect(":")
+            if key == "features":
+                self._expect("[")
+                if self._peek() == "]":
+                    self._pos += 1
+                else:
+                    while True:
+                        yield self._value()
+                        if self._expect(",]") == "]":
+                            break
+            else:
+                value = self._value()
+                if key == "type":
+                    collection_type = value
+                    if value != "FeatureCollection":
+                        raise GeoJSONError(
+                            "Invalid GeoJSON: Must be a FeatureCollection."
+                        )
+                elif key == "crs" and isinstance(value, dict):
+                    properties = value.get("properties") or {}
+                    name = properties.get("name") or properties.get("code")
+                    self.crs = None if name is None else str(name)
+            if self._expect(",}") == "}":
+                break
+        if collection_type != "FeatureCollection":
+            raise GeoJSONError("Invalid GeoJSON: Must be a FeatureCollection.")
+
+
+def geometry_polygons(geometry: dict | None) -> list[list[np.ndarray]]:
+    """Get the polygons of a Polygon or MultiPolygon geometry as ring arrays.
+
+    Each polygon is its outer ring followed by its holes, every ring an
+    (n, 2) array of (lng, lat) as written, extra dimensions dropped. Other
+    geometry types give no polygons; malformed coordinates raise
+    GeoJSONError.
+    """
+    geometry = geometry or {}
+    coordinates = geometry.get("coordinates") or []
+    if geometry.get("type") == "Polygon":
+        coordinates = [coordinates]
+    elif geometry.get("type") != "MultiPolygon":
+        return []
+    polygons = []
+    try:
+        for polygon in coordinates:
+            rings = [np.array(ring, dtype=np.float64) for ring in polygon]
+            if any(r.ndim != 2 or r.shape[1] < 2 for r in rings):
+                raise ValueError("rings must be lists of positions")
+            if rings:
+                polygons.append([r[:, :2] for r in rings])
+    except (TypeError, ValueError) as e:
+        raise GeoJSONError(f"Invalid GeoJSON: {e}.") from e
+    return polygons
\ No newline at end of file
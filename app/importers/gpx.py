@@ -0,0 +1,102 @@
+from typing import BinaryIO, Iterator
+from xml.etree import ElementTree
+from .kml import local_name
+from .sources import CountingReader
+
+
+class GPXError(ValueError):
+    pass
+
+
+def _ring(points) -> list[list[float]]:
+    """Get the positions of track or route points, closed back to the start."""
+    ring = [[float(p.get("lon")), float(p.get("lat"))] for p in points]
+    if ring and ring[0] != ring[-1]:
+        ring.append(ring[0])
+    return ring
+
+
+def _geometry(element) -> dict | None:
+    """Get the boundary walked along a track or route as a polygon.
+
+    Each segment of a track is one part, so a track of several segments
+    gives a MultiPolygon.
+    """
+    if local_name(element.tag) == "rte":
+        segments = [[p for p in element if local_name(p.tag) == "rtept"]]
+    else:
+        segments = [
+            [p for p in segment if local_name(p.tag) == "trkpt"]
+            for segment in element
+            if local_name(segment.tag) == "trkseg"
+        ]
+    polygons = [[_ring(points)] for points in segments if points]
+    if not polygons:
+        return None
+    if len(polygons) == 1:
+        return {"type": "Polygon", "coordinates": polygons[0]}
+    return {"type": "MultiPolygon", "coordinates": polygons}
+
+
+def _properties(element) -> dict:
+    """Get a track's name and description and the values in its extensions."""
+    properties = {}
+    for child in element:
+        tag = local_name(child.tag)
+        if tag in ("name", "desc", "type"):
+            properties[tag] = (child.text or "").strip()
+        elif tag == "extensions":
+            for value in child.iter():
+                if len(value) == 0 and value is not child:
+                    properties[local_name(value.tag)] = (value.text or "").strip()
+    return properties
+
+
+class GPXReader:
+    """Reads the tracks and routes of a GPX file one at a time, as GeoJSON.
+
+    Field agents record a boundary by walking it, so each track or route
+    is taken for a polygon, closed back to its first point. Properties come
+    from the name, description and the leaf elements of its extensions,
+    which is where survey apps put attributes like the farmer's name. The
+    document is parsed incrementally and each element under the root is
+    dropped once read. ``bytes_read`` tracks the input consumed, for
+    progress.
+    """
+
+    def __init__(self, file: BinaryIO):
+        file.seek(0)
+        self._counter = CountingReader(file)
+
+    @property
+    def bytes_read(self) -> int:
+        return self._counter.bytes_read
+
+    def __iter__(self) -> Iterator[dict]:
+        stack = []
+        try:
+            events = ElementTree.iterparse(self._counter, events=("start", "end"))
+            for event, element in events:
+                if event == "start":
+                    if not stack and local_name(element.tag) != "gpx":
+                        raise GPXError("Invalid GPX: the root element isn't gpx.")
+                    stack.append(element)
+                    continue
+                stack.pop()
+                if len(stack) != 1:
+                    continue
+                stack[-1].remove(element)
+                if local_name(element.tag) not in ("trk", "rte"):
+                    continue
+                try:
+                    geometry = _geometry(element)
+                except (TypeError, ValueError):
+                    geometry = None
+                properties = _properties(element)
+                yield {
+                    "type": "Feature",
+                    "geometry": geometry,
+                    "properties": properties,
+                }
+        except ElementTree.ParseError as e:
+            raise GPXError(f"Invalid GPX: {e}.") from e
\ No newline at end of file
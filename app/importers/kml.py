@@ -0,0 +1,124 @@
+import zipfile
+from typing import BinaryIO, Iterator
+from xml.etree import ElementTree
+from .sources import CountingReader, archive_scale
+
+
+class KMLError(ValueError):
+    pass
+
+
+def local_name(tag: str) -> str:
+    """Get a tag's name without its namespace, which KML versions differ in."""
+    return tag.rpartition("}")[2]
+
+
+def _children(element, name: str) -> list:
+    return [child for child in element if local_name(child.tag) == name]
+
+
+def _coordinates(element) -> list[list[float]]:
+    """Get the positions of a LinearRing's "lng,lat[,alt]" tuples."""
+    for child in element.iter():
+        if local_name(child.tag) == "coordinates":
+            text = child.text or ""
+            return [[float(v) for v in t.split(",")[:2]] for t in text.split()]
+    return []
+
+
+def _polygon(element) -> list[list[list[float]]]:
+    rings = []
+    for boundary in ("outerBoundaryIs", "innerBoundaryIs"):
+        for side in _children(element, boundary):
+            for ring in _children(side, "LinearRing"):
+                rings.append(_coordinates(ring))
+    return rings
+
+
+def _geometry(placemark) -> dict | None:
+    """Get the polygons of a Placemark, also from within MultiGeometry."""
+    polygons = [
+        _polygon(element)
+        for element in placemark.iter()
+        if local_name(element.tag) == "Polygon"
+    ]
+    if not polygons:
+        return None
+    if len(polygons) == 1:
+        return {"type": "Polygon", "coordinates": polygons[0]}
+    return {"type": "MultiPolygon", "coordinates": polygons}
+
+
+def _properties(placemark) -> dict:
+    """Get a Placemark's name and its ExtendedData values, typed or not."""
+    properties = {}
+    for child in placemark:
+        if local_name(child.tag) in ("name", "description"):
+            properties[local_name(child.tag)] = (child.text or "").strip()
+    for element in placemark.iter():
+        tag = local_name(element.tag)
+        if tag == "Data":
+            value = next((c.text for c in _children(element, "value")), None)
+            properties[element.get("name")] = value
+        elif tag == "SimpleData":
+            properties[element.get("name")] = element.text
+    return properties
+
+
+class KMLReader:
+    """Reads the Placemarks of a KML or KMZ file one at a time, as GeoJSON.
+
+    The document is parsed incrementally and each Placemark is dropped from
+    the tree once read, so memory stays flat however many there are. Its
+    polygons, from any MultiGeometry, become a Polygon or MultiPolygon, and
+    its name and ExtendedData its properties. A Placemark with malformed
+    coordinates comes out without a geometry. A KMZ archive is read from
+    its doc.kml, or else its first .kml file. ``bytes_read`` tracks the
+    input consumed, for progress.
+    """
+
+    def __init__(self, file: BinaryIO):
+        if zipfile.is_zipfile(file):
+            file.seek(0)
+            archive = zipfile.ZipFile(file)
+            names = [n for n in archive.namelist() if n.lower().endswith(".kml")]
+            if not names:
+                raise KMLError("Invalid KMZ: no .kml file in the archive.")
+            info = archive.getinfo("doc.kml" if "doc.kml" in names else names[0])
+            scale = archive_scale(file, info.file_size)
+            self._counter = CountingReader(archive.open(info), scale)
+        else:
+            file.seek(0)
+            self._counter = CountingReader(file)
+
+    @property
+    def bytes_read(self) -> int:
+        return self._counter.bytes_read
+
+    def __iter__(self) -> Iterator[dict]:
+        stack = []
+        try:
+            events = ElementTree.iterparse(self._counter, events=("start", "end"))
+            for event, element in events:
+                if event == "start":
+                    if not stack and local_name(element.tag) != "kml":
+                        raise KMLError("Invalid KML: the root element isn't kml.")
+                    stack.append(element)
+                    continue
+                stack.pop()
+                if local_name(element.tag) != "Placemark":
+                    continue
+                try:
+                    geometry = _geometry(element)
+                except ValueError:
+                    geometry = None
+                properties = _properties(element)
+                if stack:
+                    stack[-1].remove(element)
+                yield {
+                    "type": "Feature",
+                    "geometry": geometry,
+                    "properties": properties,
+                }
+        except ElementTree.ParseError as e:
+            raise KMLError(f"Invalid KML: {e}.") from e
\ No newline at end of file
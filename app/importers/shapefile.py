@@ -0,0 +1,205 @@
+import codecs
+import struct
+import zipfile
+from typing import BinaryIO, Iterator
+import numpy as np
+from .sources import CountingReader, archive_scale
+
+SHP_FILE_CODE = 9994
+# Polygon, PolygonZ and PolygonM records start alike; the rest is skipped.
+POLYGON_TYPES = {5, 15, 25}
+NULL_SHAPE = 0
+DBF_HEADER_END = 0x0D
+
+
+class ShapefileError(ValueError):
+    pass
+
+
+def _read(file: BinaryIO, size: int) -> bytes:
+    data = file.read(size)
+    if len(data) < size:
+        raise ShapefileError("Invalid shapefile: unexpected end of file.")
+    return data
+
+
+def _contains(ring: np.ndarray, point: np.ndarray) -> bool:
+    """Whether a point lies inside a ring, by counting edge crossings."""
+    x, y = point
+    x1, y1 = ring[:, 0], ring[:, 1]
+    x2, y2 = np.roll(x1, -1), np.roll(y1, -1)
+    crosses = (y1 > y) != (y2 > y)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        at = x1 + (y - y1) * (x2 - x1) / (y2 - y1)
+    return bool(np.count_nonzero(crosses & (x < at)) % 2)
+
+
+def _polygons(rings: list[np.ndarray]) -> list[list[np.ndarray]]:
+    """Group the rings of a shape into polygons by how they nest.
+
+    A ring inside an odd number of others is a hole of the innermost one;
+    the rest are outer rings. Nesting is used rather than winding order,
+    which not every writer gets right.
+    """
+    inside = [
+        [j for j, other in enumerate(rings) if j != i and _contains(other, ring[0])]
+        for i, ring in enumerate(rings)
+    ]
+    depth = [len(parents) for parents in inside]
+    polygons: dict[int, list[np.ndarray]] = {}
+    for i, ring in enumerate(rings):
+        if depth[i] % 2 == 0:
+            polygons.setdefault(i, []).insert(0, ring)
+        else:
+            parent = next(j for j in inside[i] if depth[j] == depth[i] - 1)
+            polygons.setdefault(parent, []).append(ring)
+    return list(polygons.values())
+
+
+def _geometry(content: bytes) -> dict | None:
+    shape_type = struct.unpack_from("<i", content)[0]
+    if shape_type == NULL_SHAPE:
+        return None
+    if shape_type not in POLYGON_TYPES:
+        raise ShapefileError(
+            f"Unsupported shapefile: shape type {shape_type} isn't a polygon."
+        )
+    parts_count, points_count = struct.unpack_from("<2i", content, 36)
+    parts = np.frombuffer(content, "<i4", parts_count, 44).tolist()
+    points = np.frombuffer(content, "<f8", 2 * points_count, 44 + 4 * parts_count)
+    points = points.reshape(-1, 2)
+    rings = [
+        points[start:end]
+        for start, end in zip(parts, [*parts[1:], points_count])
+        if end - start >= 3
+    ]
+    polygons = [[ring.tolist() for ring in p] for p in _polygons(rings)]
+    if not polygons:
+        return None
+    if len(polygons) == 1:
+        return {"type": "Polygon", "coordinates": polygons[0]}
+    return {"type": "MultiPolygon", "coordinates": polygons}
+
+
+class _DbfFields:
+    """The columns of a dBASE table and how to decode its records."""
+
+    def __init__(self, file: BinaryIO, encoding: str | None):
+        header = _read(file, 32)
+        header_size, self.record_size = struct.unpack_from("<2H", header, 8)
+        descriptors = _read(file, header_size - 32)
+        self.columns: list[tuple[str, str, int, int]] = []
+        offset = 1
+        for start in range(0, len(descriptors) - 1, 32):
+            descriptor = descriptors[start : start + 32]
+            if descriptor[0] == DBF_HEADER_END:
+                break
+            name = descriptor[:11].split(b"\0")[0].decode("ascii", "replace")
+            kind, size = chr(descriptor[11]), descriptor[16]
+            self.columns.append((name, kind, offset, size))
+            offset += size
+        self._encoding = encoding
+
+    def _text(self, raw: bytes) -> str:
+        if self._encoding:
+            return raw.decode(self._encoding, "replace").strip()
+        try:
+            return raw.decode("utf-8").strip()
+        except UnicodeDecodeError:
+            return raw.decode("latin-1").strip()
+
+    def decode(self, record: bytes) -> dict | None:
+        """Get a record's values, or None if it was deleted."""
+        if record[:1] == b"*":
+            return None
+        values = {}
+        for name, kind, offset, size in self.columns:
+            text = self._text(record[offset : offset + size])
+            if not text or kind == "C":
+                values[name] = text or None
+            elif kind in "NF":
+                try:
+                    number = float(text)
+                except ValueError:
+                    number = None
+                values[name] = number
+            elif kind == "L":
+                values[name] = None if text == "?" else text[0] in "YyTt"
+            elif kind == "D" and len(text) == 8:
+                values[name] = f"{text[:4]}-{text[4:6]}-{text[6:]}"
+            else:
+                values[name] = text
+        return values
+
+
+class ShapefileReader:
+    """Reads the polygons of a zipped shapefile one at a time, as GeoJSON.
+
+    The .shp geometries and .dbf attributes are read in step straight from
+    the archive, without an extra dependency. Parts nested in one another
+    become holes, and shapes of several outer rings MultiPolygons. Text is
+    decoded as the .cpg file says, else as UTF-8 falling back to Latin-1.
+    Coordinates must be longitude and latitude: an archive whose .prj is a
+    projected system is refused. ``bytes_read`` tracks the input consumed,
+    for progress.
+    """
+
+    def __init__(self, file: BinaryIO):
+        if not zipfile.is_zipfile(file):
+            raise ShapefileError(
+                "Upload shapefiles as a .zip of their .shp, .dbf and .prj files."
+            )
+        file.seek(0)
+        archive = zipfile.ZipFile(file)
+        members = {n.lower(): n for n in archive.namelist()}
+        shp = next((n for n in members if n.endswith(".shp")), None)
+        if shp is None:
+            raise ShapefileError("Invalid shapefile: no .shp file in the archive.")
+        stem = shp[:-4]
+        if f"{stem}.dbf" not in members:
+            raise ShapefileError("Invalid shapefile: the .dbf file is missing.")
+        if f"{stem}.prj" in members:
+            prj = archive.read(members[f"{stem}.prj"]).decode("latin-1")
+            if prj.lstrip().upper().startswith("PROJCS"):
+                raise ShapefileError(
+                    "Unsupported shapefile: coordinates are projected; "
+                    "export it in WGS 84 longitude and latitude."
+                )
+        encoding = None
+        if f"{stem}.cpg" in members:
+            name = archive.read(members[f"{stem}.cpg"]).decode("ascii").strip()
+            encoding = f"cp{name}" if name.isdigit() else name
+            try:
+                codecs.lookup(encoding)
+            except LookupError:
+                encoding = None
+        info = archive.getinfo(members[shp])
+        self._shp = CountingReader(
+            archive.open(info), archive_scale(file, info.file_size)
+        )
+        self._dbf = archive.open(members[f"{stem}.dbf"])
+        header = _read(self._shp, 100)
+        if struct.unpack_from(">i", header)[0] != SHP_FILE_CODE:
+            raise ShapefileError("Invalid shapefile: bad file code.")
+        self._fields = _DbfFields(self._dbf, encoding)
+
+    @property
+    def bytes_read(self) -> int:
+        return self._shp.bytes_read
+
+    def __iter__(self) -> Iterator[dict]:
+        while header := self._shp.read(8):
+            if len(header) < 8:
+                raise ShapefileError("Invalid shapefile: unexpected end of file.")
+            size = struct.unpack(">2i", header)[1] * 2
+            content = _read(self._shp, size)
+            properties = self._fields.decode(_read(self._dbf, self._fields.record_size))
+            if properties is None:
+                continue
+            try:
+                geometry = _geometry(content)
+            except ShapefileError:
+                raise
+            except (struct.error, ValueError):
+                geometry = None
+            yield {"type": "Feature", "geometry": geometry, "properties": properties}
\ No newline at end of file
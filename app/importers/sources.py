@@ -0,0 +1,36 @@
+import io
+from typing import BinaryIO
+
+
+class CountingReader(io.RawIOBase):
+    """A read-only file passing reads through and counting the bytes read.
+
+    ``bytes_read`` is scaled by ``scale``, so reading a member of a zip
+    archive can report progress in bytes of the archive instead.
+    """
+
+    def __init__(self, file: BinaryIO, scale: float = 1.0):
+        self._file = file
+        self._scale = scale
+        self._count = 0
+
+    @property
+    def bytes_read(self) -> int:
+        return int(self._count * self._scale)
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = self._file.read(len(buffer))
+        buffer[: len(data)] = data
+        self._count += len(data)
+        return len(data)
+
+
+def archive_scale(file: BinaryIO, member_size: int) -> float:
+    """Get the archive bytes per byte of a member, for ``CountingReader``."""
+    file.seek(0, io.SEEK_END)
+    size = file.tell()
+    file.seek(0)
+    return size / member_size if member_size else 1.0
\ No newline at end of file
@@ -0,0 +1,48 @@
+import csv
+import io
+from typing import BinaryIO, Iterator
+from .sources import CountingReader
+from .wkt import WKTError, parse_wkt
+
+# Header names, in any case, taken for the column holding the geometry.
+WKT_COLUMNS = ("wkt", "geometry", "geom", "the_geom", "shape")
+
+
+class CsvWktReader:
+    """Reads the rows of a CSV file with a WKT geometry column, as GeoJSON.
+
+    The geometry column is the first whose header is one of WKT_COLUMNS;
+    the other columns become string properties. A row whose geometry
+    doesn't parse comes out without one, so it is rejected and reported
+    like any other invalid feature. ``bytes_read`` tracks the input
+    consumed, for progress.
+    """
+
+    def __init__(self, file: BinaryIO):
+        self._counter = CountingReader(file)
+        text = io.TextIOWrapper(
+            io.BufferedReader(self._counter), encoding="utf-8-sig", newline=""
+        )
+        self._rows = csv.DictReader(text)
+        headers = self._rows.fieldnames or []
+        self.geometry_column = next(
+            (h for h in headers if h.strip().lower() in WKT_COLUMNS), None
+        )
+        if self.geometry_column is None:
+            raise WKTError(
+                f"Invalid CSV: no geometry column (one of {', '.join(WKT_COLUMNS)})."
+            )
+
+    @property
+    def bytes_read(self) -> int:
+        return self._counter.bytes_read
+
+    def __iter__(self) -> Iterator[dict]:
+        for row in self._rows:
+            text = row.pop(self.geometry_column, None) or ""
+            try:
+                geometry = parse_wkt(text)
+            except WKTError:
+                geometry = None
+            properties = {k: v for k, v in row.items() if k is not None}
+            yield {"type": "Feature", "geometry": geometry, "properties": properties}
\ No newline at end of file
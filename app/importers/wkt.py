@@ -0,0 +1,93 @@
+import re
+
+_TOKENS = re.compile(r"\s*(\(|\)|,|[A-Za-z]+|[-+0-9.eE]+)")
+
+
+class WKTError(ValueError):
+    pass
+
+
+class _Tokens:
+    def __init__(self, text: str):
+        self._tokens = _TOKENS.findall(text)
+        if "".join(self._tokens) != re.sub(r"\s+", "", text):
+            raise WKTError("Invalid WKT: unexpected characters.")
+        self._pos = 0
+
+    def peek(self) -> str | None:
+        return self._tokens[self._pos] if self._pos < len(self._tokens) else None
+
+    def next(self) -> str:
+        token = self.peek()
+        if token is None:
+            raise WKTError("Invalid WKT: unexpected end of text.")
+        self._pos += 1
+        return token
+
+    def expect(self, token: str):
+        if self.next() != token:
+            raise WKTError(f'Invalid WKT: expected "{token}".')
+
+    @property
+    def done(self) -> bool:
+        return self._pos == len(self._tokens)
+
+
+def _ring(tokens: _Tokens) -> list[list[float]]:
+    tokens.expect("(")
+    positions = []
+    while True:
+        position = []
+        while tokens.peek() not in (",", ")", None):
+            try:
+                position.append(float(tokens.next()))
+            except ValueError as e:
+                raise WKTError(f"Invalid WKT: {e}.") from e
+        if len(position) < 2:
+            raise WKTError("Invalid WKT: positions need two coordinates.")
+        positions.append(position[:2])
+        if tokens.next() == ")":
+            return positions
+
+
+def _rings(tokens: _Tokens) -> list[list[list[float]]]:
+    tokens.expect("(")
+    rings = [_ring(tokens)]
+    while tokens.next() == ",":
+        rings.append(_ring(tokens))
+    return rings
+
+
+def parse_wkt(text: str) -> dict | None:
+    """Get a POLYGON or MULTIPOLYGON in Well-Known Text as a GeoJSON geometry.
+
+    Z and M values are dropped, an EWKT "SRID=...;" prefix is skipped and
+    EMPTY geometries give None. Other types and malformed text raise
+    WKTError.
+    """
+    if text.lstrip().upper().startswith("SRID="):
+        text = text.partition(";")[2]
+    tokens = _Tokens(text)
+    kind = tokens.next().upper()
+    if kind not in ("POLYGON", "MULTIPOLYGON"):
+        raise WKTError(f"Unsupported WKT geometry: {kind}.")
+    if tokens.peek() and tokens.peek().upper() in ("Z", "M", "ZM"):
+        tokens.next()
+    if tokens.peek() and tokens.peek().upper() == "EMPTY":
+        tokens.next()
+        coordinates = None
+    elif kind == "POLYGON":
+        coordinates = _rings(tokens)
+    else:
+        tokens.expect("(")
+        coordinates = [_rings(tokens)]
+        while tokens.next() == ",":
+            coordinates.append(_rings(tokens))
+    if not tokens.done:
+        raise WKTError("Invalid WKT: text after the geometry.")
+    if coordinates is None:
+        return None
+    return {
+        "type": "Polygon" if kind == "POLYGON" else "MultiPolygon",
+        "coordinates": coordinates,
+    }
\ No newline at end of file
@@ -1,6 +1,8 @@
 import reflex as rx
 from app.states.admin_state import AdminState
 from app.states.map_state import MapState, Farmer, Field, Cooperative, PointOfInterest
+from app.importers import upload_types
+from app.store import FieldOverlap, JobStatus, ReferenceLayerInfo
 
 
 def form_label(text: str) -> rx.Component:
@@ -45,11 +47,29 @@ def form_select(
     )
 
 
+def pager(table_name: str) -> rx.Component:
+    return rx.el.div(
+        rx.el.span(AdminState.table_ranges[table_name], class_name="text-xs"),
+        rx.el.button(
+            "Previous",
+            on_click=AdminState.previous_page(table_name),
+            class_name="font-medium text-blue-600 hover:underline text-xs",
+        ),
+        rx.el.button(
+            "Next",
+            on_click=AdminState.next_page(table_name),
+            class_name="font-medium text-blue-600 hover:underline text-xs",
+        ),
+        class_name="flex items-center justify-end gap-4 px-6 py-3 text-gray-500 border-t",
+    )
+
+
 def crud_section(
     title: str,
     button_text: str,
     on_button_click: rx.event.EventHandler,
     table: rx.Component,
+    table_name: str,
 ) -> rx.Component:
     return rx.el.div(
         rx.el.div(
@@ -64,6 +84,7 @@ def crud_section(
         ),
         rx.el.div(
             table,
+            pager(table_name),
             class_name="bg-white border border-gray-200 rounded-lg shadow-sm overflow-hidden",
         ),
         class_name="mb-12",
@@ -134,6 +155,18 @@ def farmer_form_content() -> rx.Component:
     )
 
 
+def repair_rings_checkbox() -> rx.Component:
+    return rx.el.label(
+        rx.el.input(
+            type="checkbox",
+            checked=AdminState.repair_rings,
+            on_change=AdminState.toggle_repair_rings,
+        ),
+        "Fix unclosed, clockwise and repeated-vertex outlines instead of rejecting them",
+        class_name="flex items-center gap-2 text-sm text-gray-700",
+    )
+
+
 def field_form_content() -> rx.Component:
     return rx.el.div(
         form_label("Farmer"),
@@ -162,6 +195,12 @@ def field_form_content() -> rx.Component:
             AdminState.form_field_polygon,
             AdminState.set_form_field_polygon,
         ),
+        repair_rings_checkbox(),
+        rx.cond(
+            AdminState.field_form_error,
+            rx.el.p(AdminState.field_form_error, class_name="text-sm text-red-600"),
+            None,
+        ),
         class_name="flex flex-col gap-2 mt-4",
     )
 
@@ -240,6 +279,174 @@ def action_buttons(
     )
 
 
+def job_row(job: JobStatus) -> rx.Component:
+    is_active = (job["state"] == "queued") | (job["state"] == "running")
+    return rx.el.div(
+        rx.el.div(
+            rx.el.span(job["kind"], class_name="font-medium text-gray-800"),
+            rx.el.span(job["state"], class_name="text-xs uppercase text-gray-500"),
+            rx.cond(
+                is_active,
+                rx.el.button(
+                    "Cancel",
+                    on_click=AdminState.cancel_job(job["id"]),
+                    class_name="ml-auto text-xs text-red-600 hover:underline",
+                ),
+                None,
+            ),
+            class_name="flex items-center gap-2",
+        ),
+        rx.el.p(
+            f"{job['processed']} features processed, {job['rejected']} rejected",
+            rx.cond(
+                is_active & (job["eta_seconds"] >= 0),
+                f" ({job['percent']}%, about {job['eta_seconds']}s left)",
+                "",
+            ),
+            class_name="text-sm text-gray-600",
+        ),
+        rx.cond(
+            job["message"] != "",
+            rx.el.p(job["message"], class_name="text-sm text-gray-500"),
+            None,
+        ),
+        rx.el.ul(
+            rx.foreach(
+                job["warnings"],
+                lambda warning: rx.el.li(warning, class_name="text-xs text-amber-700"),
+            ),
+            class_name="list-disc pl-5",
+        ),
+        class_name="p-3 border border-gray-200 rounded-lg bg-white",
+    )
+
+
+def import_status() -> rx.Component:
+    return rx.el.div(
+        rx.cond(
+            AdminState.import_summary,
+            rx.el.p(
+                AdminState.import_summary["message"].to(str),
+                class_name="text-sm text-red-600",
+            ),
+            None,
+        ),
+        rx.foreach(AdminState.jobs, job_row),
+        class_name="flex flex-col gap-2 mt-4",
+    )
+
+
+def overlap_row(overlap: FieldOverlap) -> rx.Component:
+    return rx.el.tr(
+        table_cell(overlap["field_id"]),
+        table_cell(overlap["other_id"]),
+        table_cell(overlap["overlap_area"].to_string()),
+        table_cell(f"{overlap['overlap_percent']}%"),
+        table_cell(rx.cond(overlap["duplicate"], "Likely duplicate", "Overlap")),
+        class_name="bg-white border-b hover:bg-gray-50",
+    )
+
+
+def overlap_section() -> rx.Component:
+    return rx.el.div(
+        rx.el.div(
+            rx.el.h2(
+                "Overlapping Fields", class_name="text-xl font-semibold text-gray-800"
+            ),
+            rx.el.button(
+                rx.icon("refresh-cw", class_name="mr-2"),
+                "Check Again",
+                on_click=AdminState.refresh_overlaps,
+                class_name="flex items-center px-4 py-2 bg-blue-600 text-white rounded-lg hover:bg-blue-700 transition-colors text-sm",
+            ),
+            class_name="flex justify-between items-center mb-4",
+        ),
+        rx.el.p(
+            f"{AdminState.overlapping_area} ha counted twice in total area",
+            rx.cond(
+                AdminState.overlaps_pending > 0,
+                f"; {AdminState.overlaps_pending} fields still to check",
+                "",
+            ),
+            class_name="text-sm text-gray-600 mb-2",
+        ),
+        rx.el.div(
+            rx.el.table(
+                rx.el.thead(
+                    rx.el.tr(
+                        *[
+                            rx.el.th(cell, scope="col", class_name="px-6 py-3")
+                            for cell in (
+                                "Field",
+                                "Overlaps",
+                                "Overlap (ha)",
+                                "Of Smaller Field",
+                                "Kind",
+                            )
+                        ]
+                    ),
+                    class_name="text-xs text-gray-700 uppercase bg-gray-50",
+                ),
+                rx.el.tbody(rx.foreach(AdminState.overlaps, overlap_row)),
+                class_name="w-full text-sm text-left text-gray-500",
+            ),
+            class_name="bg-white border border-gray-200 rounded-lg shadow-sm overflow-hidden",
+        ),
+        class_name="mb-12",
+    )
+
+
+def reference_layer_row(layer: ReferenceLayerInfo) -> rx.Component:
+    return rx.el.tr(
+        table_cell(layer["name"]),
+        table_cell(layer["format"]),
+        table_cell(rx.cond(layer["indexed"], layer["parts"].to_string(), "-")),
+        table_cell(rx.cond(layer["indexed"], "Indexed", "Not indexed yet")),
+        class_name="bg-white border-b hover:bg-gray-50",
+    )
+
+
+def reference_layer_section() -> rx.Component:
+    return rx.el.div(
+        rx.el.div(
+            rx.el.h2(
+                "Reference Layers", class_name="text-xl font-semibold text-gray-800"
+            ),
+            rx.el.button(
+                rx.icon("shield-alert", class_name="mr-2"),
+                "Screen Fields",
+                on_click=AdminState.screen_reference_layers,
+                class_name="flex items-center px-4 py-2 bg-blue-600 text-white rounded-lg hover:bg-blue-700 transition-colors text-sm",
+            ),
+            class_name="flex justify-between items-center mb-4",
+        ),
+        rx.el.p(
+            f"{AdminState.flagged_fields} screened fields overlap a reference layer. "
+            "Layers are the GeoJSON and FlatGeobuf files in data/reference.",
+            class_name="text-sm text-gray-600 mb-2",
+        ),
+        rx.el.div(
+            rx.el.table(
+                rx.el.thead(
+                    rx.el.tr(
+                        *[
+                            rx.el.th(cell, scope="col", class_name="px-6 py-3")
+                            for cell in ("Layer", "Format", "Polygons", "Index")
+                        ]
+                    ),
+                    class_name="text-xs text-gray-700 uppercase bg-gray-50",
+                ),
+                rx.el.tbody(
+                    rx.foreach(AdminState.reference_layer_info, reference_layer_row)
+                ),
+                class_name="w-full text-sm text-left text-gray-500",
+            ),
+            class_name="bg-white border border-gray-200 rounded-lg shadow-sm overflow-hidden",
+        ),
+        class_name="mb-12",
+    )
+
+
 def admin_page() -> rx.Component:
     return rx.el.div(
         rx.el.header(
@@ -251,6 +458,10 @@ def admin_page() -> rx.Component:
                     class_name="flex items-center text-sm font-medium text-gray-600 hover:text-blue-600",
                 ),
                 rx.el.h1("Admin Dashboard", class_name="text-2xl font-bold"),
+                rx.el.p(
+                    f"Cache: {AdminState.cache_stats['hits']} hits / {AdminState.cache_stats['misses']} misses",
+                    class_name="ml-auto text-xs text-gray-500",
+                ),
                 class_name="flex items-center gap-4",
             ),
             class_name="bg-white border-b p-4 shadow-sm sticky top-0 z-10",
@@ -259,7 +470,7 @@ def admin_page() -> rx.Component:
             rx.el.div(
                 rx.el.div(
                     rx.el.h2(
-                        "Import GeoJSON Data",
+                        "Import Field Data",
                         class_name="text-xl font-semibold text-gray-800 mb-4",
                     ),
                     rx.upload.root(
@@ -269,19 +480,29 @@ def admin_page() -> rx.Component:
                                 class_name="w-10 h-10 text-gray-400 mx-auto",
                             ),
                             rx.el.p(
-                                "Drag and drop a GeoJSON file here, or click to select a file.",
+                                "Drag and drop a field boundary file here, or click to select a file.",
                                 class_name="font-medium mt-2",
                             ),
                             rx.el.p(
-                                "File must be a valid GeoJSON FeatureCollection.",
+                                "GeoJSON, FlatGeobuf, zipped Shapefile, KML/KMZ, GPX or CSV with a WKT column.",
                                 class_name="text-sm text-gray-500",
                             ),
                             class_name="text-center p-8",
                         ),
                         id="geojson-upload",
                         class_name="cursor-pointer bg-gray-50 border-2 border-dashed border-gray-300 rounded-lg hover:bg-gray-100 transition-colors",
-                        accept={"application/json": [".geojson"]},
+                        accept=upload_types(),
+                    ),
+                    rx.el.label(
+                        rx.el.input(
+                            type="checkbox",
+                            checked=AdminState.flag_similar_farmers,
+                            on_change=AdminState.toggle_flag_similar_farmers,
+                        ),
+                        "Flag new farmers whose names nearly match an existing farmer",
+                        class_name="flex items-center gap-2 mt-4 text-sm text-gray-700",
                     ),
+                    rx.el.div(repair_rings_checkbox(), class_name="mt-2"),
                     rx.el.button(
                         "Import Data",
                         on_click=AdminState.handle_upload(
@@ -290,6 +511,7 @@ def admin_page() -> rx.Component:
                         class_name="w-full mt-4 px-4 py-2 bg-blue-600 text-white rounded-lg hover:bg-blue-700 disabled:opacity-50 transition-colors",
                         is_disabled=AdminState.is_uploading,
                     ),
+                    import_status(),
                     class_name="mb-12",
                 ),
                 crud_section(
@@ -300,7 +522,7 @@ def admin_page() -> rx.Component:
                         table_header("ID", "Name"),
                         rx.el.tbody(
                             rx.foreach(
-                                MapState.cooperatives,
+                                AdminState.cooperative_rows,
                                 lambda coop: rx.el.tr(
                                     table_cell(coop["id"]),
                                     table_cell(coop["name"]),
@@ -316,6 +538,7 @@ def admin_page() -> rx.Component:
                         ),
                         class_name="w-full text-sm text-left text-gray-500",
                     ),
+                    "cooperatives",
                 ),
                 crud_section(
                     "Farmers",
@@ -325,7 +548,7 @@ def admin_page() -> rx.Component:
                         table_header("ID", "Name", "Cooperative ID"),
                         rx.el.tbody(
                             rx.foreach(
-                                MapState.farmers,
+                                AdminState.farmer_rows,
                                 lambda farmer: rx.el.tr(
                                     table_cell(farmer["id"]),
                                     table_cell(farmer["name"]),
@@ -340,21 +563,37 @@ def admin_page() -> rx.Component:
                         ),
                         class_name="w-full text-sm text-left text-gray-500",
                     ),
+                    "farmers",
                 ),
                 crud_section(
                     "Fields",
                     "Add Field",
                     AdminState.open_field_dialog,
                     rx.el.table(
-                        table_header("ID", "Farmer ID", "Crop", "Area (ha)"),
+                        table_header(
+                            "ID", "Farmer ID", "Crop", "Area (ha)", "Measured (ha)"
+                        ),
                         rx.el.tbody(
                             rx.foreach(
-                                MapState.fields,
+                                AdminState.field_rows,
                                 lambda field: rx.el.tr(
                                     table_cell(field["id"]),
                                     table_cell(field["farmer_id"]),
                                     table_cell(field["crop"]),
                                     table_cell(field["area"].to_string()),
+                                    rx.el.td(
+                                        field["computed_area"].to_string(),
+                                        title=rx.cond(
+                                            field["area_mismatch"],
+                                            "Declared area differs from the measured area",
+                                            "",
+                                        ),
+                                        class_name=rx.cond(
+                                            field["area_mismatch"],
+                                            "px-6 py-4 font-medium text-red-600 whitespace-nowrap",
+                                            "px-6 py-4 font-medium text-gray-900 whitespace-nowrap",
+                                        ),
+                                    ),
                                     action_buttons(
                                         lambda: AdminState.edit_field(field),
                                         lambda: AdminState.delete_field(field["id"]),
@@ -365,7 +604,10 @@ def admin_page() -> rx.Component:
                         ),
                         class_name="w-full text-sm text-left text-gray-500",
                     ),
+                    "fields",
                 ),
+                overlap_section(),
+                reference_layer_section(),
                 crud_section(
                     "Points of Interest",
                     "Add POI",
@@ -374,13 +616,13 @@ def admin_page() -> rx.Component:
                         table_header("ID", "Name", "Type", "Location"),
                         rx.el.tbody(
                             rx.foreach(
-                                MapState.points_of_interest,
+                                AdminState.poi_rows,
                                 lambda poi: rx.el.tr(
                                     table_cell(poi["id"]),
                                     table_cell(poi["name"]),
                                     table_cell(poi["type"]),
                                     table_cell(
-                                        f"{poi['location'].lat}, {poi['location'].lng}"
+                                        f"{poi['location']['lat']}, {poi['location']['lng']}"
                                     ),
                                     action_buttons(
                                         lambda: AdminState.edit_poi(poi),
@@ -392,6 +634,7 @@ def admin_page() -> rx.Component:
                         ),
                         class_name="w-full text-sm text-left text-gray-500",
                     ),
+                    "pois",
                 ),
                 form_dialog(
                     rx.cond(
@@ -1,7 +1,9 @@
 import reflex as rx
-import json
+import asyncio
+import functools
 import logging
-import time
+import os
+import tempfile
 import uuid
 from app.states.map_state import (
     MapState,
@@ -12,13 +14,65 @@ from app.states.map_state import (
     PointOfInterest,
 )
 from app.states.auth_state import AuthState
+from app.geo import COORDINATE_DECIMALS, validate_rings
+from app.importers import IMPORT_FORMATS, detect_format, import_fields
+from app.store import (
+    FieldOverlap,
+    JobStatus,
+    ReferenceLayerInfo,
+    Repository,
+    cooperative_repo,
+    farmer_repo,
+    field_repo,
+    job_runner,
+    memo,
+    overlap_index,
+    poi_repo,
+    polygon_store,
+    reference_layers,
+    screen_fields,
+)
+
+JOB_POLL_SECONDS = 0.5
+# Name similarity from which a new farmer is flagged as a possible duplicate.
+FARMER_MATCH_THRESHOLD = 0.85
+UPLOAD_CHUNK_SIZE = 1 << 20
+# Queued fields checked for overlaps each time the admin list is refreshed.
+OVERLAP_REFRESH_LIMIT = 200
+MAX_LISTED_OVERLAPS = 100
+# Rows per page of the admin tables.
+ADMIN_PAGE_SIZE = 50
+ADMIN_TABLES: dict[str, Repository] = {
+    "cooperatives": cooperative_repo,
+    "farmers": farmer_repo,
+    "fields": field_repo,
+    "pois": poi_repo,
+}
+
+
+async def _save_upload(file: rx.UploadFile) -> str:
+    """Copy an upload to a temporary file in chunks and return its path."""
+    suffix = os.path.splitext(file.name or "")[1]
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as out:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            out.write(chunk)
+    return out.name
 
 
 class AdminState(rx.State):
-    """State for the admin dashboard, including GeoJSON import and CRUD operations."""
+    """State for the admin dashboard, including field import and CRUD operations."""
 
     is_uploading: bool = False
     import_summary: dict | None = None
+    jobs: list[JobStatus] = []
+    flag_similar_farmers: bool = False
+    repair_rings: bool = True
+    overlaps: list[FieldOverlap] = []
+    overlaps_pending: int = 0
+    overlapping_area: float = 0.0
+    reference_layer_info: list[ReferenceLayerInfo] = []
+    flagged_fields: int = 0
+    _watching_jobs: bool = False
     coop_dialog_open: bool = False
     farmer_dialog_open: bool = False
     field_dialog_open: bool = False
@@ -32,17 +86,77 @@ class AdminState(rx.State):
     form_field_crop: str = ""
     form_field_area: str = ""
     form_field_polygon: str = ""
+    field_form_error: str = ""
     form_poi_name: str = ""
     form_poi_type: str = "Warehouse"
     form_poi_lat: str = ""
     form_poi_lng: str = ""
     item_to_delete: dict[str, str] | None = None
+    cache_stats: dict[str, int] = {}
+    table_pages: dict[str, int] = {}
 
     @rx.event
     async def on_load(self):
         auth_state = await self.get_state(AuthState)
         if not auth_state.is_admin:
             return rx.redirect("/")
+        map_state = await self.get_state(MapState)
+        map_state.sync_data()
+        self.cache_stats = memo.stats()
+        self.refresh_overlaps()
+        self.refresh_reference_layers()
+        self.jobs = job_runner.jobs()
+        if job_runner.active():
+            return AdminState.watch_jobs
+
+    def _page(self, table: str) -> int:
+        """Get a table's current page, kept within its pages as rows go."""
+        last = max(0, len(ADMIN_TABLES[table]) - 1) // ADMIN_PAGE_SIZE
+        return min(self.table_pages.get(table, 0), last)
+
+    def _rows(self, table: str) -> list:
+        """Get the rows of a table's current page.
+
+        The tables show a page at a time, so an edit resends that page
+        rather than every record.
+        """
+        offset = self._page(table) * ADMIN_PAGE_SIZE
+        return ADMIN_TABLES[table].page(offset, ADMIN_PAGE_SIZE)
+
+    @rx.var(deps=["table_pages", MapState.data_version], auto_deps=False)
+    def cooperative_rows(self) -> list[Cooperative]:
+        return self._rows("cooperatives")
+
+    @rx.var(deps=["table_pages", MapState.data_version], auto_deps=False)
+    def farmer_rows(self) -> list[Farmer]:
+        return self._rows("farmers")
+
+    @rx.var(deps=["table_pages", MapState.data_version], auto_deps=False)
+    def field_rows(self) -> list[Field]:
+        return self._rows("fields")
+
+    @rx.var(deps=["table_pages", MapState.data_version], auto_deps=False)
+    def poi_rows(self) -> list[PointOfInterest]:
+        return self._rows("pois")
+
+    @rx.var(deps=["table_pages", MapState.data_version], auto_deps=False)
+    def table_ranges(self) -> dict[str, str]:
+        """Get the rows each table shows, as "51-100 of 1,200"."""
+        ranges = {}
+        for table, repo in ADMIN_TABLES.items():
+            first = self._page(table) * ADMIN_PAGE_SIZE
+            last = min(first + ADMIN_PAGE_SIZE, len(repo))
+            ranges[table] = f"{min(first + 1, last)}-{last} of {len(repo):,}"
+        return ranges
+
+    @rx.event
+    def previous_page(self, table: str):
+        self.table_pages = {**self.table_pages, table: max(0, self._page(table) - 1)}
+
+    @rx.event
+    def next_page(self, table: str):
+        last = max(0, len(ADMIN_TABLES[table]) - 1) // ADMIN_PAGE_SIZE
+        self.table_pages = {**self.table_pages, table: min(last, self._page(table) + 1)}
 
     @rx.event
     def open_coop_dialog(self):
@@ -65,25 +179,26 @@ class AdminState(rx.State):
             "id": f"coop-{uuid.uuid4().hex[:6]}",
             "name": self.form_coop_name,
         }
-        map_state.cooperatives = [*map_state.cooperatives, new_coop]
+        cooperative_repo.add(new_coop)
+        map_state._sync_data_version()
         self.close_coop_dialog()
 
     @rx.event
     async def update_cooperative(self):
         map_state = await self.get_state(MapState)
         if self.editing_id:
-            for i, coop in enumerate(map_state.cooperatives):
-                if coop["id"] == self.editing_id:
-                    map_state.cooperatives[i]["name"] = self.form_coop_name
-                    break
+            cooperative_repo.update(
+                {"id": self.editing_id, "name": self.form_coop_name}
+            )
+            map_state._sync_data_version()
             self.editing_id = None
         self.close_coop_dialog()
 
     @rx.event
     async def save_cooperative(self, form_data: dict):
         if self.editing_id:
-            return await AdminState.update_cooperative()
-        return await AdminState.create_cooperative()
+            return AdminState.update_cooperative
+        return AdminState.create_cooperative
 
     @rx.event
     def edit_cooperative(self, coop: Cooperative):
@@ -94,9 +209,8 @@ class AdminState(rx.State):
     @rx.event
     async def delete_cooperative(self, coop_id: str):
         map_state = await self.get_state(MapState)
-        map_state.cooperatives = [
-            c for c in map_state.cooperatives if c["id"] != coop_id
-        ]
+        cooperative_repo.remove(coop_id)
+        map_state._sync_data_version()
 
     @rx.event
     def open_farmer_dialog(self):
@@ -121,26 +235,30 @@ class AdminState(rx.State):
             "name": self.form_farmer_name,
             "cooperative_id": self.form_farmer_coop_id,
         }
-        map_state.farmers = [*map_state.farmers, new_farmer]
+        farmer_repo.add(new_farmer)
+        map_state._sync_data_version()
         self.close_farmer_dialog()
 
     @rx.event
     async def update_farmer(self):
         map_state = await self.get_state(MapState)
         if self.editing_id:
-            for i, farmer in enumerate(map_state.farmers):
-                if farmer["id"] == self.editing_id:
-                    map_state.farmers[i]["name"] = self.form_farmer_name
-                    map_state.farmers[i]["cooperative_id"] = self.form_farmer_coop_id
-                    break
+            farmer_repo.update(
+                {
+                    "id": self.editing_id,
+                    "name": self.form_farmer_name,
+                    "cooperative_id": self.form_farmer_coop_id,
+                }
+            )
+            map_state._sync_data_version()
             self.editing_id = None
         self.close_farmer_dialog()
 
     @rx.event
     async def save_farmer(self, form_data: dict):
         if self.editing_id:
-            return await AdminState.update_farmer()
-        return await AdminState.create_farmer()
+            return AdminState.update_farmer
+        return AdminState.create_farmer
 
     @rx.event
     def edit_farmer(self, farmer: Farmer):
@@ -152,7 +270,8 @@ class AdminState(rx.State):
     @rx.event
     async def delete_farmer(self, farmer_id: str):
         map_state = await self.get_state(MapState)
-        map_state.farmers = [f for f in map_state.farmers if f["id"] != farmer_id]
+        farmer_repo.remove(farmer_id)
+        map_state._sync_data_version()
 
     @rx.event
     def open_field_dialog(self):
@@ -170,12 +289,16 @@ class AdminState(rx.State):
         self.form_field_crop = ""
         self.form_field_area = ""
         self.form_field_polygon = ""
+        self.field_form_error = ""
 
     def _parse_polygon(self, polygon_str: str) -> list[latlng]:
         try:
             return [
-                latlng(lat=float(p.split(",")[0]), lng=float(p.split(",")[1]))
-                for p in polygon_str.strip().split(";")
+                latlng(
+                    lat=round(float(p.split(",")[0]), COORDINATE_DECIMALS),
+                    lng=round(float(p.split(",")[1]), COORDINATE_DECIMALS),
+                )
+                for p in polygon_str.strip().strip(";").split(";")
             ]
         except (ValueError, IndexError) as e:
             logging.exception(f"Error parsing polygon string: {e}")
@@ -184,9 +307,7 @@ class AdminState(rx.State):
     @rx.event
     async def create_field(self):
         map_state = await self.get_state(MapState)
-        farmer = next(
-            (f for f in map_state.farmers if f["id"] == self.form_field_farmer_id), None
-        )
+        farmer = farmer_repo.get(self.form_field_farmer_id)
         if not farmer:
             return
         new_field: Field = {
@@ -204,10 +325,7 @@ class AdminState(rx.State):
     async def update_field(self):
         map_state = await self.get_state(MapState)
         if self.editing_id:
-            farmer = next(
-                (f for f in map_state.farmers if f["id"] == self.form_field_farmer_id),
-                None,
-            )
+            farmer = farmer_repo.get(self.form_field_farmer_id)
             if not farmer:
                 return
             updated_field: Field = {
@@ -217,15 +335,31 @@ class AdminState(rx.State):
                 "crop": self.form_field_crop,
                 "area": float(self.form_field_area) if self.form_field_area else 0.0,
                 "polygon": self._parse_polygon(self.form_field_polygon),
+                # The form edits the outline only; holes are kept as they are.
+                "holes": polygon_store.holes(self.editing_id),
             }
             self.close_field_dialog()
             return map_state.update_field_data(updated_field)
 
     @rx.event
     async def save_field(self, form_data: dict):
+        # Outlines are drawn or typed in either direction; only real defects
+        # are refused.
+        check = validate_rings(
+            [self._parse_polygon(self.form_field_polygon)],
+            repair=self.repair_rings,
+            orient=True,
+        )[0]
+        if check["ring"] is None:
+            self.field_form_error = f"Invalid polygon: {', '.join(check['errors'])}."
+            return
+        self.field_form_error = ""
+        self.form_field_polygon = ";".join(
+            f"{lat},{lng}" for lng, lat in check["ring"].tolist()
+        )
         if self.editing_id:
-            return await AdminState.update_field()
-        return await AdminState.create_field()
+            return AdminState.update_field
+        return AdminState.create_field
 
     @rx.event
     def edit_field(self, field: Field):
@@ -234,7 +368,7 @@ class AdminState(rx.State):
         self.form_field_crop = field["crop"]
         self.form_field_area = str(field["area"])
         self.form_field_polygon = ";".join(
-            [f"{p.lat},{p.lng}" for p in field["polygon"]]
+            [f"{p['lat']},{p['lng']}" for p in polygon_store.latlngs(field["id"])]
         )
         self.open_field_dialog()
 
@@ -294,16 +428,16 @@ class AdminState(rx.State):
     @rx.event
     async def save_poi(self, form_data: dict):
         if self.editing_id:
-            return await AdminState.update_poi()
-        return await AdminState.create_poi()
+            return AdminState.update_poi
+        return AdminState.create_poi
 
     @rx.event
     def edit_poi(self, poi: PointOfInterest):
         self.editing_id = poi["id"]
         self.form_poi_name = poi["name"]
         self.form_poi_type = poi["type"]
-        self.form_poi_lat = str(poi["location"].lat)
-        self.form_poi_lng = str(poi["location"].lng)
+        self.form_poi_lat = str(poi["location"]["lat"])
+        self.form_poi_lng = str(poi["location"]["lng"])
         self.open_poi_dialog()
 
     @rx.event
@@ -311,15 +445,10 @@ class AdminState(rx.State):
         map_state = await self.get_state(MapState)
         return map_state.remove_poi(poi_id)
 
-    def _get_farmer_by_name(self, name: str, farmers: list[Farmer]) -> Farmer | None:
-        for farmer in farmers:
-            if farmer["name"].lower() == name.lower():
-                return farmer
-        return None
-
     @rx.event
     async def handle_upload(self, files: list[rx.UploadFile]):
-        """Handle the upload of a GeoJSON file."""
+        """Save an uploaded file, tell its format and import it as a background
+        job, which deletes the file when it ends."""
         self.is_uploading = True
         self.import_summary = None
         yield
@@ -332,70 +461,26 @@ class AdminState(rx.State):
                 "farmers_added": 0,
             }
             return
-        file = files[0]
         try:
-            content = await file.read()
-            data = json.loads(content)
-            if data.get("type") != "FeatureCollection":
-                raise ValueError("Invalid GeoJSON: Must be a FeatureCollection.")
-            map_state = await self.get_state(MapState)
-            current_farmers = map_state.farmers.copy()
-            current_fields = map_state.fields.copy()
-            new_farmers_count = 0
-            new_fields_count = 0
-            for feature in data.get("features", []):
-                props = feature.get("properties", {})
-                geom = feature.get("geometry", {})
-                if not all(
-                    [
-                        props.get("farmer_name"),
-                        props.get("crop"),
-                        props.get("area"),
-                        geom.get("type") == "Polygon",
-                        geom.get("coordinates"),
-                    ]
-                ):
-                    logging.warning(f"Skipping invalid feature: {feature}")
-                    continue
-                farmer_name = props["farmer_name"]
-                farmer = self._get_farmer_by_name(farmer_name, current_farmers)
-                if not farmer:
-                    new_farmer_id = (
-                        f"farmer-imported-{len(current_farmers) + 1}-{int(time.time())}"
-                    )
-                    farmer = {
-                        "id": new_farmer_id,
-                        "name": farmer_name,
-                        "cooperative_id": map_state.cooperatives[0]["id"]
-                        if map_state.cooperatives
-                        else "coop-001",
-                    }
-                    current_farmers.append(farmer)
-                    new_farmers_count += 1
-                new_field_id = (
-                    f"field-imported-{len(current_fields) + 1}-{int(time.time())}"
-                )
-                polygon_coords = geom["coordinates"][0]
-                field = {
-                    "id": new_field_id,
-                    "farmer_id": farmer["id"],
-                    "farmer_name": farmer["name"],
-                    "crop": props["crop"],
-                    "area": float(props["area"]),
-                    "polygon": [latlng(lat=p[1], lng=p[0]) for p in polygon_coords],
-                }
-                current_fields.append(field)
-                new_fields_count += 1
-            map_state.farmers = current_farmers
-            map_state.fields = current_fields
-            self.import_summary = {
-                "status": "Success",
-                "message": "GeoJSON data imported successfully.",
-                "fields_added": new_fields_count,
-                "farmers_added": new_farmers_count,
-            }
+            path = await _save_upload(files[0])
+            try:
+                import_format = detect_format(path)
+            except ValueError:
+                os.remove(path)
+                raise
+            threshold = FARMER_MATCH_THRESHOLD if self.flag_similar_farmers else None
+            job_runner.submit(
+                f"{IMPORT_FORMATS[import_format].label} import",
+                import_fields,
+                path,
+                import_format,
+                threshold,
+                self.repair_rings,
+                cleanup=functools.partial(os.remove, path),
+            )
+            self.jobs = job_runner.jobs()
         except Exception as e:
-            logging.exception(f"Error processing GeoJSON: {e}")
+            logging.exception(f"Error saving upload: {e}")
             self.import_summary = {
                 "status": "Error",
                 "message": f"An error occurred: {e}",
@@ -403,4 +488,65 @@ class AdminState(rx.State):
                 "farmers_added": 0,
             }
         finally:
-            self.is_uploading = False
\ No newline at end of file
+            self.is_uploading = False
+        yield AdminState.watch_jobs
+
+    @rx.event(background=True)
+    async def watch_jobs(self):
+        """Refresh the job panel until no job is queued or running."""
+        async with self:
+            if self._watching_jobs:
+                return
+            self._watching_jobs = True
+        try:
+            while True:
+                active = job_runner.active()
+                async with self:
+                    self.jobs = job_runner.jobs()
+                if not active:
+                    break
+                await asyncio.sleep(JOB_POLL_SECONDS)
+        finally:
+            async with self:
+                self._watching_jobs = False
+                # Imported records are picked up once, not after every batch.
+                map_state = await self.get_state(MapState)
+                map_state.sync_data()
+                self.refresh_overlaps()
+                self.refresh_reference_layers()
+
+    @rx.event
+    def toggle_flag_similar_farmers(self, checked: bool):
+        self.flag_similar_farmers = checked
+
+    @rx.event
+    def refresh_overlaps(self):
+        """Check a share of the queued fields and list the worst overlaps."""
+        self.overlaps_pending = overlap_index.refresh(OVERLAP_REFRESH_LIMIT)
+        self.overlaps = overlap_index.overlaps()[:MAX_LISTED_OVERLAPS]
+        self.overlapping_area = overlap_index.overlapping_area()
+
+    @rx.event
+    def refresh_reference_layers(self):
+        """Pick up changed layer files and count the fields found at risk."""
+        reference_layers.scan()
+        self.reference_layer_info = [
+            layer.info() for layer in reference_layers.layers()
+        ]
+        self.flagged_fields = reference_layers.flagged()
+
+    @rx.event
+    def screen_reference_layers(self):
+        """Index the reference layers and screen all fields as a background job."""
+        job_runner.submit("Reference screening", screen_fields)
+        self.jobs = job_runner.jobs()
+        return AdminState.watch_jobs
+
+    @rx.event
+    def toggle_repair_rings(self, checked: bool):
+        self.repair_rings = checked
+
+    @rx.event
+    def cancel_job(self, job_id: str):
+        job_runner.cancel(job_id)
+        self.jobs = job_runner.jobs()
\ No newline at end of file
@@ -1,6 +1,8 @@
 import reflex as rx
 from typing import TypedDict
-from app.states.traceability_state import TraceabilityState
+from app.states.auth_state import AuthState
+from app.states.map_state import MapState
+from app.store import crop_rollups, memo, timeline_store
 
 
 class CropData(TypedDict):
@@ -20,24 +22,41 @@ CROP_COLORS = {
 class AnalyticsState(rx.State):
     """The state for the analytics components."""
 
-    crop_distribution: list[CropData] = []
-
-    @rx.var
+    @rx.var(deps=[MapState.data_version, AuthState.current_user_id], auto_deps=False)
+    async def crop_distribution(self) -> list[CropData]:
+        """Get the number of permitted fields of each crop."""
+        map_state = await self.get_state(MapState)
+        totals = crop_rollups.totals(await map_state._visible_cooperative_ids())
+        return [
+            {
+                "name": t["crop"],
+                "value": t["fields"],
+                "fill": CROP_COLORS.get(t["crop"], "#9E9E9E"),
+            }
+            for t in totals
+        ]
+
+    @rx.var(deps=[MapState.selected_field_id, MapState.data_version], auto_deps=False)
     async def yield_data(self) -> list[dict[str, int | str]]:
         """Get yield data based on the selected field's timeline."""
-        trace_state = await self.get_state(TraceabilityState)
-        timeline = await trace_state.selected_field_timeline
-        if not timeline:
+        map_state = await self.get_state(MapState)
+
+        async def compute():
+            field_id = map_state.selected_field_id
+            if not field_id or not timeline_store.count(field_id):
+                return [
+                    {"year": 2020, "yield": 150},
+                    {"year": 2021, "yield": 175},
+                    {"year": 2022, "yield": 160},
+                    {"year": 2023, "yield": 180},
+                ]
+            field_id_hash = abs(hash(field_id)) % 100
             return [
-                {"year": 2020, "yield": 150},
-                {"year": 2021, "yield": 175},
-                {"year": 2022, "yield": 160},
-                {"year": 2023, "yield": 180},
+                {"year": 2020, "yield": 150 + field_id_hash % 20 - 10},
+                {"year": 2021, "yield": 175 + field_id_hash % 15 - 5},
+                {"year": 2022, "yield": 160 + field_id_hash % 25 - 15},
+                {"year": 2023, "yield": 180 + field_id_hash % 10},
             ]
-        field_id_hash = abs(hash(timeline[0]["field_id"])) % 100
-        return [
-            {"year": 2020, "yield": 150 + field_id_hash % 20 - 10},
-            {"year": 2021, "yield": 175 + field_id_hash % 15 - 5},
-            {"year": 2022, "yield": 160 + field_id_hash % 25 - 15},
-            {"year": 2023, "yield": 180 + field_id_hash % 10},
-        ]
\ No newline at end of file
+
+        key = await map_state._memo_key("yield_data", map_state.selected_field_id)
+        return await memo.get(key, compute)
\ No newline at end of file
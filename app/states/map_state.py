@@ -1,16 +1,63 @@
 import reflex as rx
+from functools import partial
 from reflex_enterprise.components.map.types import LatLng, latlng
 from typing import TypedDict, Literal
+from app.api.tiles import TILE_TICKET, TILE_TICKET_LIFETIME
+from app.geo import COORDINATE_DECIMALS, Box, degrees_per_pixel, expand
 from app.states.auth_state import AuthState, Cooperative, Farmer
+from app.store import (
+    Patch,
+    cluster_index,
+    cooperative_repo,
+    crop_rollups,
+    farmer_repo,
+    field_repo,
+    poi_repo,
+    current_version,
+    field_spatial_index,
+    field_sync,
+    lod_cache,
+    memo,
+    overlap_index,
+    reference_layers,
+    search_index,
+    ticket_store,
+    visibility_index,
+    visible_cooperative_ids,
+)
+
+SEARCH_LIMIT = 100
+# Queued fields checked for overlaps when a field is added or changed. A
+# longer queue is left to the import job and the admin overlap refresh.
+OVERLAP_CHECK_LIMIT = 25
+# Share of the viewport's width and height also loaded on every side.
+VIEWPORT_MARGIN = 0.25
+# Map size in pixels assumed until the browser reports the real bounds.
+DEFAULT_MAP_SIZE = (1024, 768)
+# Decimal places of the polylines drawn outlines are sent as, decoded by
+# the map; None sends them as LatLng lists.
+POLYLINE_DECIMALS: int | None = COORDINATE_DECIMALS
 
 
 class Field(TypedDict):
+    """A field record. Only fields being drawn carry ``polygon``, ``holes``
+    and ``risk_layers``; the stored outlines live in the repository's
+    coordinate store. Drawn outlines travel as encoded polylines when
+    ``POLYLINE_DECIMALS`` is set and are LatLng lists again in the browser."""
+
     id: str
     farmer_id: str
     farmer_name: str
     crop: str
     area: float
     polygon: list[LatLng]
+    holes: list[list[LatLng]]
+    computed_area: float
+    perimeter: float
+    centroid: LatLng | None
+    bbox: list[float] | None
+    area_mismatch: bool
+    risk_layers: list[str]
 
 
 class PointOfInterest(TypedDict):
@@ -20,89 +67,97 @@ class PointOfInterest(TypedDict):
     location: LatLng
 
 
+class FieldCluster(TypedDict):
+    id: str
+    location: LatLng
+    count: int
+    area: float
+    crop: str
+    zoom: int
+
+
+class PoiCluster(TypedDict):
+    id: str
+    location: LatLng
+    count: int
+    type: str
+    zoom: int
+
+
 class MapState(rx.State):
     """The state for the map dashboard."""
 
     center: LatLng = latlng(lat=-4.3276, lng=15.3136)
     zoom: float = 6.0
+    viewport: list[float] = []
     show_fields: bool = True
     show_pois: bool = True
     selected_field_id: str | None = None
     search_query: str = ""
-    cooperatives: list[Cooperative] = [
-        {"id": "coop-kivu", "name": "COOPEC-Kivu Coffee"},
-        {"id": "coop-equateur", "name": "COCACO-DRC Cocoa"},
-    ]
-    farmers: list[Farmer] = [
-        {"id": "farmer-001", "name": "Amani Dufatanye", "cooperative_id": "coop-kivu"},
-        {"id": "farmer-002", "name": "Baraka Mwangaza", "cooperative_id": "coop-kivu"},
-        {
-            "id": "farmer-003",
-            "name": "Lokole Bofunda",
-            "cooperative_id": "coop-equateur",
-        },
-    ]
-    fields: list[Field] = [
-        {
-            "id": "field-kivu-001",
-            "farmer_id": "farmer-001",
-            "farmer_name": "Amani Dufatanye",
-            "crop": "Arabica Coffee",
-            "area": 5.2,
-            "polygon": [
-                latlng(lat=-2.25, lng=28.85),
-                latlng(lat=-2.26, lng=28.86),
-                latlng(lat=-2.27, lng=28.85),
-                latlng(lat=-2.26, lng=28.84),
-            ],
-        },
-        {
-            "id": "field-kivu-002",
-            "farmer_id": "farmer-002",
-            "farmer_name": "Baraka Mwangaza",
-            "crop": "Robusta Coffee",
-            "area": 7.8,
-            "polygon": [
-                latlng(lat=-2.94, lng=29.06),
-                latlng(lat=-2.95, lng=29.07),
-                latlng(lat=-2.96, lng=29.06),
-                latlng(lat=-2.95, lng=29.05),
-            ],
-        },
-        {
-            "id": "field-equateur-001",
-            "farmer_id": "farmer-003",
-            "farmer_name": "Lokole Bofunda",
-            "crop": "Cocoa",
-            "area": 12.5,
-            "polygon": [
-                latlng(lat=0.05, lng=18.25),
-                latlng(lat=0.06, lng=18.26),
-                latlng(lat=0.05, lng=18.27),
-                latlng(lat=0.04, lng=18.26),
-            ],
-        },
-    ]
-    points_of_interest: list[PointOfInterest] = [
-        {
-            "id": "poi-bukavu-warehouse",
-            "name": "Bukavu Coffee Warehouse",
-            "type": "Warehouse",
-            "location": latlng(lat=-2.5044, lng=28.8611),
-        },
-        {
-            "id": "poi-kisangani-plant",
-            "name": "Kisangani Cocoa Processing",
-            "type": "Processing Plant",
-            "location": latlng(lat=0.515, lng=25.195),
-        },
-        {
-            "id": "poi-goma-farm",
-            "name": "Goma Farmstead",
-            "type": "Farm",
-            "location": latlng(lat=-1.675, lng=29.225),
-        },
-    ]
+    data_version: int = 0
+    field_resyncs: int = 0
+    tile_url: str = ""
+
+    def __getstate__(self):
+        """Drop cached repository snapshots; they are re-read from the store."""
+        state = super().__getstate__()
+        for name in (
+            "cooperatives",
+            "farmers",
+            "fields",
+            "points_of_interest",
+            "poi_markers",
+        ):
+            state.pop(self.computed_vars[name]._cache_attr, None)
+        return state
+
+    def _sync_data_version(self):
+        self.data_version = current_version()
+
+    @rx.event
+    def sync_data(self):
+        """Pick up changes made to the shared repositories by other sessions."""
+        if self.data_version != current_version():
+            self._sync_data_version()
+
+    @rx.event
+    async def issue_tile_url(self):
+        """Set the vector tile URL template, carrying a tile ticket for the
+        user's cooperatives rather than the session's client token.
+
+        The ticket serves every tile until TILE_TICKET_LIFETIME has passed,
+        when the URL must be issued again.
+        """
+        auth_state = await self.get_state(AuthState)
+        user = auth_state.current_user
+        if user is None:
+            self.tile_url = ""
+            return
+        ticket = ticket_store.issue(
+            TILE_TICKET,
+            {"cooperative_ids": visible_cooperative_ids(user)},
+            lifetime=TILE_TICKET_LIFETIME,
+        )
+        api_url = rx.config.get_config().api_url
+        self.tile_url = f"{api_url}/api/tiles/{{z}}/{{x}}/{{y}}.mvt?ticket={ticket}"
+
+    @rx.var(deps=["data_version"], auto_deps=False)
+    def cooperatives(self) -> list[Cooperative]:
+        return cooperative_repo.all()
+
+    @rx.var(deps=["data_version"], auto_deps=False)
+    def farmers(self) -> list[Farmer]:
+        return farmer_repo.all()
+
+    # Every record is only needed on the backend; pages and the map get
+    # their own, smaller vars.
+    @rx.var(deps=["data_version"], auto_deps=False, backend=True)
+    def fields(self) -> list[Field]:
+        return field_repo.all()
+
+    @rx.var(deps=["data_version"], auto_deps=False, backend=True)
+    def points_of_interest(self) -> list[PointOfInterest]:
+        return poi_repo.all()
 
     @rx.event
     def toggle_fields(self, checked: bool):
@@ -112,6 +167,21 @@ class MapState(rx.State):
     def toggle_pois(self, checked: bool):
         self.show_pois = checked
 
+    @rx.event
+    def set_viewport(self, bounds: dict):
+        """Store the map bounds reported by Leaflet's getBounds()."""
+        south_west, north_east = bounds["_southWest"], bounds["_northEast"]
+        self.viewport = [
+            south_west["lng"],
+            south_west["lat"],
+            north_east["lng"],
+            north_east["lat"],
+        ]
+
+    @rx.event
+    def update_zoom(self, zoom: float):
+        self.zoom = zoom
+
     @rx.event
     def select_field(self, field_id: str):
         if self.selected_field_id == field_id:
@@ -123,100 +193,209 @@ class MapState(rx.State):
     def go_to_producer_page(self, farmer_id: str) -> rx.event.EventSpec:
         return rx.redirect(f"/producers/{farmer_id}")
 
-    async def _update_crop_distribution(self):
-        """Helper to update analytics state when fields change."""
-        from app.states.analytics_state import AnalyticsState, CROP_COLORS
-
-        analytics_state = await self.get_state(AnalyticsState)
-        dist: dict[str, int] = {}
-        for f in self.fields:
-            dist[f["crop"]] = dist.get(f["crop"], 0) + 1
-        analytics_state.crop_distribution = [
-            {"name": crop, "value": count, "fill": CROP_COLORS.get(crop, "#9E9E9E")}
-            for crop, count in dist.items()
-        ]
-
     @rx.event
-    async def add_field(self, field_data: Field):
+    def add_field(self, field_data: Field):
         """Adds a new field to the state."""
-        self.fields = [*self.fields, field_data]
-        await self._update_crop_distribution()
+        field_repo.add(field_data)
+        overlap_index.refresh(OVERLAP_CHECK_LIMIT)
+        self._sync_data_version()
 
     @rx.event
-    async def update_field_data(self, field_data: Field):
+    def update_field_data(self, field_data: Field):
         """Updates an existing field in the state."""
-        self.fields = [
-            field_data if f["id"] == field_data["id"] else f for f in self.fields
-        ]
-        await self._update_crop_distribution()
+        field_repo.update(field_data)
+        overlap_index.refresh(OVERLAP_CHECK_LIMIT)
+        self._sync_data_version()
 
     @rx.event
-    async def remove_field(self, field_id: str):
+    def remove_field(self, field_id: str):
         """Removes a field from the state."""
-        self.fields = [f for f in self.fields if f["id"] != field_id]
-        await self._update_crop_distribution()
+        field_repo.remove(field_id)
+        self._sync_data_version()
 
     @rx.event
     def add_poi(self, poi_data: PointOfInterest):
         """Adds a new POI to the state."""
-        self.points_of_interest = [*self.points_of_interest, poi_data]
+        poi_repo.add(poi_data)
+        self._sync_data_version()
 
     @rx.event
     def update_poi_data(self, poi_data: PointOfInterest):
         """Updates an existing POI in the state."""
-        self.points_of_interest = [
-            poi_data if p["id"] == poi_data["id"] else p
-            for p in self.points_of_interest
-        ]
+        poi_repo.update(poi_data)
+        self._sync_data_version()
 
     @rx.event
     def remove_poi(self, poi_id: str):
         """Removes a POI from the state."""
-        self.points_of_interest = [
-            p for p in self.points_of_interest if p["id"] != poi_id
-        ]
+        poi_repo.remove(poi_id)
+        self._sync_data_version()
+
+    async def _memo_key(self, name: str, *extra) -> tuple:
+        """Key a derived value on the data version and the current viewer."""
+        auth_state = await self.get_state(AuthState)
+        return (name, self.data_version, auth_state.current_user_id, *extra)
 
-    @rx.var
+    async def _visible_cooperative_ids(self) -> list[str] | None:
+        """Get the cooperatives whose fields the user may see, or None for all."""
+        auth_state = await self.get_state(AuthState)
+        return visible_cooperative_ids(auth_state.current_user)
+
+    # The field lists only reach the browser as patches; see
+    # field_list_patch and map_field_patch.
+    @rx.var(
+        deps=["data_version", AuthState.current_user_id],
+        auto_deps=False,
+        backend=True,
+    )
     async def permissioned_fields(self) -> list[Field]:
         """Get fields based on the current user's role and partnerships."""
-        auth_state = await self.get_state(AuthState)
-        user = auth_state.current_user
-        if user is None or user["role"] == "admin":
-            return self.fields
-        if user["role"] == "buyer":
-            partner_coop_ids = user["partnerships"]
-            partner_farmer_ids = {
-                f["id"] for f in self.farmers if f["cooperative_id"] in partner_coop_ids
-            }
-            return [f for f in self.fields if f["farmer_id"] in partner_farmer_ids]
-        if user["role"] == "cooperative":
-            coop_id = user["cooperative_id"]
-            farmer_ids_in_coop = {
-                f["id"] for f in self.farmers if f["cooperative_id"] == coop_id
-            }
-            return [f for f in self.fields if f["farmer_id"] in farmer_ids_in_coop]
-        return []
 
-    @rx.var
+        async def compute():
+            coop_ids = await self._visible_cooperative_ids()
+            if coop_ids is None:
+                return self.fields
+            return visibility_index.fields_for(coop_ids)
+
+        return await memo.get(await self._memo_key("permissioned_fields"), compute)
+
+    @rx.var(deps=["permissioned_fields", "search_query"], auto_deps=False, backend=True)
     async def filtered_fields(self) -> list[Field]:
-        """Get the fields filtered by the search query and permissions."""
-        fields = await self.permissioned_fields
-        if not self.search_query:
-            return fields
+        """Get the best matches for the search query among the permitted fields."""
+        if not self.search_query.strip():
+            return await self.permissioned_fields
+
+        async def compute():
+            coop_ids = await self._visible_cooperative_ids()
+            within = None
+            if coop_ids is not None:
+                within = [visibility_index.field_ids_for(c) for c in set(coop_ids)]
+            field_ids = search_index.search(
+                self.search_query, limit=SEARCH_LIMIT, within=within
+            )
+            return [field_repo.get(field_id) for field_id in field_ids]
+
+        key = await self._memo_key("filtered_fields", self.search_query)
+        return await memo.get(key, compute)
+
+    async def _filtered_field_ids(self) -> set[str]:
+        async def compute():
+            return {f["id"] for f in await self.filtered_fields}
+
+        key = await self._memo_key("filtered_field_ids", self.search_query)
+        return await memo.get(key, compute)
+
+    def _current_viewport(self) -> Box:
+        """Get the map bounds, estimated from the center and zoom until known."""
+        if self.viewport:
+            return tuple(self.viewport)
+        half_width = DEFAULT_MAP_SIZE[0] * degrees_per_pixel(self.zoom) / 2
+        half_height = DEFAULT_MAP_SIZE[1] * degrees_per_pixel(self.zoom) / 2
+        return (
+            self.center["lng"] - half_width,
+            self.center["lat"] - half_height,
+            self.center["lng"] + half_width,
+            self.center["lat"] + half_height,
+        )
+
+    def _clusters_pois(self) -> bool:
+        return self.zoom < cluster_index.max_zoom
+
+    def _clusters_fields(self) -> bool:
+        """Search results are few enough to always be drawn individually."""
+        return self._clusters_pois() and not self.search_query.strip()
+
+    @rx.var(deps=["filtered_fields", "viewport", "zoom"], auto_deps=False, backend=True)
+    async def viewport_fields(self) -> list[Field]:
+        """Get the filtered fields in or near the visible map area.
+
+        Polygons are simplified to the detail the current zoom can show,
+        and encoded as polylines unless ``POLYLINE_DECIMALS`` is None. Each
+        field lists the reference layers it overlaps.
+        """
+        if self._clusters_fields():
+            return []
+        field_ids = await self._filtered_field_ids()
+        box = expand(self._current_viewport(), VIEWPORT_MARGIN)
+        visible = [i for i in field_spatial_index.query(box) if i in field_ids]
+        risk_layers = reference_layers.risk_layers(visible)
+        if POLYLINE_DECIMALS is None:
+            draw = lod_cache.at_zoom
+        else:
+            draw = partial(lod_cache.encoded_at_zoom, decimals=POLYLINE_DECIMALS)
         return [
-            f
-            for f in fields
-            if self.search_query.lower() in f["farmer_name"].lower()
-            or self.search_query.lower() in f["crop"].lower()
+            {
+                **draw(field_repo.get(field_id), self.zoom),
+                "risk_layers": risk_layers[field_id],
+            }
+            for field_id in visible
         ]
 
-    @rx.var
+    def _field_patch(self, name: str, records: list[Field], ordered: bool) -> Patch:
+        return field_sync.patch(
+            self.router.session.client_token, name, records, ordered=ordered
+        )
+
+    @rx.var(deps=["filtered_fields", "field_resyncs"], auto_deps=False)
+    async def field_list_patch(self) -> Patch:
+        """Get the changes to the field directory since this client's last
+        patch."""
+        return self._field_patch("field_list", await self.filtered_fields, True)
+
+    @rx.var(deps=["viewport_fields", "field_resyncs"], auto_deps=False)
+    async def map_field_patch(self) -> Patch:
+        """Get the changes to the drawn fields since this client's last patch.
+
+        A pan only sends the fields coming into view, and an edit the field
+        edited.
+        """
+        return self._field_patch("map_fields", await self.viewport_fields, False)
+
+    @rx.event
+    def resync_fields(self, name: str):
+        """Send a client that missed a patch of a field list all of it."""
+        field_sync.reset(self.router.session.client_token, name)
+        self.field_resyncs += 1
+
+    @rx.var(
+        deps=[
+            "data_version",
+            AuthState.current_user_id,
+            "search_query",
+            "viewport",
+            "zoom",
+        ],
+        auto_deps=False,
+    )
+    async def field_clusters(self) -> list[FieldCluster]:
+        """Get the clusters of permitted fields shown instead of polygons."""
+        if not self._clusters_fields():
+            return []
+        box = expand(self._current_viewport(), VIEWPORT_MARGIN)
+        coop_ids = await self._visible_cooperative_ids()
+        return cluster_index.field_clusters(self.zoom, box, coop_ids)
+
+    @rx.var(deps=["data_version", "viewport", "zoom"], auto_deps=False)
+    def poi_clusters(self) -> list[PoiCluster]:
+        if not self._clusters_pois():
+            return []
+        box = expand(self._current_viewport(), VIEWPORT_MARGIN)
+        return cluster_index.poi_clusters(self.zoom, box)
+
+    @rx.var(deps=["data_version", "zoom"], auto_deps=False)
+    def poi_markers(self) -> list[PointOfInterest]:
+        """Get the POIs drawn individually, which is none while clustered."""
+        if self._clusters_pois():
+            return []
+        return self.points_of_interest
+
+    @rx.var(deps=["data_version", AuthState.current_user_id], auto_deps=False)
     async def total_area(self) -> float:
-        """Calculate the total area of all fields."""
-        fields = await self.permissioned_fields
-        return round(sum((f["area"] for f in fields)), 2)
+        """Calculate the total area of the permitted fields."""
+        totals = crop_rollups.totals(await self._visible_cooperative_ids())
+        return round(sum(t["area"] for t in totals), 2)
 
-    @rx.var
+    @rx.var(deps=["data_version", AuthState.current_user_id], auto_deps=False)
     async def total_fields(self) -> int:
-        fields = await self.permissioned_fields
-        return len(fields)
\ No newline at end of file
+        totals = crop_rollups.totals(await self._visible_cooperative_ids())
+        return sum(t["fields"] for t in totals)
\ No newline at end of file
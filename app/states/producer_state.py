@@ -1,6 +1,7 @@
 import reflex as rx
-from app.states.map_state import MapState, Field, Farmer, Cooperative
+from app.states.map_state import Field, Farmer, Cooperative
 from app.states.traceability_state import TraceabilityState, TimelineEvent
+from app.store import cooperative_repo, farmer_repo, field_repo, current_version
 from typing import TypedDict, Literal
 
 
@@ -8,9 +9,24 @@ class ProducerState(rx.State):
     """Manages the state for the detailed producer view page."""
 
     current_producer_id: str = ""
-    producer: Farmer | None = None
-    cooperative: Cooperative | None = None
-    producer_fields: list[Field] = []
+    data_version: int = 0
+
+    @rx.var(deps=["current_producer_id", "data_version"], auto_deps=False)
+    def producer(self) -> Farmer | None:
+        return farmer_repo.get(self.current_producer_id)
+
+    @rx.var(deps=["current_producer_id", "data_version"], auto_deps=False)
+    def cooperative(self) -> Cooperative | None:
+        producer = farmer_repo.get(self.current_producer_id)
+        if producer is None:
+            return None
+        return cooperative_repo.get(producer["cooperative_id"])
+
+    @rx.var(deps=["current_producer_id", "data_version"], auto_deps=False)
+    def producer_fields(self) -> list[Field]:
+        return [
+            f for f in field_repo.all() if f["farmer_id"] == self.current_producer_id
+        ]
 
     @rx.var
     def producer_avatar_url(self) -> str:
@@ -42,19 +58,4 @@ class ProducerState(rx.State):
     async def load_producer_data(self):
         """Load all data related to the producer based on the URL parameter."""
         self.current_producer_id = self.router.page.params.get("producer_id", "")
-        if not self.current_producer_id:
-            return
-        map_state = await self.get_state(MapState)
-        for p in map_state.farmers:
-            if p["id"] == self.current_producer_id:
-                self.producer = p
-                break
-        if self.producer is None:
-            return
-        for c in map_state.cooperatives:
-            if c["id"] == self.producer["cooperative_id"]:
-                self.cooperative = c
-                break
-        self.producer_fields = [
-            f for f in map_state.fields if f["farmer_id"] == self.current_producer_id
-        ]
\ No newline at end of file
+        self.data_version = current_version()
\ No newline at end of file
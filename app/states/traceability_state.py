@@ -1,8 +1,12 @@
 import reflex as rx
 from typing import TypedDict, Literal
-import json
+from app.api.exports import EXPORT_TICKET
+from app.states.auth_state import AuthState
 from app.states.map_state import MapState, Field
-from reflex_enterprise.components.map.types import LatLng
+from app.store import ticket_store, timeline_store, visible_cooperative_ids
+
+# Events of the selected field shown per "Show older events" click.
+TIMELINE_PAGE_SIZE = 20
 
 
 class TimelineEvent(TypedDict):
@@ -22,75 +26,52 @@ class SupplyChainStep(TypedDict):
 class TraceabilityState(rx.State):
     """Manages traceability data, including timelines and supply chains."""
 
-    timeline_events: list[TimelineEvent] = [
-        {
-            "field_id": "field-kivu-001",
-            "date": "2023-06-10",
-            "stage": "Harvest",
-            "description": "Arabica coffee cherries harvested by hand.",
-            "location": "Amani Dufatanye's Farm, South Kivu",
-        },
-        {
-            "field_id": "field-kivu-001",
-            "date": "2023-06-12",
-            "stage": "Drying/Fermentation",
-            "description": "Coffee cherries washed and laid out on drying beds.",
-            "location": "Bukavu Washing Station",
-        },
-        {
-            "field_id": "field-kivu-001",
-            "date": "2023-07-01",
-            "stage": "Processing",
-            "description": "Dried beans milled and sorted for quality.",
-            "location": "COOPEC-Kivu Plant, Bukavu",
-        },
-        {
-            "field_id": "field-kivu-001",
-            "date": "2023-07-15",
-            "stage": "Export",
-            "description": "Coffee bags shipped from Port of Matadi.",
-            "location": "Port of Matadi",
-        },
-        {
-            "field_id": "field-equateur-001",
-            "date": "2023-09-25",
-            "stage": "Harvest",
-            "description": "Cocoa pods harvested from trees.",
-            "location": "Lokole Bofunda's Farm, Équateur",
-        },
-        {
-            "field_id": "field-equateur-001",
-            "date": "2023-09-28",
-            "stage": "Drying/Fermentation",
-            "description": "Cocoa beans fermented in heaps and sun-dried.",
-            "location": "Mbandaka Fermentation Center",
-        },
-    ]
-
-    @rx.var
+    export_format: str = "csv"
+    export_timeline: bool = False
+    export_pois: bool = False
+    timeline_pages: dict[str, int] = {}
+
+    @rx.var(
+        deps=[MapState.selected_field_id, MapState.data_version, "timeline_pages"],
+        auto_deps=False,
+    )
     async def selected_field_timeline(self) -> list[TimelineEvent]:
-        """Get the timeline events for the currently selected field."""
+        """Get the newest timeline events of the currently selected field, as
+        many pages as have been opened."""
         map_state = await self.get_state(MapState)
-        if not map_state.selected_field_id:
+        field_id = map_state.selected_field_id
+        if not field_id:
             return []
-        return sorted(
-            [
-                event
-                for event in self.timeline_events
-                if event["field_id"] == map_state.selected_field_id
-            ],
-            key=lambda e: e["date"],
-            reverse=True,
-        )
+        pages = self.timeline_pages.get(field_id, 1)
+        return timeline_store.timeline(field_id, limit=pages * TIMELINE_PAGE_SIZE)
+
+    @rx.var(
+        deps=[MapState.selected_field_id, MapState.data_version, "timeline_pages"],
+        auto_deps=False,
+    )
+    async def timeline_has_more(self) -> bool:
+        map_state = await self.get_state(MapState)
+        field_id = map_state.selected_field_id
+        if not field_id:
+            return False
+        pages = self.timeline_pages.get(field_id, 1)
+        return timeline_store.count(field_id) > pages * TIMELINE_PAGE_SIZE
 
-    @rx.var
+    @rx.event
+    async def show_older_events(self):
+        map_state = await self.get_state(MapState)
+        field_id = map_state.selected_field_id
+        if field_id:
+            pages = self.timeline_pages.get(field_id, 1) + 1
+            self.timeline_pages = {**self.timeline_pages, field_id: pages}
+
+    @rx.var(deps=[MapState.selected_field_id, MapState.data_version], auto_deps=False)
     async def supply_chain_data(self) -> list[SupplyChainStep]:
         """Get a mock supply chain status for the selected field."""
         map_state = await self.get_state(MapState)
         if not map_state.selected_field_id:
             return []
-        timeline = await self.selected_field_timeline
-        stages_completed = {event["stage"] for event in timeline}
+        stages_completed = timeline_store.stages(map_state.selected_field_id)
         chain = []
         all_stages = ["Harvest", "Processing", "Distribution", "Retail"]
         for stage in all_stages:
@@ -103,37 +84,46 @@ class TraceabilityState(rx.State):
             chain.append({"stage": stage, "status": status, "details": details})
         return chain
 
-    def _serialize_latlng(self, latlng: LatLng) -> dict:
-        return {"lat": latlng.lat, "lng": latlng.lng}
+    @rx.event
+    def set_export_format(self, extension: str):
+        self.export_format = extension
 
     @rx.event
-    async def export_fields_csv(self) -> rx.event.EventSpec:
-        """Export field data to a CSV file."""
-        map_state = await self.get_state(MapState)
-        fields = await map_state.permissioned_fields
-        header = """id,farmer_id,farmer_name,crop,area
-"""
-        csv_data = (
-            header
-            + """
-""".join(
-                (
-                    f"{f['id']},{f['farmer_id']},{f['farmer_name']},{f['crop']},{f['area']}"
-                    for f in fields
-                )
-            )
-        )
-        return rx.download(data=csv_data, filename="agritrace_fields.csv")
+    def toggle_export_timeline(self, checked: bool):
+        self.export_timeline = checked
 
     @rx.event
-    async def export_fields_json(self) -> rx.event.EventSpec:
-        """Export field data to a JSON file."""
-        map_state = await self.get_state(MapState)
-        fields = await map_state.permissioned_fields
-        serializable_fields = []
-        for f in fields:
-            field_copy = f.copy()
-            field_copy["polygon"] = [self._serialize_latlng(p) for p in f["polygon"]]
-            serializable_fields.append(field_copy)
-        json_data = json.dumps({"fields": serializable_fields}, indent=2)
-        return rx.download(data=json_data, filename="agritrace_fields.json")
\ No newline at end of file
+    def toggle_export_pois(self, checked: bool):
+        self.export_pois = checked
+
+    @rx.event
+    async def export_fields(self) -> rx.event.EventSpec | None:
+        """Download the permitted fields in the chosen format, streamed by the
+        export route, with the timeline and POI layers when ticked.
+
+        The URL carries a single-use export ticket for the user's
+        cooperatives rather than the session's client token.
+        """
+        auth_state = await self.get_state(AuthState)
+        user = auth_state.current_user
+        if user is None:
+            return None
+        ticket = ticket_store.issue(
+            EXPORT_TICKET, {"cooperative_ids": visible_cooperative_ids(user)}
+        )
+        url = f"{rx.config.get_config().api_url}/api/export/fields.{self.export_format}"
+        query = f"ticket={ticket}"
+        include = [
+            layer
+            for layer, ticked in (
+                ("timeline", self.export_timeline),
+                ("pois", self.export_pois),
+            )
+            if ticked
+        ]
+        if include:
+            query += f"&include={','.join(include)}"
+        return rx.download(
+            url=rx.Var.create(f"{url}?{query}"),
+            filename=f"agritrace_fields.{self.export_format}",
+        )
\ No newline at end of file
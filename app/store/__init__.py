@@ -0,0 +1,31 @@
+from .repository import (
+    Repository,
+    cooperative_repo,
+    farmer_repo,
+    field_repo,
+    poi_repo,
+    field_table,
+    current_version,
+)
+from .timeline import TimelineStore, timeline_store, timeline_table
+from .database import Database, EventTable, FieldTable, Table, database
+from .polygons import MeasuredField, PolygonStore, polygon_store
+from .visibility import VisibilityIndex, visibility_index, visible_cooperative_ids
+from .memo import Memo, memo
+from .search import SearchIndex, search_index, field_text, normalize, tokenize
+from .spatial import FieldSpatialIndex, field_spatial_index
+from .lod import LevelOfDetailCache, lod_cache
+from .cluster import ClusterIndex, cluster_index
+from .rollups import CropRollups, CropTotals, crop_rollups
+from .sync import KeyedSync, Patch, PatchOp, field_sync
+from .overlaps import FieldOverlap, OverlapIndex, overlap_index
+from .jobs import Job, JobCancelled, JobRunner, JobStatus, job_runner
+from .tickets import TicketStore, ticket_store
+from .reference import (
+    FieldRisk,
+    ReferenceLayer,
+    ReferenceLayerInfo,
+    ReferenceLayers,
+    reference_layers,
+    screen_fields,
+)
\ No newline at end of file
@@ -0,0 +1,189 @@
+import math
+from collections import Counter
+from typing import Iterable
+from reflex_enterprise.components.map.types import latlng
+from app.geo import Box, degrees_per_pixel, intersects
+from app.store.repository import Repository, farmer_repo, field_repo, poi_repo
+from app.store.visibility import VisibilityIndex, visibility_index
+
+# Zoom from which fields and POIs are drawn individually instead of clustered.
+CLUSTER_MAX_ZOOM = 11
+# Screen distance in pixels within which markers are grouped.
+CLUSTER_RADIUS = 60
+
+Cell = tuple[int, int]
+
+
+class _Aggregate:
+    __slots__ = ("count", "area", "lat", "lng", "labels")
+
+    def __init__(self):
+        self.count = 0
+        self.area = 0.0
+        self.lat = 0.0
+        self.lng = 0.0
+        self.labels: Counter[str] = Counter()
+
+    def add(self, lat: float, lng: float, area: float, label: str):
+        self.count += 1
+        self.area += area
+        self.lat += lat
+        self.lng += lng
+        self.labels[label] += 1
+
+    def merge(self, other: "_Aggregate"):
+        self.count += other.count
+        self.area += other.area
+        self.lat += other.lat
+        self.lng += other.lng
+        self.labels.update(other.labels)
+
+
+# Each level maps a grid cell to aggregates keyed by cooperative id.
+Level = dict[Cell, dict[str | None, _Aggregate]]
+
+
+class ClusterIndex:
+    """Grid clusters of field centroids and POI locations for every low zoom.
+
+    Points are bucketed into cells ``CLUSTER_RADIUS`` pixels wide at the
+    finest clustered zoom, and each coarser zoom merges 2x2 cells of the one
+    below it. Field aggregates are kept per cooperative so each role only
+    sees clusters of the fields it may see. The whole hierarchy is rebuilt
+    on the first query after the fields, farmers or POIs change, so panning
+    within one data version only reads precomputed cells.
+    """
+
+    def __init__(
+        self,
+        fields: Repository,
+        farmers: Repository,
+        pois: Repository,
+        visibility: VisibilityIndex,
+        max_zoom: int = CLUSTER_MAX_ZOOM,
+        radius: int = CLUSTER_RADIUS,
+    ):
+        self.max_zoom = max_zoom
+        self.radius = radius
+        self._fields = fields
+        self._farmers = farmers
+        self._pois = pois
+        self._visibility = visibility
+        self._version: int | None = None
+        self._field_levels: list[Level] = []
+        self._poi_levels: list[Level] = []
+
+    def _cell_size(self, zoom: int) -> float:
+        return self.radius * degrees_per_pixel(zoom)
+
+    def _levels(self, points: Iterable[tuple]) -> list[Level]:
+        """Build the cells of every clustered zoom, coarsest first."""
+        size = self._cell_size(self.max_zoom - 1)
+        finest: Level = {}
+        for lat, lng, key, area, label in points:
+            cell = (math.floor(lng / size), math.floor(lat / size))
+            aggregates = finest.setdefault(cell, {})
+            aggregate = aggregates.get(key)
+            if aggregate is None:
+                aggregate = aggregates[key] = _Aggregate()
+            aggregate.add(lat, lng, area, label)
+        levels = [finest]
+        for _ in range(self.max_zoom - 1):
+            coarser: Level = {}
+            for (x, y), aggregates in levels[-1].items():
+                parent = coarser.setdefault((x // 2, y // 2), {})
+                for key, aggregate in aggregates.items():
+                    parent.setdefault(key, _Aggregate()).merge(aggregate)
+            levels.append(coarser)
+        levels.reverse()
+        return levels
+
+    def _field_points(self):
+        for field in self._fields.all():
+            centroid = field["centroid"]
+            if centroid is not None:
+                lat, lng = centroid["lat"], centroid["lng"]
+                coop_id = self._visibility.cooperative_of(field["farmer_id"])
+                yield lat, lng, coop_id, field["area"], field["crop"]
+
+    def _poi_points(self):
+        for poi in self._pois.all():
+            location = poi["location"]
+            yield location["lat"], location["lng"], None, 0.0, poi["type"]
+
+    def _refresh(self):
+        version = self._fields.version + self._farmers.version + self._pois.version
+        if version != self._version:
+            self._field_levels = self._levels(self._field_points())
+            self._poi_levels = self._levels(self._poi_points())
+            self._version = version
+
+    def _clusters(
+        self,
+        levels: list[Level],
+        zoom: float,
+        box: Box,
+        keys: Iterable[str] | None,
+    ) -> Iterable[tuple[str, _Aggregate, int]]:
+        level = max(0, min(int(zoom), self.max_zoom - 1))
+        size = self._cell_size(level)
+        keys = set(keys) if keys is not None else None
+        for (x, y), aggregates in levels[level].items():
+            cell_box = (x * size, y * size, (x + 1) * size, (y + 1) * size)
+            if not intersects(cell_box, box):
+                continue
+            total = _Aggregate()
+            for key, aggregate in aggregates.items():
+                if keys is None or key in keys:
+                    total.merge(aggregate)
+            if total.count:
+                yield f"{level}/{x}/{y}", total, min(level + 2, self.max_zoom)
+
+    def field_clusters(
+        self,
+        zoom: float,
+        box: Box,
+        cooperative_ids: Iterable[str] | None = None,
+    ) -> list[dict]:
+        """Get the field clusters in a box, limited to some cooperatives' fields.
+
+        Each cluster has its count, total area, dominant crop and the zoom at
+        which it breaks up.
+        """
+        self._refresh()
+        return [
+            {
+                "id": cluster_id,
+                "location": latlng(
+                    lat=total.lat / total.count, lng=total.lng / total.count
+                ),
+                "count": total.count,
+                "area": round(total.area, 2),
+                "crop": total.labels.most_common(1)[0][0],
+                "zoom": expansion_zoom,
+            }
+            for cluster_id, total, expansion_zoom in self._clusters(
+                self._field_levels, zoom, box, cooperative_ids
+            )
+        ]
+
+    def poi_clusters(self, zoom: float, box: Box) -> list[dict]:
+        """Get the POI clusters in a box with their count and dominant type."""
+        self._refresh()
+        return [
+            {
+                "id": cluster_id,
+                "location": latlng(
+                    lat=total.lat / total.count, lng=total.lng / total.count
+                ),
+                "count": total.count,
+                "type": total.labels.most_common(1)[0][0],
+                "zoom": expansion_zoom,
+            }
+            for cluster_id, total, expansion_zoom in self._clusters(
+                self._poi_levels, zoom, box, None
+            )
+        ]
+
+
+cluster_index = ClusterIndex(field_repo, farmer_repo, poi_repo, visibility_index)
\ No newline at end of file
@@ -0,0 +1,488 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, ContextManager, Iterable, Iterator
+import numpy as np
+from app.geo import Box, pack_rings
+from app.store.polygons import PolygonStore
+
+DATABASE_PATH = Path("data") / "agritrace.db"
+# Environment variable naming another database file, or ":memory:".
+DATABASE_ENV = "AGRITRACE_DATABASE"
+# Rows fetched at a time when a table is read.
+READ_BATCH_SIZE = 1000
+# Ids bound per statement, under SQLite's limit on query parameters.
+MAX_PARAMETERS = 500
+# Seconds a change stays in the log for other processes to pick up; one
+# that has not looked for longer reloads everything instead.
+CHANGE_RETENTION = 3600.0
+
+Refresh = Callable[[list[str] | None], None]
+
+
+def _batches(items: list, size: int = MAX_PARAMETERS) -> Iterator[list]:
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+class Database:
+    """The SQLite file the shared repositories are persisted to.
+
+    Each write is one transaction that also appends the changed ids to a
+    change log, so that other backend processes using the same file can
+    catch up: ``poll`` asks SQLite whether another connection committed
+    since the last call, which costs a single pragma when nothing did, and
+    hands the ids changed elsewhere to their tables' ``watch`` callbacks.
+    The file is in WAL mode so that readers never wait on a writer.
+    ``version`` is the last change sequence number applied here; writes
+    made within ``applying`` count once applied in memory too.
+
+    Nothing is opened or created until the database is first used, so
+    importing the store has no side effects. Until then ``path`` may be
+    set; it defaults to ``$AGRITRACE_DATABASE``, then DATABASE_PATH. Tables
+    and the stores loaded from them are set up through ``on_open``, in the
+    order they registered.
+    """
+
+    def __init__(self, path: Path | str | None = None):
+        self.path = path
+        self.origin = uuid.uuid4().hex
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.RLock()
+        self._openers: list[Callable[[], None]] = []
+        self._tables: dict[str, Refresh] = {}
+        self._seen = 0
+        self._data_version = 0
+        self._writes: list[tuple[int, int]] = []
+        self._applying = 0
+
+    def on_open(self, opener: Callable[[], None]):
+        """Call ``opener()`` as the file is opened, or now if it already is."""
+        if self._conn is None:
+            self._openers.append(opener)
+        else:
+            opener()
+
+    def open(self):
+        """Open the file, creating it if missing, and set up what uses it."""
+        if self._conn is not None:
+            return
+        with self._lock:
+            if self._conn is not None:
+                return
+            path = self.path or os.environ.get(DATABASE_ENV) or DATABASE_PATH
+            if str(path) != ":memory:":
+                Path(path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS changes ("
+                "seq INTEGER PRIMARY KEY AUTOINCREMENT, tbl TEXT NOT NULL, "
+                "record_id TEXT NOT NULL, origin TEXT NOT NULL, at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS changes_at ON changes (at)")
+            self._conn = conn
+            self._seen = self._last_change()
+            self._data_version = self._pragma_data_version()
+            openers, self._openers = self._openers, []
+            for opener in openers:
+                opener()
+
+    @property
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.open()
+        return self._conn
+
+    def _pragma_data_version(self) -> int:
+        return self._connection.execute("PRAGMA data_version").fetchone()[0]
+
+    def _last_change(self) -> int:
+        row = self._connection.execute(
+            "SELECT seq FROM sqlite_sequence WHERE name = 'changes'"
+        ).fetchone()
+        return row[0] if row else 0
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run statements as one transaction, rolled back if any fails."""
+        with self._lock:
+            conn = self._connection
+            conn.execute("BEGIN IMMEDIATE")
+            head = self._last_change()
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+            tail = self._last_change()
+            if tail > head:
+                self._writes.append((head, tail))
+                if not self._applying:
+                    self._count_writes()
+
+    @contextmanager
+    def applying(self) -> Iterator[None]:
+        """Hold ``version`` back while writes are saved and then applied in
+        memory, and count them in once the block ends."""
+        with self._lock:
+            self._applying += 1
+            try:
+                yield
+            finally:
+                self._applying -= 1
+                if not self._applying:
+                    self._count_writes()
+
+    def _count_writes(self):
+        # The ids this process logged between head and tail are applied;
+        # changes others committed before them are caught up with first.
+        for head, tail in self._writes:
+            self._catch_up(head)
+            self._seen = max(self._seen, tail)
+        self._writes.clear()
+
+    def query(self, sql: str, params: Iterable = ()) -> list[tuple]:
+        with self._lock:
+            return self._connection.execute(sql, tuple(params)).fetchall()
+
+    @contextmanager
+    def cursor(self, sql: str, params: Iterable = ()) -> Iterator[sqlite3.Cursor]:
+        """Get a cursor over a query, for reading large results in batches."""
+        with self._lock:
+            yield self._connection.execute(sql, tuple(params))
+
+    def log(self, conn: sqlite3.Connection, table: str, record_ids: list[str]):
+        """Record changed ids within a write transaction."""
+        now = time.time()
+        conn.executemany(
+            "INSERT INTO changes (tbl, record_id, origin, at) VALUES (?, ?, ?, ?)",
+            [(table, record_id, self.origin, now) for record_id in record_ids],
+        )
+        conn.execute("DELETE FROM changes WHERE at < ?", (now - CHANGE_RETENTION,))
+
+    def watch(self, table: str, refresh: Refresh):
+        """Call ``refresh(ids)`` with the ids of ``table`` that another process
+        changed, or None if they are no longer all known."""
+        self._tables[table] = refresh
+
+    def poll(self):
+        """Apply the changes other processes committed since the last call."""
+        with self._lock:
+            data_version = self._pragma_data_version()
+            if data_version != self._data_version:
+                self._data_version = data_version
+                self._catch_up(self._last_change())
+
+    @property
+    def version(self) -> int:
+        """The sequence number of the last change applied in this process.
+
+        Changes are applied in order, so processes at the same version hold
+        the same data, and the number can key caches shared between them.
+        """
+        self.poll()
+        return self._seen
+
+    def _catch_up(self, last: int):
+        """Apply the changes others committed up to sequence number ``last``."""
+        if last <= self._seen:
+            return
+        conn = self._connection
+        first = conn.execute("SELECT min(seq) FROM changes").fetchone()[0]
+        rows = conn.execute(
+            "SELECT tbl, record_id FROM changes "
+            "WHERE seq > ? AND seq <= ? AND origin != ?",
+            (self._seen, last, self.origin),
+        ).fetchall()
+        complete = first is not None and first <= self._seen + 1
+        self._seen = last
+        if not complete:
+            for refresh in self._tables.values():
+                refresh(None)
+            return
+        changed: dict[str, dict[str, None]] = {}
+        for table, record_id in rows:
+            changed.setdefault(table, {})[record_id] = None
+        for table, record_ids in changed.items():
+            if table in self._tables:
+                self._tables[table](list(record_ids))
+
+
+class Table:
+    """Records of one kind, stored as JSON under their id.
+
+    ``columns`` are record keys copied into indexed columns by SQLite
+    itself, so ``find`` answers attribute queries from an index. Rows keep
+    their insertion order across updates, as repositories do. Changes to a
+    table that is not ``logged`` stay out of the change log and the
+    database version, for state that is read afresh rather than cached.
+    """
+
+    key = "id"
+
+    def __init__(
+        self,
+        db: Database,
+        name: str,
+        columns: tuple[str, ...] = (),
+        logged: bool = True,
+    ):
+        self.name = name
+        self.columns = columns
+        self.logged = logged
+        self._db = db
+        db.on_open(self._create)
+
+    def _create(self):
+        with self._db.transaction() as conn:
+            for statement in self._schema():
+                conn.execute(statement)
+
+    def open(self):
+        """Open the database, which sets up every table and store using it."""
+        self._db.open()
+
+    def applying(self) -> ContextManager[None]:
+        return self._db.applying()
+
+    def on_open(self, opener: Callable[[], None]):
+        self._db.on_open(opener)
+
+    def _key_column(self) -> str:
+        return "id TEXT PRIMARY KEY"
+
+    def _stored_columns(self) -> tuple[str, ...]:
+        return (self.key, "record")
+
+    def _schema(self) -> list[str]:
+        stored = [self._key_column(), "record TEXT NOT NULL"]
+        stored.extend(f"{c} BLOB NOT NULL" for c in self._stored_columns()[2:])
+        generated = [
+            f"{c} GENERATED ALWAYS AS (json_extract(record, '$.{c}')) VIRTUAL"
+            for c in self.columns
+        ]
+        return [
+            f"CREATE TABLE IF NOT EXISTS {self.name} ({', '.join(stored + generated)})",
+            *(
+                f"CREATE INDEX IF NOT EXISTS {self.name}_{c} ON {self.name} ({c})"
+                for c in self.columns
+            ),
+        ]
+
+    def _row(self, record: dict) -> tuple:
+        return record["id"], json.dumps(record)
+
+    def _records(self, rows: list[tuple]) -> list[dict]:
+        return [json.loads(row[1]) for row in rows]
+
+    def _select(self, where: str = "") -> str:
+        columns = ", ".join(self._stored_columns())
+        return f"SELECT {columns} FROM {self.name}{where} ORDER BY rowid"
+
+    def __len__(self) -> int:
+        return self._db.query(f"SELECT count(*) FROM {self.name}")[0][0]
+
+    def load(self) -> Iterator[dict]:
+        """Get every record, in insertion order."""
+        with self._db.cursor(self._select()) as rows:
+            while batch := rows.fetchmany(READ_BATCH_SIZE):
+                yield from self._records(batch)
+
+    def ids(self) -> list[str]:
+        rows = self._db.query(f"SELECT {self.key} FROM {self.name} ORDER BY rowid")
+        return [str(row[0]) for row in rows]
+
+    def get(self, record_ids: list[str]) -> list[dict]:
+        """Get the records stored under some ids; missing ones are left out."""
+        records = []
+        for batch in _batches(record_ids):
+            marks = ", ".join("?" * len(batch))
+            rows = self._db.query(
+                self._select(f" WHERE {self.key} IN ({marks})"), batch
+            )
+            records.extend(self._records(rows))
+        return records
+
+    def save(self, records: list[dict]):
+        """Insert or replace records in one transaction."""
+        if not records:
+            return
+        rows = [self._row(record) for record in records]
+        columns = self._stored_columns()
+        assignments = ", ".join(f"{c} = excluded.{c}" for c in columns[1:])
+        with self._db.transaction() as conn:
+            conn.executemany(
+                f"INSERT INTO {self.name} ({', '.join(columns)}) "
+                f"VALUES ({', '.join('?' * len(columns))}) "
+                f"ON CONFLICT ({self.key}) DO UPDATE SET {assignments}",
+                rows,
+            )
+            if self.logged:
+                self._db.log(conn, self.name, [row[0] for row in rows])
+
+    def delete(self, record_ids: list[str]):
+        with self._db.transaction() as conn:
+            for batch in _batches(record_ids):
+                marks = ", ".join("?" * len(batch))
+                conn.execute(
+                    f"DELETE FROM {self.name} WHERE {self.key} IN ({marks})", batch
+                )
+            if self.logged:
+                self._db.log(conn, self.name, record_ids)
+
+    def pop(self, record_ids: list[str]) -> list[dict]:
+        """Get and delete records in one transaction, so that of several
+        processes popping the same id only one gets its record."""
+        records = []
+        with self._db.transaction() as conn:
+            for batch in _batches(record_ids):
+                marks = ", ".join("?" * len(batch))
+                where = f" WHERE {self.key} IN ({marks})"
+                records.extend(
+                    self._records(conn.execute(self._select(where), batch).fetchall())
+                )
+                conn.execute(f"DELETE FROM {self.name}{where}", batch)
+            if self.logged and records:
+                self._db.log(conn, self.name, record_ids)
+        return records
+
+    def _where(self, values: dict, prefix: str = "") -> str:
+        unknown = set(values) - set(self.columns)
+        if unknown:
+            raise ValueError(f"{self.name} can't be queried by {sorted(unknown)}.")
+        return "".join(f" AND {prefix}{c} = ?" for c in values)
+
+    def find(self, **values) -> list[str]:
+        """Get the ids of the records with the given values, in order."""
+        rows = self._db.query(
+            f"SELECT {self.key} FROM {self.name} "
+            f"WHERE 1{self._where(values)} ORDER BY rowid",
+            values.values(),
+        )
+        return [str(row[0]) for row in rows]
+
+    def watch(self, refresh: Refresh):
+        self._db.watch(self.name, refresh)
+
+
+class FieldTable(Table):
+    """Fields, with their rings as coordinate blobs behind an R*Tree.
+
+    Records are saved without their rings, which are read from the polygon
+    store and written as float64 (lng, lat) rows and the end of each ring,
+    outer ring first. Loading copies them straight back into the store, so
+    fields are neither rebuilt as LatLng lists nor measured again. Triggers
+    keep the R*Tree in step with each field's bounding box, so ``query``
+    answers box and attribute queries in one statement.
+    """
+
+    def __init__(
+        self,
+        db: Database,
+        polygons: PolygonStore,
+        columns: tuple[str, ...] = (),
+    ):
+        self._polygons = polygons
+        super().__init__(db, "fields", columns)
+
+    def _stored_columns(self) -> tuple[str, ...]:
+        return ("id", "record", "coords", "ring_ends")
+
+    def _schema(self) -> list[str]:
+        box = (
+            "new.rowid, json_extract(new.record, '$.bbox[0]'), "
+            "json_extract(new.record, '$.bbox[2]'), "
+            "json_extract(new.record, '$.bbox[1]'), "
+            "json_extract(new.record, '$.bbox[3]')"
+        )
+        has_box = "json_extract(new.record, '$.bbox') IS NOT NULL"
+        return [
+            *super()._schema(),
+            "CREATE VIRTUAL TABLE IF NOT EXISTS field_bounds "
+            "USING rtree(id, min_lng, max_lng, min_lat, max_lat)",
+            "CREATE TRIGGER IF NOT EXISTS fields_insert AFTER INSERT ON fields "
+            f"WHEN {has_box} BEGIN INSERT INTO field_bounds VALUES ({box}); END",
+            "CREATE TRIGGER IF NOT EXISTS fields_update AFTER UPDATE ON fields BEGIN "
+            "DELETE FROM field_bounds WHERE id = old.rowid; "
+            f"INSERT INTO field_bounds SELECT {box} WHERE {has_box}; END",
+            "CREATE TRIGGER IF NOT EXISTS fields_delete AFTER DELETE ON fields BEGIN "
+            "DELETE FROM field_bounds WHERE id = old.rowid; END",
+        ]
+
+    def _row(self, record: dict) -> tuple:
+        rings = self._polygons.rings(record["id"])
+        coords, offsets = pack_rings(rings)
+        return (
+            record["id"],
+            json.dumps(record),
+            coords.tobytes(),
+            offsets[1:].astype(np.int32).tobytes(),
+        )
+
+    def _records(self, rows: list[tuple]) -> list[dict]:
+        if not rows:
+            return []
+        records = [json.loads(row[1]) for row in rows]
+        field_ids = [record["id"] for record in records]
+        outer, holes = [], []
+        for row in rows:
+            coords = np.frombuffer(row[2]).reshape(-1, 2)
+            ends = np.frombuffer(row[3], np.int32).tolist()
+            rings = [coords[a:b] for a, b in zip([0, *ends], ends)]
+            outer.append(rings[0] if rings else coords)
+            holes.append(rings[1:])
+        self._polygons.put(field_ids, *pack_rings(outer))
+        if any(holes):
+            self._polygons.put_holes(field_ids, holes)
+        return records
+
+    def query(self, box: Box | None = None, **values) -> list[str]:
+        """Get the ids of the fields whose bounding box meets ``box`` and
+        that have the given values, in order."""
+        if box is None:
+            return self.find(**values)
+        where = self._where(values, prefix="f.")
+        west, south, east, north = box
+        rows = self._db.query(
+            "SELECT f.id FROM field_bounds b JOIN fields f ON f.rowid = b.id "
+            "WHERE b.max_lng >= ? AND b.min_lng <= ? "
+            f"AND b.max_lat >= ? AND b.min_lat <= ?{where} ORDER BY f.rowid",
+            (west, east, south, north, *values.values()),
+        )
+        return [row[0] for row in rows]
+
+
+class EventTable(Table):
+    """Records without ids, such as timeline events, kept in the order they
+    were added. They are appended, and known and deleted by their sequence
+    number, so they are not kept in a Repository."""
+
+    key = "seq"
+
+    def _key_column(self) -> str:
+        return "seq INTEGER PRIMARY KEY"
+
+    def save(self, records: list[dict]):
+        """Append records in one transaction."""
+        with self._db.transaction() as conn:
+            seqs = [
+                conn.execute(
+                    f"INSERT INTO {self.name} (record) VALUES (?)",
+                    (json.dumps(record),),
+                ).lastrowid
+                for record in records
+            ]
+            if self.logged:
+                self._db.log(conn, self.name, [str(seq) for seq in seqs])
+
+
+database = Database()
\ No newline at end of file
@@ -0,0 +1,252 @@
+import asyncio
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Literal, TypedDict
+from app.store.database import Table, database
+
+JobState = Literal["queued", "running", "done", "failed", "cancelled"]
+ACTIVE: tuple[JobState, ...] = ("queued", "running")
+
+# Finished jobs kept for the status panel.
+MAX_FINISHED_JOBS = 20
+# Seconds after which a queued or running job of another process that has
+# not reported is taken to have died with it.
+JOB_STALE_SECONDS = 600.0
+
+
+class JobStatus(TypedDict):
+    id: str
+    kind: str
+    state: JobState
+    processed: int
+    rejected: int
+    duplicates: int
+    warnings: list[str]
+    percent: int
+    eta_seconds: int
+    message: str
+    created: float
+    updated: float
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class Job:
+    """The handle a job function gets to report progress and touch the store.
+
+    Job functions run on a worker thread. The shared repositories and their
+    indexes are not thread-safe, so every change to them goes through
+    ``call``, which runs a function on the event loop and waits for it.
+    """
+
+    def __init__(
+        self,
+        runner: "JobRunner",
+        status: JobStatus,
+        loop: asyncio.AbstractEventLoop,
+        cleanup: Callable[[], None] | None = None,
+    ):
+        self.id = status["id"]
+        self._runner = runner
+        self._status = status
+        self._loop = loop
+        self._cleanup = cleanup
+        self._cancel = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        if not self._cancel.is_set() and self._runner._cancel_requested(self.id):
+            self._cancel.set()
+        return self._cancel.is_set()
+
+    def check_cancelled(self):
+        if self.cancelled:
+            raise JobCancelled()
+
+    def report(self, **progress):
+        self._runner._update(self._status, **progress)
+
+    def call(self, fn: Callable[..., Any], *args) -> Any:
+        """Run ``fn(*args)`` on the event loop and return its result."""
+        future: Future = Future()
+
+        def run():
+            try:
+                future.set_result(fn(*args))
+            except BaseException as e:
+                future.set_exception(e)
+
+        self._loop.call_soon_threadsafe(run)
+        return future.result()
+
+
+class JobRunner:
+    """Runs long jobs on a thread pool, away from the event loop.
+
+    Each job gets an id under which its progress is kept, so any admin
+    session can follow or cancel it and a page reload does not lose it. A
+    job function takes its ``Job`` handle and the submitted arguments, and
+    returns the message shown when it finishes. A job's ``cleanup`` runs
+    once it ends however it ends, even when it was cancelled before it
+    started, so it can release what was handed to it.
+
+    With a ``table``, every status change is saved to it as well, so jobs
+    other backend processes run are listed too, and finished ones outlive
+    a restart. Cancelling one of those is saved to ``cancels`` for its
+    process to see at the job's next checkpoint. A queued or running job
+    of another process that has not reported for JOB_STALE_SECONDS is
+    listed as interrupted, since that process has most likely stopped.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        table: Table | None = None,
+        cancels: Table | None = None,
+    ):
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="job"
+        )
+        self._lock = threading.RLock()
+        self._jobs: dict[str, Job] = {}
+        self._table = table
+        self._cancels = cancels
+
+    def _update(self, status: JobStatus, **changes):
+        with self._lock:
+            status.update(changes, updated=time.time())
+            if self._table is not None:
+                self._table.save([dict(status)])
+
+    def submit(
+        self,
+        kind: str,
+        fn: Callable[..., str],
+        *args,
+        cleanup: Callable[[], None] | None = None,
+    ) -> str:
+        """Queue a job from the event loop and return its id."""
+        now = time.time()
+        status: JobStatus = {
+            "id": uuid.uuid4().hex[:8],
+            "kind": kind,
+            "state": "queued",
+            "processed": 0,
+            "rejected": 0,
+            "duplicates": 0,
+            "warnings": [],
+            "percent": -1,
+            "eta_seconds": -1,
+            "message": "",
+            "created": now,
+            "updated": now,
+        }
+        job = Job(self, status, asyncio.get_running_loop(), cleanup)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        self._update(status)
+        self._executor.submit(self._run, job, fn, args)
+        return job.id
+
+    def _run(self, job: Job, fn: Callable[..., str], args: tuple):
+        try:
+            self._call(job, fn, args)
+        finally:
+            if self._cancels is not None:
+                self._cancels.delete([job.id])
+            if job._cleanup is not None:
+                try:
+                    job._cleanup()
+                except Exception as e:
+                    logging.exception(f"Cleaning up job {job.id} failed: {e}")
+
+    def _call(self, job: Job, fn: Callable[..., str], args: tuple):
+        if job.cancelled:
+            self._update(job._status, state="cancelled", message="Cancelled.")
+            return
+        self._update(job._status, state="running")
+        try:
+            message = fn(job, *args)
+        except JobCancelled:
+            self._update(job._status, state="cancelled", message="Cancelled.")
+        except Exception as e:
+            logging.exception(f"Job {job.id} failed: {e}")
+            self._update(job._status, state="failed", message=f"An error occurred: {e}")
+        else:
+            self._update(
+                job._status, state="done", percent=100, eta_seconds=0, message=message
+            )
+
+    def _prune(self):
+        finished = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job._status["state"] not in ("queued", "running")
+        ]
+        for job_id in finished[: max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job_id]
+        if self._table is not None:
+            stored = [s["id"] for s in self._table.load() if s["state"] not in ACTIVE]
+            self._table.delete(stored[: max(0, len(stored) - MAX_FINISHED_JOBS)])
+
+    def _stored(self) -> dict[str, JobStatus]:
+        """Get the saved status of the jobs other processes ran or run."""
+        if self._table is None:
+            return {}
+        stale = time.time() - JOB_STALE_SECONDS
+        stored = {}
+        for status in self._table.load():
+            if status["id"] in self._jobs:
+                continue
+            if status["state"] in ACTIVE and status["updated"] < stale:
+                status.update(state="failed", message="Interrupted.")
+            stored[status["id"]] = JobStatus(**status)
+        return stored
+
+    def _cancel_requested(self, job_id: str) -> bool:
+        return self._cancels is not None and bool(self._cancels.get([job_id]))
+
+    def cancel(self, job_id: str) -> bool:
+        """Ask a job to stop at its next checkpoint."""
+        job = self._jobs.get(job_id)
+        if job is None:
+            status = self._stored().get(job_id)
+            if status is None or status["state"] not in ACTIVE:
+                return False
+            if self._cancels is not None:
+                self._cancels.save([{"id": job_id}])
+            return True
+        job._cancel.set()
+        with self._lock:
+            if job._status["state"] == "queued":
+                self._update(job._status, state="cancelled", message="Cancelled.")
+        return True
+
+    def get(self, job_id: str) -> JobStatus | None:
+        job = self._jobs.get(job_id)
+        if job is None:
+            return self._stored().get(job_id)
+        with self._lock:
+            return JobStatus(**job._status)
+
+    def jobs(self) -> list[JobStatus]:
+        """Get a copy of every known job's status, newest first."""
+        stored = list(self._stored().values())
+        with self._lock:
+            own = [JobStatus(**job._status) for job in self._jobs.values()]
+        return sorted(own + stored, key=lambda s: s["created"], reverse=True)
+
+    def active(self) -> bool:
+        return any(status["state"] in ACTIVE for status in self.jobs())
+
+
+job_runner = JobRunner(
+    table=Table(database, "jobs", logged=False),
+    cancels=Table(database, "job_cancels", logged=False),
+)
\ No newline at end of file
@@ -0,0 +1,96 @@
+import numpy as np
+from reflex_enterprise.components.map.types import latlng
+from app.geo import (
+    COORDINATE_DECIMALS,
+    degrees_per_pixel,
+    encode_polyline,
+    simplify_ring,
+)
+from app.store.polygons import polygon_store
+from app.store.repository import Repository, field_repo
+
+# Zoom levels with a precomputed outline, and the error allowed at each.
+LOD_ZOOMS = (4, 7, 10, 13)
+LOD_PIXEL_TOLERANCE = 0.75
+
+
+def _level(zoom: float) -> int | None:
+    return next((z for z in LOD_ZOOMS if z >= zoom), None)
+
+
+class LevelOfDetailCache:
+    """Simplified copies of each field at a few fixed zoom levels.
+
+    All levels of a field are built together the first time the field is
+    drawn, each one from the next finer level of its stored rings, and kept
+    as coordinate arrays. Holes narrower than a level's tolerance are left
+    out of it. The copies are dropped when the field changes and rebuilt
+    the next time it is drawn. Fields viewed above the finest level use the
+    stored rings unchanged. Levels encoded as polylines are kept too, until
+    the field changes.
+    """
+
+    def __init__(self, fields: Repository):
+        self._levels: dict[str, dict[int, list[np.ndarray]]] = {}
+        self._polylines: dict[str, dict[tuple[int | None, int], list[str]]] = {}
+        fields.subscribe(self._on_field)
+
+    def _on_field(self, old, new):
+        if old:
+            self._levels.pop(old["id"], None)
+            self._polylines.pop(old["id"], None)
+
+    def _build(self, field_id: str) -> dict[int, list[np.ndarray]]:
+        levels = {}
+        ring, *holes = polygon_store.rings(field_id)
+        for zoom in reversed(LOD_ZOOMS):
+            tolerance = LOD_PIXEL_TOLERANCE * degrees_per_pixel(zoom)
+            ring = simplify_ring(ring, tolerance)
+            holes = [
+                simplify_ring(hole, tolerance)
+                for hole in holes
+                if np.ptp(hole, axis=0).max() >= tolerance
+            ]
+            levels[zoom] = [ring, *holes]
+        return levels
+
+    def rings_at_zoom(self, field_id: str, zoom: float) -> list[np.ndarray]:
+        """Get the coarsest (lng, lat) outer ring and holes of a field
+        accurate at ``zoom``."""
+        level = _level(zoom)
+        if level is None:
+            return polygon_store.rings(field_id)
+        levels = self._levels.get(field_id)
+        if levels is None:
+            levels = self._levels[field_id] = self._build(field_id)
+        return levels[level]
+
+    def ring_at_zoom(self, field_id: str, zoom: float) -> np.ndarray:
+        """Get the coarsest (lng, lat) ring of a field accurate at ``zoom``."""
+        return self.rings_at_zoom(field_id, zoom)[0]
+
+    def at_zoom(self, field, zoom: float):
+        """Get a copy of a field with the outline and holes drawn at ``zoom``
+        as LatLng."""
+        ring, *holes = [
+            [latlng(lat=lat, lng=lng) for lng, lat in r.tolist()]
+            for r in self.rings_at_zoom(field["id"], zoom)
+        ]
+        return {**field, "polygon": ring, "holes": holes}
+
+    def encoded_at_zoom(self, field, zoom: float, decimals: int = COORDINATE_DECIMALS):
+        """Get a copy of a field with the outline and holes drawn at ``zoom``
+        as polylines encoded at ``decimals`` places, for the browser to
+        decode."""
+        levels = self._polylines.setdefault(field["id"], {})
+        key = (_level(zoom), decimals)
+        if key not in levels:
+            levels[key] = [
+                encode_polyline(ring, decimals)
+                for ring in self.rings_at_zoom(field["id"], zoom)
+            ]
+        ring, *holes = levels[key]
+        return {**field, "polygon": ring, "holes": holes}
+
+
+lod_cache = LevelOfDetailCache(field_repo)
\ No newline at end of file
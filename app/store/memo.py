@@ -0,0 +1,42 @@
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class Memo:
+    """A process-wide LRU table for values derived from the shared store.
+
+    Callers key entries on the var name, the data version and the viewer, so
+    an aggregate is computed once per (version, user) and then shared by
+    every session until the data changes. ``hits`` and ``misses`` count
+    lookups since the last ``clear``.
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[Hashable, Any] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """Get the value stored under ``key``, awaiting ``compute`` on a miss."""
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+        self.misses += 1
+        value = await compute()
+        self._entries[key] = value
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return value
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+memo = Memo()
\ No newline at end of file
@@ -0,0 +1,127 @@
+from typing import TypedDict
+from app.geo import intersection_area
+from app.store.polygons import PolygonStore, polygon_store
+from app.store.repository import Repository, field_repo
+from app.store.spatial import FieldSpatialIndex, field_spatial_index
+
+# Share of the smaller field from which an overlap counts as a duplicate.
+DUPLICATE_SHARE = 90.0
+# Overlaps smaller than this many hectares are taken for digitizing noise.
+MIN_OVERLAP_AREA = 0.001
+
+
+class FieldOverlap(TypedDict):
+    field_id: str
+    other_id: str
+    overlap_area: float
+    overlap_percent: float
+    duplicate: bool
+
+
+class OverlapIndex:
+    """Pairs of fields whose outlines overlap, kept up to date as fields change.
+
+    New and changed fields are queued by a repository listener and matched
+    on the next ``refresh``: the spatial index finds the fields whose boxes
+    meet theirs and the exact intersection area decides. A change costs a
+    few polygon intersections rather than a pass over all pairs. Holes are
+    taken out of the shared area, so a field lying in another's hole does
+    not overlap it. ``overlap_percent`` is the share of the smaller field
+    that is covered.
+    """
+
+    def __init__(
+        self,
+        fields: Repository,
+        spatial: FieldSpatialIndex,
+        polygons: PolygonStore,
+    ):
+        self._fields = fields
+        self._spatial = spatial
+        self._polygons = polygons
+        self._pending: dict[str, None] = {}
+        self._pairs: dict[tuple[str, str], FieldOverlap] = {}
+        self._partners: dict[str, set[str]] = {}
+        fields.subscribe(self._on_field)
+
+    def _on_field(self, old, new):
+        if old:
+            self._pending.pop(old["id"], None)
+            for other_id in self._partners.pop(old["id"], ()):
+                self._partners[other_id].discard(old["id"])
+                self._pairs.pop(tuple(sorted((old["id"], other_id))), None)
+        if new:
+            self._pending[new["id"]] = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def _shared_area(self, field_id: str, other_id: str) -> float:
+        """Get the hectares two fields share, holes left out.
+
+        With each field's holes inside its outer ring, the area is that
+        shared by the outer rings less each field's holes within the
+        other's outer ring, plus what the holes share.
+        """
+        ring, *holes = self._polygons.rings(field_id)
+        other, *other_holes = self._polygons.rings(other_id)
+        area = intersection_area(ring, other)
+        if area and (holes or other_holes):
+            area -= sum(intersection_area(h, other) for h in holes)
+            area -= sum(intersection_area(ring, h) for h in other_holes)
+            area += sum(intersection_area(h, o) for h in holes for o in other_holes)
+        return max(area, 0.0)
+
+    def _match(self, field_id: str, done: set[str]):
+        field = self._fields.get(field_id)
+        box = self._spatial.bbox(field_id)
+        if field is None or box is None:
+            return
+        for other_id in self._spatial.query(box):
+            if other_id == field_id or other_id in done:
+                continue
+            area = self._shared_area(field_id, other_id)
+            if area < MIN_OVERLAP_AREA:
+                continue
+            other = self._fields.get(other_id)
+            smaller = min(field["computed_area"], other["computed_area"])
+            percent = round(min(100.0, area / smaller * 100), 1) if smaller else 0.0
+            first, second = sorted((field_id, other_id))
+            self._pairs[(first, second)] = {
+                "field_id": first,
+                "other_id": second,
+                "overlap_area": round(area, 2),
+                "overlap_percent": percent,
+                "duplicate": percent >= DUPLICATE_SHARE,
+            }
+            self._partners.setdefault(first, set()).add(second)
+            self._partners.setdefault(second, set()).add(first)
+
+    def refresh(self, limit: int | None = None) -> int:
+        """Match up to ``limit`` queued fields, or all, and get how many remain."""
+        done: set[str] = set()
+        while self._pending and (limit is None or len(done) < limit):
+            field_id = next(iter(self._pending))
+            del self._pending[field_id]
+            self._match(field_id, done)
+            done.add(field_id)
+        return len(self._pending)
+
+    def overlaps(self, field_id: str | None = None) -> list[FieldOverlap]:
+        """Get the known overlaps, of one field or all, largest share first."""
+        if field_id is None:
+            pairs = self._pairs.values()
+        else:
+            pairs = [
+                self._pairs[tuple(sorted((field_id, other_id)))]
+                for other_id in self._partners.get(field_id, ())
+            ]
+        return sorted(pairs, key=lambda p: p["overlap_percent"], reverse=True)
+
+    def overlapping_area(self) -> float:
+        """Get the area counted twice when summing the areas of all fields."""
+        return round(sum(p["overlap_area"] for p in self._pairs.values()), 2)
+
+
+overlap_index = OverlapIndex(field_repo, field_spatial_index, polygon_store)
\ No newline at end of file
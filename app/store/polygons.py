@@ -0,0 +1,226 @@
+from contextlib import contextmanager
+from typing import Iterator
+import numpy as np
+from reflex_enterprise.components.map.types import LatLng, latlng
+from app.geo import measure_fields, pack_rings, quantize
+
+
+class MeasuredField(dict):
+    """An incoming field already measured by ``PolygonStore.measure``."""
+
+
+class PolygonStore:
+    """Field outlines kept column-wise in one shared coordinate buffer.
+
+    Each field's ring is a run of (lng, lat) rows in a float64 array,
+    addressed by its start and length, so a vertex costs 16 bytes instead
+    of a dict. ``ring`` returns a read-only view of that run without
+    copying, for the geometry code; LatLng lists are only built by
+    ``latlngs`` when a field is drawn or exported. The few fields with
+    holes keep them as further runs, listed separately so outer rings stay
+    a single lookup. Replaced and removed rings leave gaps that are
+    compacted away once they fill half of the buffer. Earlier views stay
+    valid, since the buffer is never rewritten in place. Coordinates are
+    rounded to ``COORDINATE_DECIMALS`` places as they are stored, which is
+    finer than any field survey and keeps imported noise digits out.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self._coords = np.empty((capacity, 2))
+        self._end = 0
+        self._garbage = 0
+        self._slots: dict[str, tuple[int, int]] = {}
+        self._holes: dict[str, list[tuple[int, int]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, field_id: str) -> bool:
+        return field_id in self._slots
+
+    @property
+    def nbytes(self) -> int:
+        return self._coords.nbytes
+
+    def _compact(self):
+        coords = np.empty_like(self._coords)
+        end = 0
+
+        def move(start: int, length: int) -> tuple[int, int]:
+            nonlocal end
+            coords[end : end + length] = self._coords[start : start + length]
+            end += length
+            return end - length, length
+
+        for field_id, slot in self._slots.items():
+            self._slots[field_id] = move(*slot)
+        for field_id, slots in self._holes.items():
+            self._holes[field_id] = [move(*slot) for slot in slots]
+        self._coords = coords
+        self._end = end
+        self._garbage = 0
+
+    def _reserve(self, count: int):
+        if self._garbage > self._end // 2:
+            self._compact()
+        needed = self._end + count
+        if needed > len(self._coords):
+            coords = np.empty((max(needed, 2 * len(self._coords)), 2))
+            coords[: self._end] = self._coords[: self._end]
+            self._coords = coords
+
+    def put(self, field_ids: list[str], coords: np.ndarray, offsets: np.ndarray) -> int:
+        """Store packed rings under their field ids and get where they start.
+
+        Rings already stored under those ids are replaced.
+        """
+        self._reserve(len(coords))
+        start = self._end
+        self._coords[start : start + len(coords)] = quantize(coords)
+        self._end += len(coords)
+        for field_id, first, last in zip(
+            field_ids, offsets[:-1].tolist(), offsets[1:].tolist()
+        ):
+            self.remove(field_id)
+            self._slots[field_id] = (start + first, last - first)
+        return start
+
+    def put_holes(self, field_ids: list[str], holes: list[list]):
+        """Store the holes of fields already stored, replacing any they had."""
+        coords, offsets = pack_rings([ring for rings in holes for ring in rings])
+        self._reserve(len(coords))
+        start = self._end
+        self._coords[start : start + len(coords)] = quantize(coords)
+        self._end += len(coords)
+        bounds = offsets.tolist()
+        first = 0
+        for field_id, rings in zip(field_ids, holes):
+            self._garbage += sum(length for _, length in self._holes.pop(field_id, ()))
+            if rings:
+                self._holes[field_id] = [
+                    (start + bounds[k], bounds[k + 1] - bounds[k])
+                    for k in range(first, first + len(rings))
+                ]
+                first += len(rings)
+
+    def remove(self, field_id: str):
+        slot = self._slots.pop(field_id, None)
+        if slot is not None:
+            self._garbage += slot[1]
+        self._garbage += sum(length for _, length in self._holes.pop(field_id, ()))
+
+    def on_change(self, old: dict | None, new: dict | None):
+        """Drop the ring of a field removed from the repository."""
+        if old is not None and new is None:
+            self.remove(old["id"])
+
+    @contextmanager
+    def staged(self, field_ids: list[str]) -> Iterator[None]:
+        """Put the rings of some fields back as they were if the block raises,
+        so rings ingested for a write that fails are not kept."""
+        saved = {field_id: self.rings(field_id) for field_id in field_ids}
+        try:
+            yield
+        except BaseException:
+            for field_id, rings in saved.items():
+                self.remove(field_id)
+                if rings:
+                    self.put([field_id], *pack_rings(rings[:1]))
+                    if len(rings) > 1:
+                        self.put_holes([field_id], [rings[1:]])
+            raise
+
+    def measure(self, fields: list[dict]) -> list[MeasuredField]:
+        """Measure incoming fields on their rings as they will be stored.
+
+        The store is left alone, so this can run off the event loop. The
+        copies returned keep ``polygon`` and ``holes``, rounded as stored,
+        and ``ingest`` stores them without measuring them again.
+        """
+        coords, offsets = pack_rings([f["polygon"] for f in fields])
+        coords = quantize(coords)
+        holes = [
+            [quantize(pack_rings([ring])[0]) for ring in f.get("holes") or []]
+            for f in fields
+        ]
+        bounds = offsets.tolist()
+        return [
+            MeasuredField(field, polygon=coords[start:end], holes=rings)
+            for field, start, end, rings in zip(
+                measure_fields(fields, packed=(coords, offsets), holes=holes),
+                bounds[:-1],
+                bounds[1:],
+                holes,
+            )
+        ]
+
+    def ingest(self, fields: list[dict]) -> list[dict]:
+        """Move the polygons of incoming fields into the store.
+
+        Returns copies of the fields without ``polygon`` and ``holes`` and
+        with their measured geometry, computed on the stored rings unless
+        every field was measured already.
+        """
+        field_ids = [f["id"] for f in fields]
+        coords, offsets = pack_rings([f["polygon"] for f in fields])
+        start = self.put(field_ids, coords, offsets)
+        stored = self._coords[start : start + len(coords)]
+        holes = [f.get("holes") or [] for f in fields]
+        if any(holes):
+            self.put_holes(field_ids, holes)
+        records = [
+            {k: v for k, v in f.items() if k not in ("polygon", "holes")}
+            for f in fields
+        ]
+        if all(isinstance(f, MeasuredField) for f in fields):
+            return records
+        return measure_fields(
+            records,
+            packed=(stored, offsets),
+            holes=[self.holes(field_id) for field_id in field_ids],
+        )
+
+    def ring(self, field_id: str) -> np.ndarray | None:
+        """Get a read-only (n, 2) view of a field's (lng, lat) coordinates."""
+        slot = self._slots.get(field_id)
+        if slot is None:
+            return None
+        start, length = slot
+        view = self._coords[start : start + length]
+        view.flags.writeable = False
+        return view
+
+    def holes(self, field_id: str) -> list[np.ndarray]:
+        """Get read-only views of a field's holes, if it has any."""
+        views = []
+        for start, length in self._holes.get(field_id, ()):
+            view = self._coords[start : start + length]
+            view.flags.writeable = False
+            views.append(view)
+        return views
+
+    def rings(self, field_id: str) -> list[np.ndarray]:
+        """Get a field's outer ring followed by its holes."""
+        ring = self.ring(field_id)
+        return [] if ring is None else [ring, *self.holes(field_id)]
+
+    def latlngs(self, field_id: str) -> list[LatLng]:
+        ring = self.ring(field_id)
+        if ring is None:
+            return []
+        return [latlng(lat=lat, lng=lng) for lng, lat in ring.tolist()]
+
+    def with_polygon(self, field: dict) -> dict:
+        """Get a copy of a field with its polygon and holes as LatLng, for
+        rendering."""
+        return {
+            **field,
+            "polygon": self.latlngs(field["id"]),
+            "holes": [
+                [latlng(lat=lat, lng=lng) for lng, lat in hole.tolist()]
+                for hole in self.holes(field["id"])
+            ],
+        }
+
+
+polygon_store = PolygonStore()
\ No newline at end of file
@@ -0,0 +1,391 @@
+import json
+from pathlib import Path
+from typing import TypedDict
+import numpy as np
+from app.geo import PackedRTree, intersection_area, subdivide
+from app.store.jobs import Job
+from app.store.polygons import PolygonStore, polygon_store
+from app.store.repository import Repository, field_repo
+
+# Reference layers are the GeoJSON and FlatGeobuf files in this directory,
+# named after their file; their indexes are kept next to them in INDEX_DIR.
+REFERENCE_DIR = Path("data") / "reference"
+INDEX_DIR = ".index"
+LAYER_SUFFIXES = {".geojson": "GeoJSON", ".json": "GeoJSON", ".fgb": "FlatGeobuf"}
+# Bumped when the layout of the saved index changes.
+INDEX_FORMAT = 1
+# Polygons with more vertices are indexed as pieces of about this size.
+MAX_PART_VERTICES = 256
+# Overlaps smaller than this many hectares (one square metre) are ignored.
+MIN_RISK_AREA = 0.0001
+# Fields screened per call into the event loop by the screening job.
+SCREEN_BATCH_SIZE = 200
+_ARRAYS = ("coords", "rings", "parts", "boxes", "levels", "order")
+# Codes that name WGS 84 longitude and latitude, after any "EPSG:" or URN.
+WGS84_CODES = ("4326", "CRS84")
+
+
+class ReferenceLayerError(ValueError):
+    pass
+
+
+def _wgs84(crs: str) -> bool:
+    """Whether a CRS code, URN or WKT is WGS 84 longitude and latitude."""
+    crs = crs.strip().upper()
+    if "[" in crs:
+        return crs.startswith(("GEOGCS", "GEOGCRS", "GEODCRS")) and (
+            "WGS 84" in crs or "WGS_1984" in crs
+        )
+    return crs.rsplit(":", 1)[-1] in WGS84_CODES
+
+
+class FieldRisk(TypedDict):
+    layer: str
+    area: float
+
+
+class ReferenceLayerInfo(TypedDict):
+    name: str
+    format: str
+    parts: int
+    indexed: bool
+
+
+class ReferenceLayer:
+    """The polygons of one reference file, behind a memory-mapped index.
+
+    ``build`` reads the file once and saves its rings as flat arrays: the
+    coordinates, the ring offsets, the part offsets (an outer ring and its
+    holes) and a packed R-tree over the parts. Large polygons are cut into
+    parts of a few hundred vertices, so that screening a field only
+    touches the outline near it. ``open`` maps those arrays
+    read-only, so a layer of any size costs no memory until its pages are
+    touched, and the index is only rebuilt when the file changes.
+    Coordinates must be longitude and latitude: a file whose CRS is
+    anything but WGS 84 is refused.
+    """
+
+    def __init__(self, source: Path):
+        self.source = source
+        self.name = source.stem
+        self.format = LAYER_SUFFIXES[source.suffix.lower()]
+        self.index_dir = source.parent / INDEX_DIR / source.name
+        self._arrays: dict[str, np.ndarray] | None = None
+        self._tree: PackedRTree | None = None
+        self._meta: dict | None = None
+
+    @property
+    def indexed(self) -> bool:
+        return self._tree is not None
+
+    def __len__(self) -> int:
+        return len(self._tree) if self._tree is not None else 0
+
+    @property
+    def current(self) -> bool:
+        """Whether the mapped index is that of the file as it is now."""
+        try:
+            return self._meta is not None and self._meta == self._stamp()
+        except OSError:
+            return False
+
+    def _stamp(self) -> dict:
+        stat = self.source.stat()
+        return {
+            "format": INDEX_FORMAT,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+        }
+
+    def open(self) -> bool:
+        """Map the saved index if it is up to date with the file."""
+        try:
+            meta = json.loads((self.index_dir / "meta.json").read_text())
+            if meta != self._stamp():
+                return False
+            arrays = {
+                name: np.load(self.index_dir / f"{name}.npy", mmap_mode="r")
+                for name in _ARRAYS
+            }
+        except (OSError, ValueError):
+            return False
+        self._arrays = arrays
+        self._tree = PackedRTree(arrays["boxes"], arrays["levels"], arrays["order"])
+        self._meta = meta
+        return True
+
+    def _features(self, file):
+        from app.importers import FeatureStream, FlatGeobufReader
+
+        if self.format == "FlatGeobuf":
+            return FlatGeobufReader(file)
+        return FeatureStream(file.read)
+
+    def _check_crs(self, features):
+        if features.crs is not None and not _wgs84(features.crs):
+            raise ReferenceLayerError(
+                f"Unsupported reference layer {self.name}: coordinates are not "
+                "WGS 84; export it in WGS 84 longitude and latitude."
+            )
+
+    def build(self, job: Job | None = None):
+        """Read the file into a new index and map it.
+
+        May run on a worker thread; ``job`` is checked for cancellation.
+        The CRS is checked before the first feature is indexed, and again at
+        the end for a GeoJSON ``crs`` member written after the features.
+        """
+        from app.importers import geometry_polygons
+
+        stamp = self._stamp()
+        rings: list[np.ndarray] = []
+        parts = [0]
+        with self.source.open("rb") as file:
+            features = self._features(file)
+            for count, feature in enumerate(features):
+                if job is not None:
+                    job.check_cancelled()
+                if not count:
+                    self._check_crs(features)
+                for polygon in geometry_polygons(feature.get("geometry")):
+                    polygon = [
+                        r[:-1] if len(r) > 1 and (r[0] == r[-1]).all() else r
+                        for r in polygon
+                    ]
+                    polygon = [polygon[0], *(h for h in polygon[1:] if len(h) >= 3)]
+                    for piece in subdivide(polygon, MAX_PART_VERTICES):
+                        rings.extend(piece)
+                        parts.append(len(rings))
+            self._check_crs(features)
+        lengths = np.array([len(r) for r in rings], dtype=np.int64)
+        ring_offsets = np.zeros(len(rings) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=ring_offsets[1:])
+        coords = np.concatenate(rings) if rings else np.zeros((0, 2))
+        part_offsets = np.array(parts, dtype=np.int64)
+        boxes = np.array(
+            [(*rings[i].min(axis=0), *rings[i].max(axis=0)) for i in parts[:-1]]
+        ).reshape(-1, 4)
+        tree = PackedRTree.build(boxes)
+        arrays = {
+            "coords": coords,
+            "rings": ring_offsets,
+            "parts": part_offsets,
+            **tree.arrays(),
+        }
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        for name in _ARRAYS:
+            np.save(self.index_dir / f"{name}.npy", arrays[name])
+        (self.index_dir / "meta.json").write_text(json.dumps(stamp))
+        self.open()
+
+    def overlap_areas(self, rings: list[np.ndarray]) -> np.ndarray:
+        """Get the hectares of each (lng, lat) ring covered by the layer.
+
+        The tree finds the parts whose box meets each ring's box in one
+        pass; the covered area of a part is its intersection with the outer
+        ring less those with its holes.
+        """
+        areas = np.zeros(len(rings))
+        if self._tree is None or not rings:
+            return areas
+        coords = self._arrays["coords"]
+        ring_offsets = self._arrays["rings"]
+        part_offsets = self._arrays["parts"]
+        boxes = np.array(
+            [
+                (*r.min(axis=0), *r.max(axis=0)) if len(r) else (0, 0, -1, -1)
+                for r in rings
+            ]
+        )
+        queries, parts = self._tree.query_many(boxes)
+        for query, part in zip(queries.tolist(), parts.tolist()):
+            ring = rings[query]
+            area = 0.0
+            for k in range(int(part_offsets[part]), int(part_offsets[part + 1])):
+                other = coords[int(ring_offsets[k]) : int(ring_offsets[k + 1])]
+                covered = intersection_area(ring, np.asarray(other))
+                area += -covered if k > part_offsets[part] else covered
+            areas[query] += max(area, 0.0)
+        return areas
+
+    def info(self) -> ReferenceLayerInfo:
+        return {
+            "name": self.name,
+            "format": self.format,
+            "parts": len(self),
+            "indexed": self.indexed,
+        }
+
+
+class ReferenceLayers:
+    """Screens fields against every reference layer, caching the results.
+
+    A field's result is kept with the record it was computed for, so it
+    stays valid until the field is replaced in the repository, and with
+    the generation of the layers, which moves on whenever a layer is
+    indexed, added, changed or removed. Layers not indexed yet are
+    left out of the results until ``screen_fields`` has built them.
+    """
+
+    def __init__(self, directory: Path, fields: Repository, polygons: PolygonStore):
+        self.directory = directory
+        self._fields = fields
+        self._polygons = polygons
+        self._layers: dict[str, ReferenceLayer] = {}
+        self._generation = 0
+        self._results: dict[str, tuple[dict, int, list[FieldRisk]]] = {}
+        self.scan()
+        fields.subscribe(self._on_field)
+
+    def _on_field(self, old, new):
+        if old and not new:
+            self._results.pop(old["id"], None)
+
+    def scan(self):
+        """Pick up added, changed and removed layer files.
+
+        Layers whose file is unchanged are kept as they are; the others
+        map their saved index if it is up to date, and cached results are
+        dropped when anything changed.
+        """
+        sources = []
+        if self.directory.is_dir():
+            sources = sorted(
+                p
+                for p in self.directory.iterdir()
+                if p.is_file() and p.suffix.lower() in LAYER_SUFFIXES
+            )
+        layers = {}
+        changed = len(sources) != len(self._layers)
+        for source in sources:
+            layer = self._layers.get(source.stem)
+            if layer is None or layer.source != source or not layer.current:
+                layer = ReferenceLayer(source)
+                layer.open()
+                changed = True
+            layers[layer.name] = layer
+        self._layers = layers
+        if changed:
+            self.invalidate()
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def invalidate(self):
+        self._generation += 1
+
+    def layers(self) -> list[ReferenceLayer]:
+        return list(self._layers.values())
+
+    def screen(self, polygons: list[list[np.ndarray]]) -> list[list[FieldRisk]]:
+        """Get the indexed layers each polygon overlaps, without caching.
+
+        Polygons are an outer ring followed by holes, whose overlap is taken
+        off the outer ring's. Only reads the mapped indexes, so it may run
+        on a worker thread.
+        """
+        risks: list[list[FieldRisk]] = [[] for _ in polygons]
+        rings = [ring for polygon in polygons for ring in polygon]
+        owners = np.repeat(np.arange(len(polygons)), [len(p) for p in polygons])
+        signs = np.array([-1.0 if k else 1.0 for p in polygons for k in range(len(p))])
+        for layer in self.layers():
+            areas = np.zeros(len(polygons))
+            np.add.at(areas, owners, signs * layer.overlap_areas(rings))
+            for index in np.flatnonzero(areas >= MIN_RISK_AREA).tolist():
+                risks[index].append(
+                    {"layer": layer.name, "area": round(float(areas[index]), 4)}
+                )
+        return risks
+
+    def _cached(self, field: dict) -> list[FieldRisk] | None:
+        entry = self._results.get(field["id"])
+        if entry is None or entry[0] is not field or entry[1] != self._generation:
+            return None
+        return entry[2]
+
+    def store(self, fields: list[dict], risks: list[list[FieldRisk]], generation: int):
+        """Keep results computed for these field records at ``generation``."""
+        for field, field_risks in zip(fields, risks):
+            self._results[field["id"]] = (field, generation, field_risks)
+
+    def unscreened(self) -> list[dict]:
+        return [f for f in self._fields.all() if self._cached(f) is None]
+
+    def risks(self, field_ids: list[str]) -> dict[str, list[FieldRisk]]:
+        """Get the risks of some fields, screening those not cached in bulk."""
+        results: dict[str, list[FieldRisk]] = {}
+        missing = []
+        for field_id in field_ids:
+            field = self._fields.get(field_id)
+            if field is None:
+                continue
+            cached = self._cached(field)
+            if cached is None:
+                missing.append(field)
+            else:
+                results[field_id] = cached
+        if missing:
+            polygons = [self._polygons.rings(f["id"]) for f in missing]
+            screened = self.screen(polygons)
+            self.store(missing, screened, self._generation)
+            for field, field_risks in zip(missing, screened):
+                results[field["id"]] = field_risks
+        return results
+
+    def risk_layers(self, field_ids: list[str]) -> dict[str, list[str]]:
+        """Get the names of the layers each field overlaps."""
+        return {
+            field_id: [r["layer"] for r in field_risks]
+            for field_id, field_risks in self.risks(field_ids).items()
+        }
+
+    def flagged(self) -> int:
+        """Count the fields known to overlap a layer."""
+        return sum(
+            1
+            for field in self._fields.all()
+            if (risks := self._cached(field)) is not None and risks
+        )
+
+
+reference_layers = ReferenceLayers(REFERENCE_DIR, field_repo, polygon_store)
+
+
+def screen_fields(job: Job) -> str:
+    """Index new or changed reference files and screen every field against them.
+
+    Runs as a background job: layer files are read and overlaps computed
+    on the worker thread, while the field snapshot and the results go
+    through the event loop in batches.
+    """
+    job.call(reference_layers.scan)
+    layers = job.call(reference_layers.layers)
+    built = 0
+    for layer in layers:
+        if not layer.indexed:
+            job.report(message=f"Indexing {layer.name}...")
+            layer.build(job)
+            built += 1
+    if built:
+        job.call(reference_layers.invalidate)
+
+    def snapshot():
+        fields = reference_layers.unscreened()
+        polygons = [polygon_store.rings(f["id"]) for f in fields]
+        return fields, polygons, reference_layers.generation
+
+    fields, polygons, generation = job.call(snapshot)
+    flagged = 0
+    for start in range(0, len(fields), SCREEN_BATCH_SIZE):
+        job.check_cancelled()
+        batch = slice(start, start + SCREEN_BATCH_SIZE)
+        risks = reference_layers.screen(polygons[batch])
+        job.call(reference_layers.store, fields[batch], risks, generation)
+        flagged += sum(1 for r in risks if r)
+        done = min(start + SCREEN_BATCH_SIZE, len(fields))
+        job.report(processed=done, percent=done * 100 // max(len(fields), 1))
+    return (
+        f"Screened {len(fields)} fields against {len(layers)} reference layers "
+        f"({built} indexed); {flagged} of them overlap a layer."
+    )
\ No newline at end of file
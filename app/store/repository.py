@@ -0,0 +1,224 @@
+import itertools
+from contextlib import nullcontext
+from typing import Callable, ContextManager, Generic, Iterable, TypeVar
+from app.store import seed
+from app.store.database import FieldTable, Table, database
+from app.store.polygons import polygon_store
+
+RecordT = TypeVar("RecordT")
+Listener = Callable[[RecordT | None, RecordT | None], None]
+Prepare = Callable[[list[RecordT]], list[RecordT]]
+Stage = Callable[[list[str]], ContextManager]
+
+
+class Repository(Generic[RecordT]):
+    """A process-wide, id-keyed collection of records shared by all sessions.
+
+    Every mutation bumps ``version`` and is reported to subscribed listeners
+    as ``(old, new)``, with ``None`` standing in for a missing record. The
+    list returned by ``all`` is shared between callers and must be treated
+    as read-only. ``prepare`` maps each batch of incoming records to the
+    records actually stored, for values derived on write. If ``prepare``
+    keeps state of its own, ``stage(ids)`` wraps preparing and saving a
+    batch and must undo what ``prepare`` did when the block raises.
+
+    With a ``table``, records are loaded from it once its database is
+    opened, or it is filled with ``records`` if empty, and every change is
+    written to it in one transaction before it is applied, so a failed
+    write changes neither the records nor, through ``stage``, what
+    ``prepare`` stored. Changes other processes make to the table are
+    applied as they are polled. Loaded records, like changed ones, are
+    reported to listeners, so indexes over a repository only subscribe.
+    """
+
+    def __init__(
+        self,
+        records: Iterable[RecordT] = (),
+        prepare: Prepare | None = None,
+        table: Table | None = None,
+        stage: Stage | None = None,
+    ):
+        if table is not None and table.key != "id":
+            raise ValueError(f"{table.name} is not keyed by record id.")
+        self._prepare: Prepare = prepare or list
+        self._stage: Stage = stage or (lambda record_ids: nullcontext())
+        self._table = table
+        self._seed = records
+        self._records: dict[str, RecordT] | None = None
+        self._snapshot: list[RecordT] | None = None
+        self.version = 0
+        self._listeners: list[Listener] = []
+        if table is None:
+            self._load()
+        else:
+            table.on_open(self._load)
+            table.watch(self._refresh)
+
+    def _load(self):
+        """Load the records, reporting each to listeners as added."""
+        if self._records is not None:
+            return
+        if self._table is not None and len(self._table):
+            loaded = list(self._table.load())
+        else:
+            loaded = self._prepare(list(self._seed))
+            if self._table is not None:
+                self._table.save(loaded)
+        self._seed = ()
+        self._records = {}
+        for record in loaded:
+            self._put(record)
+        self._changed()
+
+    def _open(self):
+        # Opening the database loads every repository on it in order; one
+        # needed while that is under way is loaded on the spot.
+        self._table.open()
+        self._load()
+
+    def __len__(self) -> int:
+        if self._records is None:
+            self._open()
+        return len(self._records)
+
+    def __contains__(self, record_id: str) -> bool:
+        if self._records is None:
+            self._open()
+        return record_id in self._records
+
+    def subscribe(self, listener: Listener):
+        """Call ``listener(old, new)`` after every change to a record.
+
+        Records already loaded are reported to it as added right away.
+        """
+        self._listeners.append(listener)
+        for record in (self._records or {}).values():
+            listener(None, record)
+
+    def _put(self, record: RecordT):
+        old = self._records.get(record["id"])
+        self._records[record["id"]] = record
+        for listener in self._listeners:
+            listener(old, record)
+
+    def _changed(self):
+        self._snapshot = None
+        self.version += 1
+
+    def _write(self, records: list[RecordT]) -> list[RecordT]:
+        """Prepare and save records, undoing ``prepare`` if either fails."""
+        with self._stage([r["id"] for r in records]):
+            records = self._prepare(records)
+            if self._table is not None:
+                self._table.save(records)
+        return records
+
+    def _refresh(self, record_ids: list[str] | None):
+        """Reload records another process changed, or all of them."""
+        if record_ids is None:
+            record_ids = list(dict.fromkeys([*self._records, *self._table.ids()]))
+        stored = {r["id"]: r for r in self._table.get(record_ids)}
+        for record_id in record_ids:
+            if record_id in stored:
+                self._put(stored[record_id])
+            elif (record := self._records.pop(record_id, None)) is not None:
+                for listener in self._listeners:
+                    listener(record, None)
+        self._changed()
+
+    def get(self, record_id: str) -> RecordT | None:
+        if self._records is None:
+            self._open()
+        return self._records.get(record_id)
+
+    def page(self, offset: int, limit: int) -> list[RecordT]:
+        """Get up to ``limit`` records from position ``offset`` on, in
+        insertion order, without copying the others."""
+        if self._records is None:
+            self._open()
+        if self._snapshot is not None:
+            return self._snapshot[offset : offset + limit]
+        return list(itertools.islice(self._records.values(), offset, offset + limit))
+
+    def all(self) -> list[RecordT]:
+        """Get every record in insertion order."""
+        if self._records is None:
+            self._open()
+        if self._snapshot is None:
+            self._snapshot = list(self._records.values())
+        return self._snapshot
+
+    def _applying(self) -> ContextManager:
+        # Other processes' versions only count a write once it is applied.
+        if self._table is None:
+            return nullcontext()
+        return self._table.applying()
+
+    def add(self, record: RecordT):
+        if self._records is None:
+            self._open()
+        with self._applying():
+            self._put(self._write([record])[0])
+            self._changed()
+
+    def extend(self, records: Iterable[RecordT]):
+        """Add many records with a single version bump and transaction."""
+        if self._records is None:
+            self._open()
+        with self._applying():
+            for record in self._write(list(records)):
+                self._put(record)
+            self._changed()
+
+    def update(self, record: RecordT) -> bool:
+        """Replace the record with the same id, keeping its position."""
+        if self._records is None:
+            self._open()
+        if record["id"] not in self._records:
+            return False
+        with self._applying():
+            self._put(self._write([record])[0])
+            self._changed()
+        return True
+
+    def remove(self, record_id: str) -> RecordT | None:
+        if self._records is None:
+            self._open()
+        with self._applying():
+            if record_id in self._records and self._table is not None:
+                self._table.delete([record_id])
+            record = self._records.pop(record_id, None)
+            if record is not None:
+                for listener in self._listeners:
+                    listener(record, None)
+                self._changed()
+        return record
+
+
+cooperative_repo: Repository = Repository(
+    seed.COOPERATIVES, table=Table(database, "cooperatives")
+)
+farmer_repo: Repository = Repository(
+    seed.FARMERS, table=Table(database, "farmers", columns=("cooperative_id",))
+)
+field_table = FieldTable(database, polygon_store, columns=("farmer_id", "crop"))
+field_repo: Repository = Repository(
+    seed.FIELDS,
+    prepare=polygon_store.ingest,
+    table=field_table,
+    stage=polygon_store.staged,
+)
+field_repo.subscribe(polygon_store.on_change)
+poi_repo: Repository = Repository(
+    seed.POINTS_OF_INTEREST, table=Table(database, "points_of_interest")
+)
+
+
+def current_version() -> int:
+    """A number that increases whenever any shared repository changes.
+
+    It is the database's change sequence number, so it means the same data
+    in every backend process and can key shared caches. Changes other
+    processes saved are applied first.
+    """
+    return database.version
\ No newline at end of file
@@ -0,0 +1,83 @@
+from typing import Iterable, TypedDict
+from app.store.repository import Repository, farmer_repo, field_repo
+
+# [field count, declared hectares] of one crop.
+Totals = dict[str, list[float]]
+
+
+class CropTotals(TypedDict):
+    crop: str
+    fields: int
+    area: float
+
+
+def _add(totals: Totals, crop: str, count: int, area: float):
+    bucket = totals.setdefault(crop, [0, 0.0])
+    bucket[0] += count
+    bucket[1] += area
+    if bucket[0] == 0:
+        # Dropping an emptied bucket also drops its rounding error.
+        del totals[crop]
+
+
+class CropRollups:
+    """Field counts and declared areas per cooperative and crop.
+
+    The rollups listen to the farmer and field repositories like the
+    visibility index does, and apply each change as a delta: a field change
+    moves one field between two buckets, and a farmer joining another
+    cooperative moves their per-crop totals across. No change costs more
+    than the crops involved, whatever the number of fields. A viewer's
+    totals merge the buckets of the cooperatives they may see.
+    """
+
+    def __init__(self, farmers: Repository, fields: Repository):
+        self._farmer_coop: dict[str, str | None] = {}
+        self._farmer_totals: dict[str, Totals] = {}
+        self._coop_totals: dict[str | None, Totals] = {}
+        farmers.subscribe(self._on_farmer)
+        fields.subscribe(self._on_field)
+
+    def _on_farmer(self, old, new):
+        farmer_id = (new or old)["id"]
+        old_coop = self._farmer_coop.get(farmer_id)
+        new_coop = new["cooperative_id"] if new else None
+        if new:
+            self._farmer_coop[farmer_id] = new_coop
+        else:
+            self._farmer_coop.pop(farmer_id, None)
+        if old_coop != new_coop:
+            for crop, (count, area) in self._farmer_totals.get(farmer_id, {}).items():
+                _add(self._coop_totals.setdefault(old_coop, {}), crop, -count, -area)
+                _add(self._coop_totals.setdefault(new_coop, {}), crop, count, area)
+
+    def _on_field(self, old, new):
+        for field, sign in ((old, -1), (new, 1)):
+            if field:
+                farmer_id, crop = field["farmer_id"], field["crop"]
+                area = sign * field["area"]
+                coop_id = self._farmer_coop.get(farmer_id)
+                _add(self._farmer_totals.setdefault(farmer_id, {}), crop, sign, area)
+                _add(self._coop_totals.setdefault(coop_id, {}), crop, sign, area)
+
+    def totals(self, cooperative_ids: Iterable[str] | None = None) -> list[CropTotals]:
+        """Get the totals of each crop over some cooperatives, or all fields,
+        most common crop first."""
+        if cooperative_ids is None:
+            buckets = self._coop_totals.values()
+        else:
+            buckets = [self._coop_totals.get(c, {}) for c in set(cooperative_ids)]
+        merged: Totals = {}
+        for bucket in buckets:
+            for crop, (count, area) in bucket.items():
+                _add(merged, crop, count, area)
+        return sorted(
+            (
+                {"crop": crop, "fields": int(count), "area": round(area, 2)}
+                for crop, (count, area) in merged.items()
+            ),
+            key=lambda t: (-t["fields"], t["crop"]),
+        )
+
+
+crop_rollups = CropRollups(farmer_repo, field_repo)
\ No newline at end of file
@@ -0,0 +1,286 @@
+import bisect
+import itertools
+import re
+import unicodedata
+from collections import Counter
+from contextlib import contextmanager
+from typing import Iterable, Iterator
+from app.store.repository import (
+    Repository,
+    cooperative_repo,
+    farmer_repo,
+    field_repo,
+)
+from app.store.visibility import VisibilityIndex, visibility_index
+
+EXACT, PREFIX, SUBSTRING, FUZZY = 1.0, 0.8, 0.6, 0.4
+# Shorter query terms only match whole tokens. A single letter starts a
+# sixteenth of all field ids, so it would walk most of the vocabulary.
+MIN_PREFIX_LENGTH = 2
+
+
+def normalize(text: str) -> str:
+    """Case-fold ``text`` and strip accents, so "Équateur" matches "equateur"."""
+    if text.isascii():
+        return text.lower()
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+
+def tokenize(text: str) -> list[str]:
+    return re.findall(r"\w+", normalize(text))
+
+
+def field_text(field: dict, cooperative: dict | None) -> str:
+    """Get the text a field is indexed under, given its farmer's cooperative."""
+    text = [field["farmer_name"], field["crop"], field["id"]]
+    if cooperative:
+        text.append(cooperative["name"])
+    return " ".join(text)
+
+
+def _grams(token: str) -> set[str]:
+    if len(token) < 3:
+        return {token}
+    return {token[i : i + 3] for i in range(len(token) - 2)}
+
+
+def _within_distance(a: str, b: str, max_distance: int) -> bool:
+    """Check whether the Levenshtein distance between a and b is small enough."""
+    if abs(len(a) - len(b)) > max_distance:
+        return False
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(
+                min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb))
+            )
+        if min(current) > max_distance:
+            return False
+        previous = current
+    return previous[-1] <= max_distance
+
+
+class SearchIndex:
+    """An inverted and trigram index over the field directory.
+
+    Each field is indexed under the tokens of its farmer name, crop, id and
+    cooperative name. Query terms match tokens exactly, by prefix, by
+    substring and, when nothing else matches, within a small edit distance.
+    A field must match every term. The smallest posting list among the
+    terms is walked and each of its fields checked against its own tokens,
+    so large posting lists are never merged or intersected and the cost
+    grows with the fields returned rather than the fields matched. The
+    index follows field, farmer and cooperative changes through repository
+    listeners.
+    """
+
+    def __init__(
+        self,
+        fields: Repository,
+        farmers: Repository,
+        cooperatives: Repository,
+        visibility: VisibilityIndex,
+    ):
+        self._fields = fields
+        self._farmers = farmers
+        self._cooperatives = cooperatives
+        self._visibility = visibility
+        self._docs: dict[str, set[str]] = {}
+        self._postings: dict[str, set[str]] = {}
+        self._vocabulary: list[str] = []
+        self._grams: dict[str, set[str]] = {}
+        self._pretokenized: dict[str, tuple[str, list[str]]] = {}
+        cooperatives.subscribe(self._on_cooperative)
+        farmers.subscribe(self._on_farmer)
+        fields.subscribe(self._on_field)
+
+    @contextmanager
+    def pretokenized(self, tokens: dict[str, tuple[str, list[str]]]) -> Iterator[None]:
+        """Index the fields added in the block under tokens taken beforehand.
+
+        ``tokens`` maps field ids to the ``field_text`` they were taken from
+        and its tokens, so fields can be tokenized off the event loop. A
+        field whose text has changed since is tokenized again.
+        """
+        self._pretokenized = tokens
+        try:
+            yield
+        finally:
+            self._pretokenized = {}
+
+    def _field_tokens(self, field) -> set[str]:
+        farmer = self._farmers.get(field["farmer_id"])
+        coop = self._cooperatives.get(farmer["cooperative_id"]) if farmer else None
+        text = field_text(field, coop)
+        taken, tokens = self._pretokenized.get(field["id"], (None, None))
+        return set(tokens if taken == text else tokenize(text))
+
+    def _index(self, field):
+        tokens = self._field_tokens(field)
+        self._docs[field["id"]] = tokens
+        for token in tokens:
+            posting = self._postings.get(token)
+            if posting is None:
+                posting = self._postings[token] = set()
+                bisect.insort(self._vocabulary, token)
+                for gram in _grams(token):
+                    self._grams.setdefault(gram, set()).add(token)
+            posting.add(field["id"])
+
+    def _unindex(self, field_id: str):
+        for token in self._docs.pop(field_id, ()):
+            posting = self._postings[token]
+            posting.discard(field_id)
+            if not posting:
+                del self._postings[token]
+                del self._vocabulary[bisect.bisect_left(self._vocabulary, token)]
+                for gram in _grams(token):
+                    self._grams[gram].discard(token)
+
+    def _reindex(self, field_ids: Iterable[str]):
+        for field_id in list(field_ids):
+            field = self._fields.get(field_id)
+            if field:
+                self._unindex(field_id)
+                self._index(field)
+
+    def _on_field(self, old, new):
+        if old:
+            self._unindex(old["id"])
+        if new:
+            self._index(new)
+
+    def _on_farmer(self, old, new):
+        # A field's tokens only take the cooperative from its farmer.
+        if old and new and old["cooperative_id"] == new["cooperative_id"]:
+            return
+        farmer = new or old
+        self._reindex(self._visibility.farmer_field_ids(farmer["id"]))
+
+    def _on_cooperative(self, old, new):
+        if old and new and old["name"] == new["name"]:
+            return
+        coop = new or old
+        self._reindex(self._visibility.field_ids_for(coop["id"]))
+
+    def _expand(self, term: str) -> Iterable[tuple[str, float]]:
+        """Yield the indexed tokens matching a query term with their quality."""
+        matched = False
+        if term in self._postings:
+            matched = True
+            yield term, EXACT
+        if len(term) < MIN_PREFIX_LENGTH:
+            return
+        i = bisect.bisect_right(self._vocabulary, term)
+        while i < len(self._vocabulary) and self._vocabulary[i].startswith(term):
+            matched = True
+            yield self._vocabulary[i], PREFIX
+            i += 1
+        if len(term) >= 3:
+            candidates = None
+            for gram in _grams(term):
+                tokens = self._grams.get(gram, set())
+                candidates = tokens if candidates is None else candidates & tokens
+            for token in candidates or ():
+                if term in token and not token.startswith(term):
+                    matched = True
+                    yield token, SUBSTRING
+        if matched or len(term) < 4:
+            return
+        max_distance = 1 if len(term) < 8 else 2
+        term_grams = _grams(term)
+        shared = Counter(
+            token for gram in term_grams for token in self._grams.get(gram, ())
+        )
+        min_shared = len(term_grams) - 3 * max_distance
+        if min_shared <= 0:
+            # A typo can break every trigram of a short term, so the tokens
+            # starting with its first two letters are tried as well.
+            start = term[:MIN_PREFIX_LENGTH]
+            i = bisect.bisect_left(self._vocabulary, start)
+            while i < len(self._vocabulary) and self._vocabulary[i].startswith(start):
+                shared[self._vocabulary[i]] += 0
+                i += 1
+        for token, count in shared.items():
+            if count >= min_shared and _within_distance(term, token, max_distance):
+                yield token, FUZZY
+
+    def _term_matches(self, term: str) -> tuple[dict[str, float], dict[float, list]]:
+        """Get the quality of each token matching a term, and their postings
+        by quality."""
+        qualities: dict[str, float] = {}
+        postings: dict[float, list[set[str]]] = {}
+        for token, quality in self._expand(term):
+            qualities[token] = quality
+            postings.setdefault(quality, []).append(self._postings[token])
+        return qualities, postings
+
+    def _quality(self, qualities: dict[str, float], field_id: str) -> float:
+        """Get how well a field's best token matches a term."""
+        return max(qualities.get(token, 0.0) for token in self._docs[field_id])
+
+    def _combo_matches(
+        self, per_term: list[tuple[dict, dict]], combo: tuple[float, ...]
+    ) -> Iterator[str]:
+        """Yield the fields whose best match for each term has the quality
+        ``combo`` gives it.
+
+        The postings of the term with the fewest fields at its quality are
+        walked, and each field is checked against its own tokens, so large
+        postings of other terms are never merged or intersected.
+        """
+        sizes = [
+            sum(map(len, postings[quality]))
+            for (_, postings), quality in zip(per_term, combo)
+        ]
+        driver = sizes.index(min(sizes))
+        seen: set[str] = set()
+        for posting in per_term[driver][1][combo[driver]]:
+            for field_id in posting:
+                if field_id in seen:
+                    continue
+                seen.add(field_id)
+                if all(
+                    self._quality(qualities, field_id) == quality
+                    for (qualities, _), quality in zip(per_term, combo)
+                ):
+                    yield field_id
+
+    def search(
+        self,
+        query: str,
+        limit: int | None = 100,
+        within: Iterable[Iterable[str]] | None = None,
+    ) -> list[str]:
+        """Get the ids of the best-matching fields, best first.
+
+        A field's score is the sum of the quality of each term's best match;
+        fields with equal scores come back in no particular order. When
+        ``within`` is given, only fields in one of its id collections are
+        returned.
+        """
+        per_term = [self._term_matches(term) for term in tokenize(query)]
+        if not per_term or not all(qualities for qualities, _ in per_term):
+            return []
+        within = list(within) if within is not None else None
+        combos = sorted(
+            itertools.product(*(postings for _, postings in per_term)),
+            key=sum,
+            reverse=True,
+        )
+        results: list[str] = []
+        for combo in combos:
+            field_ids = self._combo_matches(per_term, combo)
+            if within is not None:
+                field_ids = (i for i in field_ids if any(i in c for c in within))
+            if limit is not None:
+                field_ids = itertools.islice(field_ids, limit - len(results))
+            results.extend(sorted(field_ids))
+            if limit is not None and len(results) >= limit:
+                break
+        return results
+
+
+search_index = SearchIndex(field_repo, farmer_repo, cooperative_repo, visibility_index)
\ No newline at end of file
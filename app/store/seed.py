@@ -0,0 +1,124 @@
+from reflex_enterprise.components.map.types import latlng
+
+COOPERATIVES = [
+    {"id": "coop-kivu", "name": "COOPEC-Kivu Coffee"},
+    {"id": "coop-equateur", "name": "COCACO-DRC Cocoa"},
+]
+
+FARMERS = [
+    {"id": "farmer-001", "name": "Amani Dufatanye", "cooperative_id": "coop-kivu"},
+    {"id": "farmer-002", "name": "Baraka Mwangaza", "cooperative_id": "coop-kivu"},
+    {
+        "id": "farmer-003",
+        "name": "Lokole Bofunda",
+        "cooperative_id": "coop-equateur",
+    },
+]
+
+FIELDS = [
+    {
+        "id": "field-kivu-001",
+        "farmer_id": "farmer-001",
+        "farmer_name": "Amani Dufatanye",
+        "crop": "Arabica Coffee",
+        "area": 5.2,
+        "polygon": [
+            latlng(lat=-2.25, lng=28.85),
+            latlng(lat=-2.26, lng=28.86),
+            latlng(lat=-2.27, lng=28.85),
+            latlng(lat=-2.26, lng=28.84),
+        ],
+    },
+    {
+        "id": "field-kivu-002",
+        "farmer_id": "farmer-002",
+        "farmer_name": "Baraka Mwangaza",
+        "crop": "Robusta Coffee",
+        "area": 7.8,
+        "polygon": [
+            latlng(lat=-2.94, lng=29.06),
+            latlng(lat=-2.95, lng=29.07),
+            latlng(lat=-2.96, lng=29.06),
+            latlng(lat=-2.95, lng=29.05),
+        ],
+    },
+    {
+        "id": "field-equateur-001",
+        "farmer_id": "farmer-003",
+        "farmer_name": "Lokole Bofunda",
+        "crop": "Cocoa",
+        "area": 12.5,
+        "polygon": [
+            latlng(lat=0.05, lng=18.25),
+            latlng(lat=0.06, lng=18.26),
+            latlng(lat=0.05, lng=18.27),
+            latlng(lat=0.04, lng=18.26),
+        ],
+    },
+]
+
+POINTS_OF_INTEREST = [
+    {
+        "id": "poi-bukavu-warehouse",
+        "name": "Bukavu Coffee Warehouse",
+        "type": "Warehouse",
+        "location": latlng(lat=-2.5044, lng=28.8611),
+    },
+    {
+        "id": "poi-kisangani-plant",
+        "name": "Kisangani Cocoa Processing",
+        "type": "Processing Plant",
+        "location": latlng(lat=0.515, lng=25.195),
+    },
+    {
+        "id": "poi-goma-farm",
+        "name": "Goma Farmstead",
+        "type": "Farm",
+        "location": latlng(lat=-1.675, lng=29.225),
+    },
+]
+
+TIMELINE_EVENTS = [
+    {
+        "field_id": "field-kivu-001",
+        "date": "2023-06-10",
+        "stage": "Harvest",
+        "description": "Arabica coffee cherries harvested by hand.",
+        "location": "Amani Dufatanye's Farm, South Kivu",
+    },
+    {
+        "field_id": "field-kivu-001",
+        "date": "2023-06-12",
+        "stage": "Drying/Fermentation",
+        "description": "Coffee cherries washed and laid out on drying beds.",
+        "location": "Bukavu Washing Station",
+    },
+    {
+        "field_id": "field-kivu-001",
+        "date": "2023-07-01",
+        "stage": "Processing",
+        "description": "Dried beans milled and sorted for quality.",
+        "location": "COOPEC-Kivu Plant, Bukavu",
+    },
+    {
+        "field_id": "field-kivu-001",
+        "date": "2023-07-15",
+        "stage": "Export",
+        "description": "Coffee bags shipped from Port of Matadi.",
+        "location": "Port of Matadi",
+    },
+    {
+        "field_id": "field-equateur-001",
+        "date": "2023-09-25",
+        "stage": "Harvest",
+        "description": "Cocoa pods harvested from trees.",
+        "location": "Lokole Bofunda's Farm, Équateur",
+    },
+    {
+        "field_id": "field-equateur-001",
+        "date": "2023-09-28",
+        "stage": "Drying/Fermentation",
+        "description": "Cocoa beans fermented in heaps and sun-dried.",
+        "location": "Mbandaka Fermentation Center",
+    },
+]
\ No newline at end of file
@@ -0,0 +1,51 @@
+from app.geo import Box, STRtree, intersects
+from app.store.repository import Repository, field_repo
+
+
+class FieldSpatialIndex:
+    """Bounding boxes of every field polygon behind an STR-tree.
+
+    STR-trees cannot be updated in place, so changes since the last build are
+    kept aside: new boxes are scanned linearly and removed ids are filtered
+    out of tree results. The tree is rebuilt on the next query once the
+    backlog grows past ``rebuild_ratio`` of the index.
+    """
+
+    def __init__(self, fields: Repository, rebuild_ratio: float = 0.05):
+        self.rebuild_ratio = rebuild_ratio
+        self._boxes: dict[str, Box] = {}
+        self._pending: dict[str, Box] = {}
+        self._removed: set[str] = set()
+        self._tree = STRtree([])
+        fields.subscribe(self._on_field)
+
+    def _on_field(self, old, new):
+        if old:
+            self._boxes.pop(old["id"], None)
+            if self._pending.pop(old["id"], None) is None:
+                self._removed.add(old["id"])
+        if new:
+            if new["bbox"] is not None:
+                box = tuple(new["bbox"])
+                self._boxes[new["id"]] = box
+                self._pending[new["id"]] = box
+
+    def _rebuild(self):
+        self._tree = STRtree([(box, field_id) for field_id, box in self._boxes.items()])
+        self._pending.clear()
+        self._removed.clear()
+
+    def bbox(self, field_id: str) -> Box | None:
+        return self._boxes.get(field_id)
+
+    def query(self, box: Box) -> list[str]:
+        """Get the ids of the fields whose bounding box intersects ``box``."""
+        backlog = len(self._pending) + len(self._removed)
+        if backlog > max(64, self.rebuild_ratio * len(self._boxes)):
+            self._rebuild()
+        field_ids = [i for i in self._tree.query(box) if i not in self._removed]
+        field_ids.extend(i for i, b in self._pending.items() if intersects(b, box))
+        return field_ids
+
+
+field_spatial_index = FieldSpatialIndex(field_repo)
\ No newline at end of file
@@ -0,0 +1,120 @@
+import itertools
+import time
+from collections import OrderedDict
+from typing import Hashable, Literal, TypedDict
+
+# Clients whose copies are tracked; the least recently patched are dropped
+# and get a full resync on their next change.
+MAX_STREAMS = 512
+# Share of a list changed above which sending it whole is no bigger.
+RESYNC_SHARE = 0.5
+
+# Patch versions are unique per process and start from the clock, so a
+# patch made by another worker or after a restart never continues a
+# client's stream by mistake. Microseconds stay exact as JavaScript numbers.
+_versions = itertools.count(int(time.time() * 1_000_000))
+
+
+class PatchOp(TypedDict):
+    op: Literal["insert", "update", "delete"]
+    id: str
+    record: dict | None
+
+
+class Patch(TypedDict):
+    """Brings a browser's copy of a keyed list from ``base`` to ``version``.
+
+    A ``reset`` patch replaces the copy whatever its version. ``order``
+    lists every id when applying the ops in place would leave the records
+    out of order; updates keep their position and inserts are appended.
+    """
+
+    version: int
+    base: int
+    reset: bool
+    ops: list[PatchOp]
+    order: list[str] | None
+
+
+class _Stream:
+    """What one client holds of one list: its version and records by id."""
+
+    def __init__(self):
+        self.version = 0
+        self.records: dict[str, dict] = {}
+
+
+class KeyedSync:
+    """Keyed patches that keep each browser's copy of a record list current.
+
+    Sending a list var resends every record whenever any of them changes.
+    Instead, a stream per client and list remembers the records it was
+    last sent, and ``patch`` diffs the new list against them: records that
+    are the same object, or equal, cost nothing, and only the inserted,
+    updated and deleted ones go over the wire. A change touching most of
+    the list, an unknown client and a client that asked for a ``reset``
+    are sent the whole list instead. The streams live in this process and
+    are bounded by ``maxsize``.
+    """
+
+    def __init__(self, maxsize: int = MAX_STREAMS):
+        self.maxsize = maxsize
+        self._streams: OrderedDict[Hashable, _Stream] = OrderedDict()
+
+    def reset(self, client: str, name: str):
+        """Forget what a client holds of a list, so it gets all of it next."""
+        self._streams.pop((client, name), None)
+
+    def patch(
+        self, client: str, name: str, records: list[dict], ordered: bool = True
+    ) -> Patch:
+        """Get the patch bringing a client's copy of a list to ``records``.
+
+        With ``ordered`` false the client's order is left as it comes.
+        """
+        key = (client, name)
+        stream = self._streams.pop(key, None)
+        self._streams[key] = new = _Stream()
+        if len(self._streams) > self.maxsize:
+            self._streams.popitem(last=False)
+        new.version = next(_versions)
+        new.records = {r["id"]: r for r in records}
+        if stream is not None:
+            ops: list[PatchOp] = [
+                {"op": "delete", "id": record_id, "record": None}
+                for record_id in stream.records
+                if record_id not in new.records
+            ]
+            for record_id, record in new.records.items():
+                held = stream.records.get(record_id)
+                if held is None:
+                    ops.append({"op": "insert", "id": record_id, "record": record})
+                elif held is not record and held != record:
+                    ops.append({"op": "update", "id": record_id, "record": record})
+            if len(ops) <= RESYNC_SHARE * len(new.records):
+                order = None
+                if ordered:
+                    kept = [i for i in stream.records if i in new.records]
+                    added = [i for i in new.records if i not in stream.records]
+                    if kept + added != list(new.records):
+                        order = list(new.records)
+                return {
+                    "version": new.version,
+                    "base": stream.version,
+                    "reset": False,
+                    "ops": ops,
+                    "order": order,
+                }
+        return {
+            "version": new.version,
+            "base": stream.version if stream else 0,
+            "reset": True,
+            "ops": [
+                {"op": "insert", "id": record_id, "record": record}
+                for record_id, record in new.records.items()
+            ],
+            "order": None,
+        }
+
+
+field_sync = KeyedSync()
\ No newline at end of file
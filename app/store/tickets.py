@@ -0,0 +1,67 @@
+import secrets
+import time
+from app.store.database import Table, database
+
+# Seconds a ticket can be redeemed for once issued.
+TICKET_LIFETIME = 60.0
+
+
+class TicketStore:
+    """Short-lived tickets that stand in for a session in URLs.
+
+    A URL the browser fetches by itself, such as a download, can't carry
+    headers, and the client token it could carry would outlive the request
+    and open every route of the session. A ticket instead carries the
+    grant it was issued with for one ``purpose`` and expires after
+    ``lifetime`` seconds, or the lifetime it was issued with. It is either
+    redeemed at most once or, for URLs fetched many times such as map
+    tiles, checked on every use until it expires. Tickets live in
+    ``table``, so any backend process can redeem one another issued.
+    """
+
+    def __init__(self, table: Table, lifetime: float = TICKET_LIFETIME):
+        self._table = table
+        self.lifetime = lifetime
+
+    def issue(self, purpose: str, grant: dict, lifetime: float | None = None) -> str:
+        """Get a new ticket for ``grant``, dropping the expired ones."""
+        now = time.time()
+        self._table.delete([t["id"] for t in self._table.load() if t["expires"] < now])
+        ticket = secrets.token_urlsafe(32)
+        self._table.save(
+            [
+                {
+                    "id": ticket,
+                    "purpose": purpose,
+                    "grant": grant,
+                    "expires": now + (lifetime or self.lifetime),
+                }
+            ]
+        )
+        return ticket
+
+    def redeem(self, ticket: str | None, purpose: str) -> dict | None:
+        """Use up a ticket and get its grant, or None if it is unknown,
+        expired, already used or issued for another purpose."""
+        if not ticket:
+            return None
+        return self._grant(self._table.pop([ticket]), purpose)
+
+    def check(self, ticket: str | None, purpose: str) -> dict | None:
+        """Get the grant of a ticket without using it up, or None if it is
+        unknown, expired or issued for another purpose."""
+        if not ticket:
+            return None
+        return self._grant(self._table.get([ticket]), purpose)
+
+    @staticmethod
+    def _grant(records: list[dict], purpose: str) -> dict | None:
+        if not records:
+            return None
+        record = records[0]
+        if record["purpose"] != purpose or record["expires"] < time.time():
+            return None
+        return record["grant"]
+
+
+ticket_store = TicketStore(Table(database, "tickets", logged=False))
\ No newline at end of file
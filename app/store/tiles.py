@@ -0,0 +1,78 @@
+from typing import Iterable
+from app.geo import (
+    LayerEncoder,
+    TileProjection,
+    encode_tile,
+    intersects,
+    expand,
+    tile_bbox,
+)
+from app.store.lod import lod_cache
+from app.store.memo import Memo
+from app.store.repository import current_version, field_repo, poi_repo
+from app.store.spatial import field_spatial_index
+from app.store.visibility import visibility_index
+
+# Share of a tile's size also drawn on each side, so outlines meet at seams.
+TILE_BUFFER = 1 / 64
+MAX_TILE_ZOOM = 22
+
+tile_cache = Memo(maxsize=2048)
+
+
+def _field_layer(z: int, x: int, y: int, cooperative_ids: set[str] | None):
+    layer = LayerEncoder("fields")
+    project = TileProjection(z, x, y)
+    box = expand(tile_bbox(z, x, y), TILE_BUFFER)
+    for field_id in field_spatial_index.query(box):
+        field = field_repo.get(field_id)
+        if cooperative_ids is not None:
+            coop_id = visibility_index.cooperative_of(field["farmer_id"])
+            if coop_id not in cooperative_ids:
+                continue
+        ring, *holes = lod_cache.rings_at_zoom(field_id, z)
+        layer.add_polygon(
+            project.ring(ring),
+            {
+                "id": field["id"],
+                "farmer_id": field["farmer_id"],
+                "farmer_name": field["farmer_name"],
+                "crop": field["crop"],
+                "area": float(field["area"]),
+            },
+            [project.ring(hole) for hole in holes],
+        )
+    return layer
+
+
+def _poi_layer(z: int, x: int, y: int):
+    layer = LayerEncoder("pois")
+    project = TileProjection(z, x, y)
+    box = tile_bbox(z, x, y)
+    for poi in poi_repo.all():
+        location = poi["location"]
+        point = (location["lng"], location["lat"], location["lng"], location["lat"])
+        if intersects(point, box):
+            layer.add_point(
+                project(location),
+                {"id": poi["id"], "name": poi["name"], "type": poi["type"]},
+            )
+    return layer
+
+
+async def field_tile(
+    z: int, x: int, y: int, cooperative_ids: Iterable[str] | None = None
+) -> bytes:
+    """Get the Mapbox Vector Tile of the field and POI layers at z/x/y.
+
+    Only fields of the given cooperatives are included, or all fields when
+    ``cooperative_ids`` is None. Tiles are cached per data version and set
+    of cooperatives, so every session with the same role shares them.
+    """
+    coop_key = None if cooperative_ids is None else tuple(sorted(set(cooperative_ids)))
+
+    async def compute():
+        coop_ids = None if coop_key is None else set(coop_key)
+        return encode_tile([_field_layer(z, x, y, coop_ids), _poi_layer(z, x, y)])
+
+    return await tile_cache.get((z, x, y, current_version(), coop_key), compute)
\ No newline at end of file
@@ -0,0 +1,204 @@
+import bisect
+import itertools
+from typing import Iterable, Iterator
+from app.store import seed
+from app.store.database import EventTable, database
+
+# Entries inserted one by one below this batch size; larger batches are
+# appended and the index re-sorted, which is linear on sorted runs.
+INSORT_LIMIT = 32
+
+# (date, arrival) keys, so events of one date keep the order they came in.
+Entry = tuple[str, int]
+
+
+def _insert(entries: list[Entry], new: list[Entry]):
+    if len(new) < INSORT_LIMIT:
+        for entry in new:
+            bisect.insort(entries, entry)
+    else:
+        entries.extend(new)
+        entries.sort()
+
+
+def _window(
+    entries: list[Entry], start: str | None, end: str | None
+) -> tuple[int, int]:
+    """Get the positions of the entries dated from ``start`` to ``end``,
+    both included."""
+    first = 0 if start is None else bisect.bisect_left(entries, (start, -1))
+    last = len(entries)
+    if end is not None:
+        # ISO dates and datetimes of the end date sort before end + "~".
+        last = bisect.bisect_right(entries, (end + "~", -1))
+    return first, last
+
+
+class TimelineStore:
+    """Supply chain events indexed by field, by lot and by date.
+
+    Each index keeps its events in date order as they are inserted, so a
+    field's timeline, a lot's or every event within a date range is found
+    in O(log n + k) by bisection rather than a scan and a sort. Queries
+    take an optional date range and an ``offset`` and ``limit`` page,
+    newest first unless ``oldest_first``. Events are appended to ``table``
+    in one transaction before they are indexed, and ones other processes
+    append are indexed as they are polled. ``version`` counts changes.
+    The events are loaded once the table's database is opened.
+    """
+
+    def __init__(self, table: EventTable, events: Iterable[dict] = ()):
+        self._table = table
+        self._seed = events
+        self._loaded = False
+        self._arrivals = itertools.count()
+        self._events: dict[int, dict] = {}
+        self._by_field: dict[str, list[Entry]] = {}
+        self._by_lot: dict[str, list[Entry]] = {}
+        self._by_date: list[Entry] = []
+        self._field_stages: dict[str, set[str]] = {}
+        self.version = 0
+        table.on_open(self._load)
+        table.watch(self._refresh)
+
+    def _load(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        if not len(self._table):
+            self._table.save(list(self._seed))
+        self._seed = ()
+        self._index(self._table.load())
+
+    def _open(self):
+        if not self._loaded:
+            self._table.open()
+            self._load()
+
+    def __len__(self) -> int:
+        self._open()
+        return len(self._events)
+
+    def _index(self, events: Iterable[dict]):
+        by_field: dict[str, list[Entry]] = {}
+        by_lot: dict[str, list[Entry]] = {}
+        by_date: list[Entry] = []
+        for event in events:
+            entry = (event["date"], next(self._arrivals))
+            self._events[entry[1]] = event
+            by_field.setdefault(event["field_id"], []).append(entry)
+            if event.get("lot"):
+                by_lot.setdefault(event["lot"], []).append(entry)
+            by_date.append(entry)
+            self._field_stages.setdefault(event["field_id"], set()).add(event["stage"])
+        for field_id, entries in by_field.items():
+            _insert(self._by_field.setdefault(field_id, []), entries)
+        for lot, entries in by_lot.items():
+            _insert(self._by_lot.setdefault(lot, []), entries)
+        _insert(self._by_date, by_date)
+        self.version += 1
+
+    def _refresh(self, seqs: list[str] | None):
+        """Index events another process appended, or reload all of them."""
+        if seqs is None:
+            self._events.clear()
+            self._by_field.clear()
+            self._by_lot.clear()
+            self._by_date.clear()
+            self._field_stages.clear()
+            self._index(self._table.load())
+        else:
+            self._index(self._table.get(seqs))
+
+    def add(self, events: list[dict]):
+        """Record new events, saved in one transaction."""
+        self._open()
+        with self._table.applying():
+            self._table.save(events)
+            self._index(events)
+
+    def _page(
+        self,
+        entries: list[Entry],
+        start: str | None,
+        end: str | None,
+        offset: int,
+        limit: int | None,
+        oldest_first: bool,
+    ) -> list[dict]:
+        first, last = _window(entries, start, end)
+        if oldest_first:
+            first += offset
+            if limit is not None:
+                last = min(last, first + limit)
+            picked = entries[first:last]
+        else:
+            last -= offset
+            if limit is not None:
+                first = max(first, last - limit)
+            picked = entries[first:last][::-1] if last > first else []
+        return [self._events[arrival] for _, arrival in picked]
+
+    def timeline(
+        self,
+        field_id: str,
+        start: str | None = None,
+        end: str | None = None,
+        offset: int = 0,
+        limit: int | None = None,
+        oldest_first: bool = False,
+    ) -> list[dict]:
+        """Get a page of a field's events dated from ``start`` to ``end``."""
+        self._open()
+        entries = self._by_field.get(field_id, [])
+        return self._page(entries, start, end, offset, limit, oldest_first)
+
+    def lot(
+        self,
+        lot: str,
+        start: str | None = None,
+        end: str | None = None,
+        offset: int = 0,
+        limit: int | None = None,
+        oldest_first: bool = False,
+    ) -> list[dict]:
+        """Get a page of the events of a lot dated from ``start`` to ``end``."""
+        self._open()
+        entries = self._by_lot.get(lot, [])
+        return self._page(entries, start, end, offset, limit, oldest_first)
+
+    def between(
+        self,
+        start: str | None = None,
+        end: str | None = None,
+        offset: int = 0,
+        limit: int | None = None,
+        oldest_first: bool = False,
+    ) -> list[dict]:
+        """Get a page of every event dated from ``start`` to ``end``."""
+        self._open()
+        return self._page(self._by_date, start, end, offset, limit, oldest_first)
+
+    def count(
+        self, field_id: str, start: str | None = None, end: str | None = None
+    ) -> int:
+        """Count a field's events dated from ``start`` to ``end``."""
+        self._open()
+        first, last = _window(self._by_field.get(field_id, []), start, end)
+        return max(0, last - first)
+
+    def stages(self, field_id: str) -> set[str]:
+        """Get the stages a field has events of."""
+        self._open()
+        return self._field_stages.get(field_id, set())
+
+    def for_fields(self, field_ids: Iterable[str]) -> Iterator[dict]:
+        """Get the events of some fields, each field's oldest first."""
+        self._open()
+        for field_id in field_ids:
+            for _, arrival in self._by_field.get(field_id, ()):
+                yield self._events[arrival]
+
+
+timeline_table = EventTable(database, "timeline_events", columns=("field_id",))
+timeline_store = TimelineStore(timeline_table, seed.TIMELINE_EVENTS)
\ No newline at end of file
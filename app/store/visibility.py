@@ -0,0 +1,89 @@
+from typing import Iterable
+from app.store.repository import Repository, farmer_repo, field_repo
+
+
+class VisibilityIndex:
+    """Maps cooperative ids to the fields farmed by their members.
+
+    The index listens to the farmer and field repositories, so adding,
+    editing or removing a record only touches the buckets it belongs to.
+    Resolved field lists are cached per set of cooperatives until the next
+    change, so a role's visible fields cost O(visible fields) to build and
+    nothing to look up again.
+    """
+
+    def __init__(self, farmers: Repository, fields: Repository):
+        self._fields = fields
+        self._farmer_coop: dict[str, str] = {}
+        self._farmer_fields: dict[str, dict[str, None]] = {}
+        self._coop_fields: dict[str | None, dict[str, None]] = {}
+        self._cache: dict[tuple[str, ...], list] = {}
+        farmers.subscribe(self._on_farmer)
+        fields.subscribe(self._on_field)
+
+    def _move_farmer_fields(self, farmer_id: str, old_coop, new_coop):
+        field_ids = self._farmer_fields.get(farmer_id, {})
+        old_bucket = self._coop_fields.get(old_coop, {})
+        new_bucket = self._coop_fields.setdefault(new_coop, {})
+        for field_id in field_ids:
+            old_bucket.pop(field_id, None)
+            new_bucket[field_id] = None
+
+    def _on_farmer(self, old, new):
+        old_coop = old["cooperative_id"] if old else None
+        new_coop = new["cooperative_id"] if new else None
+        if new:
+            self._farmer_coop[new["id"]] = new_coop
+        else:
+            self._farmer_coop.pop(old["id"], None)
+        if old_coop != new_coop:
+            self._move_farmer_fields((new or old)["id"], old_coop, new_coop)
+            self._cache.clear()
+
+    def _on_field(self, old, new):
+        if old:
+            self._farmer_fields.get(old["farmer_id"], {}).pop(old["id"], None)
+            coop_id = self._farmer_coop.get(old["farmer_id"])
+            self._coop_fields.get(coop_id, {}).pop(old["id"], None)
+        if new:
+            self._farmer_fields.setdefault(new["farmer_id"], {})[new["id"]] = None
+            coop_id = self._farmer_coop.get(new["farmer_id"])
+            self._coop_fields.setdefault(coop_id, {})[new["id"]] = None
+        self._cache.clear()
+
+    def field_ids_for(self, cooperative_id: str) -> Iterable[str]:
+        """Get the ids of the fields farmed by members of a cooperative."""
+        return self._coop_fields.get(cooperative_id, {}).keys()
+
+    def cooperative_of(self, farmer_id: str) -> str | None:
+        return self._farmer_coop.get(farmer_id)
+
+    def farmer_field_ids(self, farmer_id: str) -> Iterable[str]:
+        return self._farmer_fields.get(farmer_id, {}).keys()
+
+    def fields_for(self, cooperative_ids: Iterable[str]) -> list:
+        """Get the fields visible to a user partnered with the given cooperatives."""
+        key = tuple(sorted(set(cooperative_ids)))
+        fields = self._cache.get(key)
+        if fields is None:
+            fields = [
+                self._fields.get(field_id)
+                for coop_id in key
+                for field_id in self.field_ids_for(coop_id)
+            ]
+            self._cache[key] = fields
+        return fields
+
+
+def visible_cooperative_ids(user) -> list[str] | None:
+    """Get the cooperatives whose fields a user may see, or None for all."""
+    if user is None or user["role"] == "admin":
+        return None
+    if user["role"] == "buyer":
+        return user["partnerships"]
+    if user["role"] == "cooperative":
+        return [user["cooperative_id"]]
+    return []
+
+
+visibility_index = VisibilityIndex(farmer_repo, field_repo)
\ No newline at end of file
@@ -0,0 +1,78 @@
+import { useEffect, useRef } from "react";
+
+// Decodes a Google encoded polyline (see app/geo/polyline.py) into LatLng.
+// Arithmetic rather than bitwise operators keeps values past 2**31 exact.
+const decodePolyline = (text, decimals) => {
+  const scale = 10 ** decimals;
+  const points = [];
+  let index = 0;
+  const next = () => {
+    let value = 0;
+    let factor = 1;
+    let chunk;
+    do {
+      chunk = text.charCodeAt(index++) - 63;
+      value += (chunk % 32) * factor;
+      factor *= 32;
+    } while (chunk >= 32);
+    return value % 2 ? -(value + 1) / 2 : value / 2;
+  };
+  let lat = 0;
+  let lng = 0;
+  while (index < text.length) {
+    lat += next();
+    lng += next();
+    points.push({ lat: lat / scale, lng: lng / scale });
+  }
+  return points;
+};
+
+const decodeRecord = (record, polylines) => {
+  const decoded = { ...record };
+  for (const [key, decimals] of Object.entries(polylines)) {
+    const value = record[key];
+    if (typeof value === "string") {
+      decoded[key] = decodePolyline(value, decimals);
+    } else if (Array.isArray(value)) {
+      decoded[key] = value.map((line) =>
+        typeof line === "string" ? decodePolyline(line, decimals) : line,
+      );
+    }
+  }
+  return decoded;
+};
+
+// Applies the keyed patches of a record list (see app/store/sync.py) to the
+// browser's copy of it and hands the records to setRecords. A patch that
+// doesn't follow the copy's version asks the backend to resync instead.
+// Keys named in polylines are decoded from encoded polylines as they come.
+export function KeyedSync({ patch, setRecords, onResync, polylines = {} }) {
+  const held = useRef({ version: null, records: new Map() });
+  useEffect(() => {
+    if (!patch) {
+      return;
+    }
+    const copy = held.current;
+    if (patch.version === copy.version) {
+      return;
+    }
+    if (!patch.reset && patch.base !== copy.version) {
+      onResync?.();
+      return;
+    }
+    let records = patch.reset ? new Map() : copy.records;
+    for (const { op, id, record } of patch.ops) {
+      if (op === "delete") {
+        records.delete(id);
+      } else {
+        records.set(id, decodeRecord(record, polylines));
+      }
+    }
+    if (patch.order) {
+      records = new Map(patch.order.map((id) => [id, records.get(id)]));
+    }
+    held.current = { version: patch.version, records };
+    setRecords(Array.from(records.values()));
+  }, [patch]);
+  return null;
+}
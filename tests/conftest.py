@@ -0,0 +1,4 @@
+import os
+
+# The store opens its database on first use; keep the tests' in memory.
+os.environ["AGRITRACE_DATABASE"] = ":memory:"
\ No newline at end of file
@@ -0,0 +1,111 @@
+import numpy as np
+import pytest
+from app.store import (
+    Database,
+    FieldTable,
+    PolygonStore,
+    Repository,
+    current_version,
+)
+from app.store import repository
+
+OUTER = np.array([[29.0, -1.0], [29.01, -1.0], [29.01, -0.99], [29.0, -0.99]])
+HOLE = np.array([[29.004, -0.996], [29.004, -0.994], [29.006, -0.994]])
+
+
+def _field(field_id: str, lng: float = 29.0, crop: str = "Cocoa", **extra) -> dict:
+    offset = np.array([lng - 29.0, 0.0])
+    return {
+        "id": field_id,
+        "farmer_id": "farmer-001",
+        "farmer_name": "Amani Dufatanye",
+        "crop": crop,
+        "area": 120.0,
+        "polygon": OUTER + offset,
+        "holes": [],
+        **extra,
+    }
+
+
+def _open(path) -> tuple[Database, Repository, PolygonStore]:
+    """Open the fields of a database file as a backend process would."""
+    db = Database(path)
+    polygons = PolygonStore()
+    table = FieldTable(db, polygons, columns=("farmer_id", "crop"))
+    fields = Repository(prepare=polygons.ingest, table=table, stage=polygons.staged)
+    fields.subscribe(polygons.on_change)
+    db.open()
+    return db, fields, polygons
+
+
+def test_restart_round_trip(tmp_path):
+    path = tmp_path / "agritrace.db"
+    _, fields, polygons = _open(path)
+    fields.extend([_field("field-a", holes=[HOLE]), _field("field-b", lng=29.1)])
+    before = [fields.get("field-a"), fields.get("field-b")]
+    rings = polygons.rings("field-a")
+
+    _, reopened, reloaded = _open(path)
+    assert [reopened.get("field-a"), reopened.get("field-b")] == before
+    assert [r.tolist() for r in reloaded.rings("field-a")] == [
+        r.tolist() for r in rings
+    ]
+    assert len(reloaded.holes("field-a")) == 1 and not reloaded.holes("field-b")
+    assert (
+        reopened.get("field-a")["computed_area"]
+        < reopened.get("field-b")["computed_area"]
+    )
+
+
+def test_box_and_attribute_queries(tmp_path):
+    db, fields, _ = _open(tmp_path / "agritrace.db")
+    table = FieldTable(db, PolygonStore(), columns=("farmer_id", "crop"))
+    fields.extend(
+        [
+            _field("field-a"),
+            _field("field-b", lng=29.1, crop="Coffee"),
+            _field("field-c", lng=29.2),
+        ]
+    )
+    west_half = (28.9, -1.1, 29.05, -0.9)
+    assert table.query() == ["field-a", "field-b", "field-c"]
+    assert table.query(west_half) == ["field-a"]
+    assert table.query((28.9, -1.1, 29.15, -0.9)) == ["field-a", "field-b"]
+    assert table.query((28.9, -1.1, 29.3, -0.9), crop="Cocoa") == [
+        "field-a",
+        "field-c",
+    ]
+    assert table.query((30.0, 0.0, 31.0, 1.0)) == []
+    assert table.find(crop="Coffee") == ["field-b"]
+    assert table.find(crop="Coffee", farmer_id="farmer-002") == []
+    # The bounds follow updates and removals.
+    fields.update(_field("field-c", lng=29.02))
+    fields.remove("field-a")
+    assert table.query(west_half) == ["field-c"]
+    with pytest.raises(ValueError):
+        table.find(area=120.0)
+
+
+def test_changes_reach_other_connections(tmp_path, monkeypatch):
+    path = tmp_path / "agritrace.db"
+    writer, written, _ = _open(path)
+    reader, read, _ = _open(path)
+    monkeypatch.setattr(repository, "database", reader)
+    version = current_version()
+
+    written.add(_field("field-a"))
+    assert read.get("field-a") is None
+    assert current_version() > version
+    assert read.get("field-a") == written.get("field-a")
+
+    version = current_version()
+    written.update(_field("field-a", crop="Coffee"))
+    written.add(_field("field-b", lng=29.1))
+    assert current_version() > version
+    assert read.get("field-a")["crop"] == "Coffee" and "field-b" in read
+
+    written.remove("field-a")
+    current_version()
+    assert "field-a" not in read and len(read) == 1
+    # Writes are logged by their own connection's version too.
+    assert writer.version == reader.version
\ No newline at end of file
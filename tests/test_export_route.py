@@ -0,0 +1,53 @@
+import csv
+import io
+import json
+from starlette.testclient import TestClient
+from app.api import api
+from app.api.exports import EXPORT_TICKET
+from app.store import cooperative_repo, ticket_store, visibility_index
+
+client = TestClient(api)
+
+
+def _get(path: str, cooperative_ids: list[str] | None = None, **headers):
+    ticket = ticket_store.issue(EXPORT_TICKET, {"cooperative_ids": cooperative_ids})
+    separator = "&" if "?" in path else "?"
+    return client.get(f"{path}{separator}ticket={ticket}", headers=headers)
+
+
+def test_ticket_is_single_use():
+    ticket = ticket_store.issue(EXPORT_TICKET, {"cooperative_ids": None})
+    assert client.get(f"/api/export/fields.csv?ticket={ticket}").status_code == 200
+    assert client.get(f"/api/export/fields.csv?ticket={ticket}").status_code == 401
+    assert client.get("/api/export/fields.csv").status_code == 401
+    assert client.get("/api/export/fields.csv?token=abc").status_code == 401
+
+
+def test_ticket_of_other_purpose_refused():
+    ticket = ticket_store.issue("other", {"cooperative_ids": None})
+    assert client.get(f"/api/export/fields.csv?ticket={ticket}").status_code == 401
+
+
+def test_expired_ticket_refused(monkeypatch):
+    monkeypatch.setattr(ticket_store, "lifetime", -1.0)
+    assert _get("/api/export/fields.csv").status_code == 401
+
+
+def test_export_limited_to_granted_cooperatives():
+    cooperative_id = cooperative_repo.all()[0]["id"]
+    expected = {f["id"] for f in visibility_index.fields_for([cooperative_id])}
+    response = _get("/api/export/fields.csv", [cooperative_id])
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert expected and {row["id"] for row in rows} == expected
+
+
+def test_geojson_export():
+    response = _get("/api/export/fields.geojson?include=timeline")
+    assert response.status_code == 200
+    collection = json.loads(response.text)
+    layers = {f["properties"].get("layer") for f in collection["features"]}
+    assert layers == {"fields", "timeline"}
+
+
+def test_unknown_format():
+    assert _get("/api/export/fields.xyz").status_code == 404
\ No newline at end of file
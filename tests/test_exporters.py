@@ -0,0 +1,218 @@
+import asyncio
+import csv
+import io
+import json
+import struct
+import numpy as np
+import pytest
+from reflex_enterprise.components.map.types import latlng
+from app.exporters import (
+    EXPORTERS,
+    ExportLayer,
+    FlatGeobufExporter,
+    GeoParquetExporter,
+    export_layers,
+    geometry_json,
+)
+from app.exporters import base
+from app.exporters.flatgeobuf import INDEX_NODE_SIZE, _NODE
+from app.importers import FlatGeobufReader
+from app.importers.flatgeobuf import _calc_index_size
+from app.store import field_repo, timeline_store
+
+SQUARE = ("Polygon", [np.array([[0.0, 0.0], [1.0, 0.0], [1.0, 1.0], [0.0, 1.0]])])
+HOLED = (
+    "Polygon",
+    [
+        np.array([[10.0, 10.0], [14.0, 10.0], [14.0, 14.0], [10.0, 14.0]]),
+        np.array([[11.0, 11.0], [11.0, 12.0], [12.0, 12.0], [12.0, 11.0]]),
+    ],
+)
+
+POINT = ("Point", np.array([2.5, -1.5]))
+
+
+def _layers(*chunks) -> list[ExportLayer]:
+    return [ExportLayer("fields", {"id": str, "area": float}, lambda: iter(chunks))]
+
+
+def _write(exporter, layers) -> bytes:
+    async def collect():
+        return b"".join([chunk async for chunk in exporter.write(layers)])
+
+    return asyncio.run(collect())
+
+
+def _closed(ring: np.ndarray) -> list:
+    return [*ring.tolist(), ring[0].tolist()]
+
+
+def test_flatgeobuf_round_trip():
+    layers = [
+        *_layers(
+            [(SQUARE, {"id": "a", "area": 1.5}), (HOLED, {"id": "b", "area": 15.0})]
+        ),
+        ExportLayer(
+            "pois",
+            {"id": str, "name": str},
+            lambda: iter([[(POINT, {"id": "p", "name": "Dépôt"})]]),
+        ),
+    ]
+    data = _write(FlatGeobufExporter(), layers)
+    reader = FlatGeobufReader(io.BytesIO(data))
+    assert reader.crs == "EPSG:4326"
+    assert reader.features_count == 3
+    assert [name for name, _ in reader.columns] == ["layer", "id", "area", "name"]
+    features = {f["properties"]["id"]: f for f in reader}
+    assert features["a"]["properties"] == {"layer": "fields", "id": "a", "area": 1.5}
+    assert features["a"]["geometry"] == {
+        "type": "Polygon",
+        "coordinates": [_closed(SQUARE[1][0])],
+    }
+    assert features["b"]["geometry"]["coordinates"] == [
+        _closed(ring) for ring in HOLED[1]
+    ]
+    assert features["p"]["properties"] == {"layer": "pois", "id": "p", "name": "Dépôt"}
+    assert features["p"]["geometry"] == {"type": "Point", "coordinates": [2.5, -1.5]}
+
+
+def test_flatgeobuf_index():
+    boxes = []
+    chunk = []
+    for k in range(40):
+        ring = SQUARE[1][0] + [k % 7 * 3.0, k // 7 * 3.0]
+        chunk.append((("Polygon", [ring]), {"id": str(k), "area": 1.0}))
+        boxes.append([*ring.min(axis=0), *ring.max(axis=0)])
+    data = _write(FlatGeobufExporter(), _layers(chunk))
+    start = 12 + struct.unpack_from("<I", data, 8)[0]
+    size = _calc_index_size(len(chunk), INDEX_NODE_SIZE)
+    nodes = np.frombuffer(data, _NODE, size // _NODE.itemsize, start)
+    leaves = nodes[-len(chunk) :]
+    assert nodes[0]["box"].tolist() == [0.0, 0.0, 19.0, 16.0]
+    # Each leaf holds the box and the byte offset of a feature, in file order.
+    offsets = []
+    position = start + size
+    while position < len(data):
+        offsets.append(position - start - size)
+        position += 4 + struct.unpack_from("<I", data, position)[0]
+    assert leaves["offset"].tolist() == offsets
+    features = list(FlatGeobufReader(io.BytesIO(data)))
+    for leaf, feature in zip(leaves, features):
+        assert leaf["box"].tolist() == boxes[int(feature["properties"]["id"])]
+
+
+def test_geoparquet_reads_back():
+    pq = pytest.importorskip("pyarrow.parquet")
+    layers = _layers(
+        [(SQUARE, {"id": "a", "area": 1.5}), (HOLED, {"id": "b", "area": 15.0})],
+        [(None, {"id": "c", "area": 0.0})],
+    )
+    table = pq.read_table(io.BytesIO(_write(GeoParquetExporter(), layers)))
+    rows = table.to_pylist()
+    assert [(r["id"], r["area"]) for r in rows] == [("a", 1.5), ("b", 15.0), ("c", 0.0)]
+    assert rows[2]["geometry"] is None
+    # Little-endian WKB: a polygon of two rings, each closed to five points.
+    assert struct.unpack_from("<BIII", rows[1]["geometry"]) == (1, 3, 2, 5)
+    geo = json.loads(table.schema.metadata[b"geo"])
+    assert geo["primary_column"] == "geometry"
+    assert geo["columns"]["geometry"]["geometry_types"] == ["Polygon"]
+    assert geo["columns"]["geometry"]["bbox"] == [0.0, 0.0, 14.0, 14.0]
+
+
+def test_geoparquet_reads_back_empty():
+    pq = pytest.importorskip("pyarrow.parquet")
+    data = _write(GeoParquetExporter(), _layers())
+    assert pq.read_table(io.BytesIO(data)).num_rows == 0
+
+
+def _add_field(field_id: str, lng: float = 29.0) -> dict:
+    field = {
+        "id": field_id,
+        "farmer_id": "farmer-001",
+        "farmer_name": "Amani Dufatanye",
+        "crop": "Cocoa",
+        "area": 1.0,
+        "polygon": [
+            latlng(lat=-2.0, lng=lng),
+            latlng(lat=-2.0, lng=lng + 0.01),
+            latlng(lat=-2.01, lng=lng + 0.01),
+        ],
+    }
+    field_repo.add(field)
+    return field_repo.get(field_id)
+
+
+def _exported_ids(extension: str, data: bytes) -> list[str]:
+    if extension == "csv":
+        return [row["id"] for row in csv.DictReader(io.StringIO(data.decode()))]
+    if extension == "geojson":
+        return [f["properties"]["id"] for f in json.loads(data)["features"]]
+    if extension == "fgb":
+        return [f["properties"]["id"] for f in FlatGeobufReader(io.BytesIO(data))]
+    pq = pytest.importorskip("pyarrow.parquet")
+    return pq.read_table(io.BytesIO(data)).column("id").to_pylist()
+
+
+@pytest.mark.parametrize("extension", ["csv", "geojson", "fgb", "parquet"])
+def test_field_removed_while_streaming(monkeypatch, extension):
+    monkeypatch.setattr(base, "CHUNK_SIZE", 1)
+    fields = [_add_field(f"field-stream-{extension}-{k}", 30.0 + k) for k in range(3)]
+    (layer,) = export_layers(fields)
+
+    def chunks():
+        for number, chunk in enumerate(base._field_chunks(fields)):
+            yield chunk
+            if number == 0:
+                field_repo.remove(fields[1]["id"])
+
+    layer.chunks = chunks
+    data = _write(EXPORTERS[extension], [layer])
+    # FlatGeobuf features come in Hilbert order.
+    assert sorted(_exported_ids(extension, data)) == [fields[0]["id"], fields[2]["id"]]
+    for field in fields:
+        field_repo.remove(field["id"])
+
+
+def test_timeline_of_removed_field():
+    field = _add_field("field-export-removed")
+    timeline_store.add(
+        [
+            {
+                "field_id": field["id"],
+                "date": "2024-01-02",
+                "stage": "Harvest",
+                "description": "Harvested.",
+                "location": "Kivu",
+            }
+        ]
+    )
+    _, timeline = export_layers([field], ["timeline"])
+    field_repo.remove(field["id"])
+    (chunk,) = timeline.chunks()
+    assert chunk == [
+        (
+            None,
+            {
+                "field_id": field["id"],
+                "date": "2024-01-02",
+                "stage": "Harvest",
+                "description": "Harvested.",
+                "location": "Kivu",
+            },
+        )
+    ]
+
+
+def test_geojson_right_hand_rule():
+    clockwise = (
+        "Polygon",
+        [HOLED[1][0][::-1], HOLED[1][1][::-1]],
+    )
+    for geometry in (HOLED, clockwise):
+        outer, hole = geometry_json(geometry)["coordinates"]
+        assert outer[0] == outer[-1] and hole[0] == hole[-1]
+        assert _doubled_area(outer) > 0 > _doubled_area(hole)
+
+
+def _doubled_area(ring: list) -> float:
+    return sum(x0 * y1 - x1 * y0 for (x0, y0), (x1, y1) in zip(ring, ring[1:]))
\ No newline at end of file
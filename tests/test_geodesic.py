@@ -0,0 +1,74 @@
+import math
+import numpy as np
+import pytest
+from app.geo import AREA_TOLERANCE, measure_fields, pack_rings, ring_metrics
+from app.geo.geodesic import EARTH_RADIUS
+
+# A 0.01 degree cell whose south-west corner is at 1°S, 29°E.
+CELL = np.array([[29.0, -1.0], [29.01, -1.0], [29.01, -0.99], [29.0, -0.99]])
+
+
+def _cell_area(west, south, east, north) -> float:
+    """The exact spherical area in m² of a cell between two meridians and
+    two parallels."""
+    return (
+        EARTH_RADIUS**2
+        * math.radians(east - west)
+        * (math.sin(math.radians(north)) - math.sin(math.radians(south)))
+    )
+
+
+def _field(polygon, area: float = 1.0, **extra) -> dict:
+    return {"id": "field", "area": area, "polygon": polygon, **extra}
+
+
+def test_pack_rings():
+    latlngs = [{"lat": lat, "lng": lng} for lng, lat in CELL.tolist()]
+    coords, offsets = pack_rings([latlngs, CELL[:3], []])
+    assert offsets.tolist() == [0, 4, 7, 7]
+    assert coords[:4].tolist() == CELL.tolist()
+    assert coords[4:].tolist() == CELL[:3].tolist()
+
+
+def test_ring_metrics():
+    rings = [CELL, CELL[::-1], np.vstack([CELL, CELL[:1]]), CELL[:2]]
+    metrics = ring_metrics(*pack_rings(rings))
+    exact = _cell_area(29.0, -1.0, 29.01, -0.99)
+    # Winding and a closing vertex change nothing.
+    assert metrics["area"][:3] == pytest.approx([exact] * 3, rel=1e-9)
+    side = EARTH_RADIUS * math.radians(0.01)
+    assert metrics["perimeter"][0] == pytest.approx(4 * side, rel=1e-3)
+    assert metrics["centroid"][0] == pytest.approx([29.005, -0.995], abs=1e-6)
+    assert metrics["bbox"][0].tolist() == [29.0, -1.0, 29.01, -0.99]
+    assert metrics["area"][3] == 0 and np.isnan(metrics["centroid"][3]).all()
+
+
+def test_area_shrinks_towards_the_poles():
+    rings = [CELL + [0, lat] for lat in (1.0, 41.0, 71.0)]
+    areas = ring_metrics(*pack_rings(rings))["area"]
+    for area, lat in zip(areas, (0.0, 40.0, 70.0)):
+        assert area == pytest.approx(_cell_area(29.0, lat, 29.01, lat + 0.01))
+    assert areas[0] > areas[1] > areas[2]
+
+
+def test_measure_fields():
+    hectares = _cell_area(29.0, -1.0, 29.01, -0.99) / 10_000
+    hole = np.array([[29.004, -0.996], [29.006, -0.996], [29.006, -0.994]])
+    (plain, holed, mismatched, line) = measure_fields(
+        [
+            _field(CELL, area=hectares),
+            _field(CELL, area=hectares, holes=[hole]),
+            _field(CELL, area=hectares * (1 + 2 * AREA_TOLERANCE)),
+            _field(CELL[:2]),
+        ]
+    )
+    assert plain["computed_area"] == round(hectares, 2)
+    assert not plain["area_mismatch"] and mismatched["area_mismatch"]
+    hole_area = ring_metrics(*pack_rings([hole]))["area"][0] / 10_000
+    assert holed["computed_area"] == pytest.approx(hectares - hole_area, abs=0.01)
+    assert holed["perimeter"] > plain["perimeter"]
+    # The centroid and bbox are the outer ring's.
+    assert holed["centroid"] == plain["centroid"]
+    assert plain["bbox"] == [29.0, -1.0, 29.01, -0.99]
+    assert line["centroid"] is None and line["bbox"] is None
+    assert line["computed_area"] == 0
\ No newline at end of file
@@ -0,0 +1,420 @@
+import asyncio
+import io
+import json
+import struct
+import zipfile
+import numpy as np
+import pytest
+from app.importers import (
+    CsvWktReader,
+    FeatureStream,
+    GeoJSONError,
+    GPXReader,
+    KMLError,
+    KMLReader,
+    ShapefileError,
+    ShapefileReader,
+    WKTError,
+    detect_format,
+    import_fields,
+    parse_feature,
+    parse_wkt,
+)
+from app.importers import fields
+from app.store import (
+    JobRunner,
+    JobStatus,
+    cooperative_repo,
+    farmer_repo,
+    field_repo,
+    polygon_store,
+    search_index,
+)
+
+OUTER = [(0.0, 0.0), (0.0, 4.0), (4.0, 4.0), (4.0, 0.0), (0.0, 0.0)]
+HOLE = [(1.0, 1.0), (2.0, 1.0), (2.0, 2.0), (1.0, 2.0), (1.0, 1.0)]
+WGS84_PRJ = 'GEOGCS["GCS_WGS_1984",DATUM["D_WGS_1984"]]'
+UTM_PRJ = 'PROJCS["WGS_1984_UTM_Zone_32N",GEOGCS["GCS_WGS_1984"]]'
+
+
+def _shp_record(number: int, rings: list) -> bytes:
+    points = np.array([p for ring in rings for p in ring], dtype="<f8")
+    parts = np.cumsum([0] + [len(r) for r in rings[:-1]]).astype("<i4")
+    content = (
+        struct.pack("<i", 5)
+        + struct.pack("<4d", *points.min(axis=0), *points.max(axis=0))
+        + struct.pack("<2i", len(rings), len(points))
+        + parts.tobytes()
+        + points.tobytes()
+    )
+    return struct.pack(">2i", number, len(content) // 2) + content
+
+
+def _dbf(columns: list[tuple[str, str, int]], rows: list[tuple]) -> bytes:
+    record_size = 1 + sum(size for _, _, size in columns)
+    header_size = 32 + 32 * len(columns) + 1
+    data = struct.pack("<B3BIHH20x", 3, 126, 1, 1, len(rows), header_size, record_size)
+    for name, kind, size in columns:
+        data += struct.pack("<11sc4xBB14x", name.encode(), kind.encode(), size, 0)
+    data += b"\r"
+    for deleted, *values in rows:
+        data += b"*" if deleted else b" "
+        for (_, kind, size), value in zip(columns, values):
+            text = str(value).encode("utf-8")
+            data += text.rjust(size) if kind == "N" else text.ljust(size)
+    return data + b"\x1a"
+
+
+def _shapefile(shapes: list, columns: list, rows: list, prj: str | None) -> io.BytesIO:
+    records = b"".join(_shp_record(i + 1, rings) for i, rings in enumerate(shapes))
+    header = struct.pack(">7i", 9994, 0, 0, 0, 0, 0, (100 + len(records)) // 2)
+    header += struct.pack("<2i8d", 1000, 5, 0, 0, 4, 4, 0, 0, 0, 0)
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("fields.shp", header + records)
+        archive.writestr("fields.dbf", _dbf(columns, rows))
+        if prj is not None:
+            archive.writestr("fields.prj", prj)
+    buffer.seek(0)
+    return buffer
+
+
+COLUMNS = [("FARMER_NAM", "C", 20), ("CROP", "C", 10), ("AREA", "N", 8)]
+
+
+def test_shapefile_round_trip():
+    file = _shapefile(
+        [[OUTER, HOLE], [OUTER], [HOLE]],
+        COLUMNS,
+        [
+            (False, "Amani Kahindo", "Cocoa", 16.5),
+            (True, "Gone", "Coffee", 1),
+            (False, "Béatrice", "Coffee", 1),
+        ],
+        WGS84_PRJ,
+    )
+    features = list(ShapefileReader(file))
+    # The deleted record is skipped along with its shape.
+    assert [f["properties"]["FARMER_NAM"] for f in features] == [
+        "Amani Kahindo",
+        "Béatrice",
+    ]
+    parsed = parse_feature(features[0])
+    assert parsed["farmer_name"] == "Amani Kahindo"
+    assert parsed["crop"] == "Cocoa"
+    assert parsed["area"] == 16.5
+    (polygon,) = parsed["polygons"]
+    assert [ring.tolist() for ring in polygon] == [
+        [list(p) for p in OUTER],
+        [list(p) for p in HOLE],
+    ]
+    assert parse_feature(features[1])["farmer_name"] == "Béatrice"
+
+
+def test_shapefile_projected_prj_refused():
+    file = _shapefile([[OUTER]], COLUMNS, [(False, "A", "Cocoa", 1)], UTM_PRJ)
+    with pytest.raises(ShapefileError, match="projected"):
+        ShapefileReader(file)
+
+
+def test_parse_feature_property_names():
+    geometry = {"type": "Polygon", "coordinates": [OUTER]}
+    for props in (
+        {"farmer_name": "A", "crop": "Cocoa", "area": "2"},
+        {"Farmer_Name": "A", "Crop": "Cocoa", "Area": 2},
+        {"farmer_nam": "A", "crop": "Cocoa", "area": 2},
+    ):
+        parsed = parse_feature({"geometry": geometry, "properties": props})
+        assert (parsed["farmer_name"], parsed["crop"], parsed["area"]) == (
+            "A",
+            "Cocoa",
+            2.0,
+        )
+    assert parse_feature({"geometry": geometry, "properties": {"crop": "C"}}) is None
+
+
+def _kml_ring(ring: list) -> str:
+    return " ".join(f"{x},{y},0" for x, y in ring)
+
+
+KML = f"""<?xml version="1.0" encoding="UTF-8"?>
+<kml xmlns="http://www.opengis.net/kml/2.2"><Document><Folder>
+  <Placemark>
+    <name>Plot 1</name>
+    <ExtendedData>
+      <Data name="farmer_name"><value>Amani Kahindo</value></Data>
+      <SchemaData><SimpleData name="crop">Cocoa</SimpleData></SchemaData>
+      <Data name="area"><value>16.5</value></Data>
+    </ExtendedData>
+    <Polygon>
+      <outerBoundaryIs><LinearRing><coordinates>
+        {_kml_ring(OUTER)}
+      </coordinates></LinearRing></outerBoundaryIs>
+      <innerBoundaryIs><LinearRing><coordinates>
+        {_kml_ring(HOLE)}
+      </coordinates></LinearRing></innerBoundaryIs>
+    </Polygon>
+  </Placemark>
+  <Placemark>
+    <name>Plot 2</name>
+    <MultiGeometry>
+      <Polygon><outerBoundaryIs><LinearRing><coordinates>
+        {_kml_ring(OUTER)}
+      </coordinates></LinearRing></outerBoundaryIs></Polygon>
+      <Polygon><outerBoundaryIs><LinearRing><coordinates>
+        {_kml_ring(HOLE)}
+      </coordinates></LinearRing></outerBoundaryIs></Polygon>
+    </MultiGeometry>
+  </Placemark>
+  <Placemark><name>Broken</name><Polygon><outerBoundaryIs><LinearRing>
+    <coordinates>1,x 2,3</coordinates>
+  </LinearRing></outerBoundaryIs></Polygon></Placemark>
+</Folder></Document></kml>"""
+
+
+def _check_kml(features: list[dict]):
+    assert [f["properties"]["name"] for f in features] == [
+        "Plot 1",
+        "Plot 2",
+        "Broken",
+    ]
+    parsed = parse_feature(features[0])
+    assert (parsed["farmer_name"], parsed["crop"], parsed["area"]) == (
+        "Amani Kahindo",
+        "Cocoa",
+        16.5,
+    )
+    assert features[0]["geometry"] == {
+        "type": "Polygon",
+        "coordinates": [[list(p) for p in OUTER], [list(p) for p in HOLE]],
+    }
+    assert features[1]["geometry"]["type"] == "MultiPolygon"
+    assert len(features[1]["geometry"]["coordinates"]) == 2
+    assert features[2]["geometry"] is None
+
+
+def test_kml_reader(tmp_path):
+    path = tmp_path / "fields.kml"
+    path.write_text(KML)
+    assert detect_format(str(path)) == "kml"
+    with path.open("rb") as file:
+        _check_kml(list(KMLReader(file)))
+
+
+def test_kmz_reader(tmp_path):
+    path = tmp_path / "fields.kmz"
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("doc.kml", KML)
+    assert detect_format(str(path)) == "kml"
+    with path.open("rb") as file:
+        _check_kml(list(KMLReader(file)))
+
+
+def test_kml_reader_refuses_other_xml():
+    with pytest.raises(KMLError):
+        list(KMLReader(io.BytesIO(b"<gpx></gpx>")))
+
+
+def test_gpx_reader(tmp_path):
+    points = "".join(f'<trkpt lat="{y}" lon="{x}"/>' for x, y in OUTER[:-1])
+    path = tmp_path / "walk.gpx"
+    path.write_text(
+        '<?xml version="1.0"?>'
+        '<gpx version="1.1" xmlns="http://www.topografix.com/GPX/1/1">'
+        '<wpt lat="1" lon="1"><name>Well</name></wpt>'
+        "<trk><name>Plot 7</name><extensions><survey>"
+        "<farmer_name>Béatrice</farmer_name><crop>Coffee</crop><area>3</area>"
+        f"</survey></extensions><trkseg>{points}</trkseg></trk>"
+        f'<rte><rtept lat="0" lon="0"/><rtept lat="0" lon="1"/>'
+        '<rtept lat="1" lon="1"/></rte>'
+        "</gpx>"
+    )
+    assert detect_format(str(path)) == "gpx"
+    with path.open("rb") as file:
+        features = list(GPXReader(file))
+    assert len(features) == 2
+    parsed = parse_feature(features[0])
+    assert (parsed["farmer_name"], parsed["crop"], parsed["area"]) == (
+        "Béatrice",
+        "Coffee",
+        3.0,
+    )
+    # The walked track is closed back to its first point.
+    assert features[0]["geometry"]["coordinates"] == [[list(p) for p in OUTER]]
+    assert features[1]["geometry"]["coordinates"] == [
+        [[0.0, 0.0], [1.0, 0.0], [1.0, 1.0], [0.0, 0.0]]
+    ]
+
+
+def test_parse_wkt():
+    assert parse_wkt("POLYGON ((0 0, 4 0, 4 4, 0 0), (1 1, 2 1, 2 2, 1 1))") == {
+        "type": "Polygon",
+        "coordinates": [
+            [[0, 0], [4, 0], [4, 4], [0, 0]],
+            [[1, 1], [2, 1], [2, 2], [1, 1]],
+        ],
+    }
+    assert parse_wkt(
+        "SRID=4326;MULTIPOLYGON Z (((0 0 5, 1 0 5, 1 1 5, 0 0 5)), "
+        "((2 2 1, 3 2 1, 3 3 1, 2 2 1)))"
+    ) == {
+        "type": "MultiPolygon",
+        "coordinates": [
+            [[[0, 0], [1, 0], [1, 1], [0, 0]]],
+            [[[2, 2], [3, 2], [3, 3], [2, 2]]],
+        ],
+    }
+    assert parse_wkt("POLYGON EMPTY") is None
+    for text in ("POINT (1 2)", "POLYGON ((0 0, 1 0, 1 1)", "POLYGON ((0 0, 1))"):
+        with pytest.raises(WKTError):
+            parse_wkt(text)
+
+
+def test_csv_wkt_reader(tmp_path):
+    path = tmp_path / "fields.csv"
+    path.write_text(
+        "farmer_name,crop,area,WKT\n"
+        'Amani,Cocoa,2,"POLYGON ((0 0, 1 0, 1 1, 0 0))"\n'
+        "Béatrice,Coffee,1,not wkt\n",
+        encoding="utf-8-sig",
+    )
+    assert detect_format(str(path)) == "csv"
+    with path.open("rb") as file:
+        features = list(CsvWktReader(file))
+    assert features[0]["properties"] == {
+        "farmer_name": "Amani",
+        "crop": "Cocoa",
+        "area": "2",
+    }
+    assert parse_feature(features[0])["area"] == 2.0
+    assert features[1]["geometry"] is None
+    assert parse_feature(features[1]) is None
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 4096])
+def test_feature_stream(chunk_size):
+    features = [
+        {"type": "Feature", "properties": {"n": n, "name": "é" * n}, "geometry": None}
+        for n in range(5)
+    ]
+    text = json.dumps(
+        {"features": features, "crs": {"type": "name"}, "type": "FeatureCollection"},
+        ensure_ascii=False,
+    )
+    stream = FeatureStream(io.BytesIO(text.encode()).read, chunk_size=chunk_size)
+    assert list(stream) == features
+    assert stream.bytes_read == len(text.encode())
+
+
+def test_feature_stream_refuses_other_geojson():
+    for text in ('{"type": "Feature"}', '{"features": [], "type": "Point"}', "[1]"):
+        with pytest.raises(GeoJSONError):
+            list(FeatureStream(io.BytesIO(text.encode()).read))
+
+
+def _run_import(path, import_format: str) -> JobStatus:
+    async def run():
+        runner = JobRunner()
+        job_id = runner.submit("Import", import_fields, str(path), import_format)
+        while runner.get(job_id)["state"] in ("queued", "running"):
+            await asyncio.sleep(0.01)
+        return runner.get(job_id)
+
+    return asyncio.run(run())
+
+
+def _imported(farmer_name: str) -> list[dict]:
+    return [f for f in field_repo.all() if f["farmer_name"] == farmer_name]
+
+
+def test_import_geojson(tmp_path):
+    def feature(props, ring):
+        return {
+            "type": "Feature",
+            "properties": props,
+            "geometry": {"type": "Polygon", "coordinates": [ring]},
+        }
+
+    square = [[10.0, 10.0], [10.01, 10.0], [10.01, 10.01], [10.0, 10.01], [10.0, 10.0]]
+    bowtie = [[10.0, 10.0], [10.01, 10.01], [10.01, 10.0], [10.0, 10.01], [10.0, 10.0]]
+    path = tmp_path / "fields.geojson"
+    path.write_text(
+        json.dumps(
+            {
+                "type": "FeatureCollection",
+                "features": [
+                    feature(
+                        {"farmer_name": "Zawadi Import", "crop": "Cocoa", "area": 120},
+                        square,
+                    ),
+                    feature(
+                        {"farmer_name": "Zawadi Import", "crop": "Cocoa", "area": 1},
+                        bowtie,
+                    ),
+                    feature({"crop": "Cocoa"}, square),
+                ],
+            }
+        )
+    )
+    status = _run_import(path, "geojson")
+    assert status["state"] == "done", status["message"]
+    assert (status["processed"], status["rejected"]) == (3, 2)
+    assert status["message"].startswith(
+        "Imported 1 fields and 1 farmers; skipped 2 invalid features."
+    )
+    (field,) = _imported("Zawadi Import")
+    (farmer,) = [f for f in farmer_repo.all() if f["name"] == "Zawadi Import"]
+    assert field["farmer_id"] == farmer["id"]
+    assert polygon_store.ring(field["id"]).tolist() == square[:-1]
+    assert field["computed_area"] == pytest.approx(120, rel=0.05)
+
+
+def test_import_shapefile(tmp_path):
+    ring = [(20.0, 0.0), (20.0, 0.01), (20.01, 0.01), (20.01, 0.0), (20.0, 0.0)]
+    path = tmp_path / "fields.zip"
+    path.write_bytes(
+        _shapefile(
+            [[ring]],
+            COLUMNS,
+            [(False, "Shabani Import", "Coffee", 123)],
+            WGS84_PRJ,
+        ).getvalue()
+    )
+    assert detect_format(str(path)) == "shapefile"
+    status = _run_import(path, "shapefile")
+    assert status["state"] == "done", status["message"]
+    (field,) = _imported("Shabani Import")
+    assert field["crop"] == "Coffee" and field["area"] == 123
+    # Shapefile rings run clockwise; they are stored counter-clockwise.
+    assert polygon_store.ring(field["id"]).tolist() == [list(p) for p in ring[-2::-1]]
+
+
+def test_import_commits_in_slices(tmp_path, monkeypatch):
+    def feature(k):
+        x = 30.0 + k * 0.02
+        ring = [[x, 5.0], [x + 0.01, 5.0], [x + 0.01, 5.01], [x, 5.01], [x, 5.0]]
+        props = {"farmer_name": f"Slice Farmer {k % 2}", "crop": "Tea", "area": 1}
+        return {
+            "type": "Feature",
+            "properties": props,
+            "geometry": {"type": "Polygon", "coordinates": [ring]},
+        }
+
+    monkeypatch.setattr(fields, "IMPORT_COMMIT_SIZE", 2)
+    path = tmp_path / "fields.geojson"
+    path.write_text(
+        json.dumps(
+            {"type": "FeatureCollection", "features": [feature(k) for k in range(5)]}
+        )
+    )
+    status = _run_import(path, "geojson")
+    assert status["state"] == "done", status["message"]
+    assert "5 fields declare an area" in status["message"]
+    imported = [*_imported("Slice Farmer 0"), *_imported("Slice Farmer 1")]
+    assert len(imported) == 5
+    assert all(f["computed_area"] == pytest.approx(123, rel=0.02) for f in imported)
+    coop = cooperative_repo.get(
+        farmer_repo.get(imported[0]["farmer_id"])["cooperative_id"]
+    )
+    found = search_index.search(f"slice tea {coop['name']}", limit=None)
+    assert sorted(found) == sorted(f["id"] for f in imported)
\ No newline at end of file
@@ -0,0 +1,65 @@
+import asyncio
+from app.store import Memo, crop_rollups, current_version, farmer_repo, field_repo
+
+
+def _get(memo: Memo, key, value):
+    calls = []
+
+    async def compute():
+        calls.append(key)
+        return value
+
+    return asyncio.run(memo.get(key, compute)), len(calls)
+
+
+def test_hits_and_misses():
+    memo = Memo()
+    assert _get(memo, ("total", 1, "user-1"), 10) == (10, 1)
+    assert _get(memo, ("total", 1, "user-1"), 99) == (10, 0)
+    assert _get(memo, ("total", 1, "user-2"), 20) == (20, 1)
+    assert memo.stats() == {"hits": 1, "misses": 2, "size": 2}
+    memo.clear()
+    assert memo.stats() == {"hits": 0, "misses": 0, "size": 0}
+
+
+def test_least_recently_used_evicted():
+    memo = Memo(maxsize=2)
+    _get(memo, "a", 1)
+    _get(memo, "b", 2)
+    _get(memo, "a", 1)
+    _get(memo, "c", 3)
+    assert _get(memo, "a", 0) == (1, 0)
+    assert _get(memo, "b", 0) == (0, 1)
+
+
+def test_writes_invalidate_versioned_keys():
+    memo = Memo()
+
+    def totals():
+        key = ("crop_totals", current_version(), "admin")
+        return _get(memo, key, crop_rollups.totals())
+
+    before, computed = totals()
+    assert computed == 1 and totals() == (before, 0)
+    farmer = farmer_repo.all()[0]
+    field = {
+        "id": "field-memo",
+        "farmer_id": farmer["id"],
+        "farmer_name": farmer["name"],
+        "crop": "Memo Crop",
+        "area": 2.0,
+        "polygon": [
+            {"lat": 0.0, "lng": 0.0},
+            {"lat": 0.0, "lng": 0.01},
+            {"lat": 0.01, "lng": 0.0},
+        ],
+    }
+    for change in (
+        lambda: field_repo.add(field),
+        lambda: field_repo.update({**field, "crop": "Other Crop"}),
+        lambda: field_repo.remove("field-memo"),
+    ):
+        change()
+        after, computed = totals()
+        assert computed == 1 and totals() == (after, 0)
+    assert after == before
\ No newline at end of file
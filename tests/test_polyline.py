@@ -0,0 +1,40 @@
+import numpy as np
+from app.geo import encode_polyline, quantize
+
+
+def _decode(text: str, decimals: int = 6) -> list[list[float]]:
+    """Decode a polyline to (lng, lat) rows, as assets/keyed_sync.js does."""
+    values = []
+    value = shift = 0
+    for char in text:
+        chunk = ord(char) - 63
+        value |= (chunk & 31) << shift
+        shift += 5
+        if chunk < 32:
+            values.append(~(value >> 1) if value & 1 else value >> 1)
+            value = shift = 0
+    ints = np.cumsum(np.array(values).reshape(-1, 2), axis=0)
+    return (ints[:, ::-1] / 10**decimals).tolist()
+
+
+def test_reference_example():
+    # The example of Google's polyline algorithm documentation.
+    ring = np.array([[-120.2, 38.5], [-120.95, 40.7], [-126.453, 43.252]])
+    assert encode_polyline(ring, decimals=5) == "_p~iF~ps|U_ulLnnqC_mqNvxq`@"
+
+
+def test_round_trip():
+    rng = np.random.default_rng(5)
+    ring = quantize(
+        np.column_stack([rng.uniform(-180, 180, 500), rng.uniform(-90, 90, 500)])
+    )
+    ring[:3] = [[180.0, 90.0], [-180.0, -90.0], [0.0, 0.0]]
+    assert _decode(encode_polyline(ring)) == ring.tolist()
+
+
+def test_empty():
+    assert encode_polyline(np.zeros((0, 2))) == ""
+
+
+def test_quantize():
+    assert quantize([[1.23456789, -0.0000004]]).tolist() == [[1.234568, -0.0]]
\ No newline at end of file
@@ -0,0 +1,42 @@
+import json
+import numpy as np
+import pytest
+from app.store.reference import ReferenceLayer, ReferenceLayerError
+
+SQUARE = [[[0.0, 0.0], [1.0, 0.0], [1.0, 1.0], [0.0, 1.0], [0.0, 0.0]]]
+
+
+def _layer(tmp_path, crs: str | None) -> ReferenceLayer:
+    collection = {
+        "type": "FeatureCollection",
+        "features": [
+            {
+                "type": "Feature",
+                "properties": {},
+                "geometry": {"type": "Polygon", "coordinates": SQUARE},
+            }
+        ],
+    }
+    if crs is not None:
+        collection["crs"] = {"type": "name", "properties": {"name": crs}}
+    path = tmp_path / "protected.geojson"
+    path.write_text(json.dumps(collection))
+    return ReferenceLayer(path)
+
+
+@pytest.mark.parametrize("crs", [None, "urn:ogc:def:crs:OGC:1.3:CRS84", "EPSG:4326"])
+def test_wgs84_layer_indexed(tmp_path, crs):
+    layer = _layer(tmp_path, crs)
+    layer.build()
+    assert len(layer) == 1
+    # A ring over the square's eastern half is half covered.
+    half = np.array([[0.5, 0.0], [1.0, 0.0], [1.0, 1.0], [0.5, 1.0]])
+    (area,) = layer.overlap_areas([half])
+    (whole,) = layer.overlap_areas([half * [2, 1] - [1, 0]])
+    assert whole > 0 and area == pytest.approx(whole / 2)
+
+
+@pytest.mark.parametrize("crs", ["EPSG:3857", "urn:ogc:def:crs:EPSG::32633"])
+def test_projected_layer_refused(tmp_path, crs):
+    with pytest.raises(ReferenceLayerError, match="WGS 84"):
+        _layer(tmp_path, crs).build()
\ No newline at end of file
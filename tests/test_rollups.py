@@ -0,0 +1,69 @@
+from app.store import CropRollups, Repository
+
+
+def _setup() -> tuple[Repository, Repository, CropRollups]:
+    farmers = Repository(
+        [
+            {"id": "farmer-a", "cooperative_id": "coop-1"},
+            {"id": "farmer-b", "cooperative_id": "coop-2"},
+        ]
+    )
+    fields = Repository(
+        [
+            {"id": "field-1", "farmer_id": "farmer-a", "crop": "Cocoa", "area": 1.5},
+            {"id": "field-2", "farmer_id": "farmer-a", "crop": "Coffee", "area": 2.0},
+            {"id": "field-3", "farmer_id": "farmer-b", "crop": "Cocoa", "area": 4.25},
+        ]
+    )
+    return farmers, fields, CropRollups(farmers, fields)
+
+
+def _totals(rollups: CropRollups, cooperative_ids=None) -> dict:
+    return {
+        t["crop"]: (t["fields"], t["area"]) for t in rollups.totals(cooperative_ids)
+    }
+
+
+def test_totals():
+    _, _, rollups = _setup()
+    assert rollups.totals() == [
+        {"crop": "Cocoa", "fields": 2, "area": 5.75},
+        {"crop": "Coffee", "fields": 1, "area": 2.0},
+    ]
+    assert _totals(rollups, ["coop-1"]) == {"Cocoa": (1, 1.5), "Coffee": (1, 2.0)}
+    assert _totals(rollups, ["coop-2", "coop-2"]) == {"Cocoa": (1, 4.25)}
+    assert rollups.totals([]) == []
+
+
+def test_crop_changes_and_removals():
+    _, fields, rollups = _setup()
+    fields.update(
+        {"id": "field-1", "farmer_id": "farmer-a", "crop": "Tea", "area": 3.0}
+    )
+    assert _totals(rollups, ["coop-1"]) == {"Tea": (1, 3.0), "Coffee": (1, 2.0)}
+    fields.remove("field-2")
+    fields.add({"id": "field-4", "farmer_id": "farmer-b", "crop": "Tea", "area": 0.1})
+    assert _totals(rollups) == {"Tea": (2, 3.1), "Cocoa": (1, 4.25)}
+    # An emptied crop is dropped rather than left at zero.
+    assert "Coffee" not in _totals(rollups, ["coop-1"])
+
+
+def test_farmer_moves():
+    farmers, _, rollups = _setup()
+    farmers.update({"id": "farmer-a", "cooperative_id": "coop-2"})
+    assert rollups.totals(["coop-1"]) == []
+    assert _totals(rollups, ["coop-2"]) == {"Cocoa": (2, 5.75), "Coffee": (1, 2.0)}
+    assert _totals(rollups) == {"Cocoa": (2, 5.75), "Coffee": (1, 2.0)}
+    farmers.remove("farmer-b")
+    assert _totals(rollups, ["coop-2"]) == {"Cocoa": (1, 1.5), "Coffee": (1, 2.0)}
+
+
+def test_many_small_changes_leave_no_drift():
+    _, fields, rollups = _setup()
+    for k in range(1000):
+        area = 0.1 * (k % 7)
+        fields.add(
+            {"id": "field-x", "farmer_id": "farmer-a", "crop": "Tea", "area": area}
+        )
+        fields.remove("field-x")
+    assert _totals(rollups) == {"Cocoa": (2, 5.75), "Coffee": (1, 2.0)}
\ No newline at end of file
@@ -0,0 +1,108 @@
+import pytest
+from app.store import Repository, SearchIndex, VisibilityIndex, normalize
+
+COOPERATIVES = [
+    {"id": "coop-kivu", "name": "COOPEC-Kivu Coffee"},
+    {"id": "coop-equateur", "name": "Équateur Cacao"},
+]
+FARMERS = [
+    {"id": "farmer-amani", "name": "Amani Dufatanye", "cooperative_id": "coop-kivu"},
+    {
+        "id": "farmer-esperance",
+        "name": "Espérance Bofunda",
+        "cooperative_id": "coop-equateur",
+    },
+]
+FIELDS = [
+    {
+        "id": "field-1",
+        "farmer_id": "farmer-amani",
+        "farmer_name": "Amani Dufatanye",
+        "crop": "Arabica Coffee",
+    },
+    {
+        "id": "field-2",
+        "farmer_id": "farmer-amani",
+        "farmer_name": "Amani Dufatanye",
+        "crop": "Cocoa",
+    },
+    {
+        "id": "field-3",
+        "farmer_id": "farmer-esperance",
+        "farmer_name": "Espérance Bofunda",
+        "crop": "Cocoa",
+    },
+]
+
+
+@pytest.fixture
+def index() -> SearchIndex:
+    cooperatives, farmers = Repository(COOPERATIVES), Repository(FARMERS)
+    fields = Repository()
+    visibility = VisibilityIndex(farmers, fields)
+    search = SearchIndex(fields, farmers, cooperatives, visibility)
+    fields.extend(FIELDS)
+    return search
+
+
+def test_normalize():
+    assert normalize("Équateur") == "equateur"
+    assert normalize("COOPEC") == "coopec"
+
+
+def test_exact_and_prefix(index):
+    assert index.search("cocoa") == ["field-2", "field-3"]
+    assert index.search("dufat") == ["field-1", "field-2"]
+    # Exact matches rank before prefix matches.
+    assert index.search("coffee") == ["field-1", "field-2"]
+    assert index.search("co") == ["field-1", "field-2", "field-3"]
+
+
+def test_one_letter_matches_whole_tokens_only(index):
+    assert index.search("c") == []
+    assert index.search("3") == ["field-3"]
+
+
+def test_accents(index):
+    assert index.search("esperance") == ["field-3"]
+    assert index.search("ÉQUATEUR") == ["field-3"]
+    assert index.search("Espérance") == index.search("ESPERANCE")
+
+
+def test_substring(index):
+    assert index.search("fatanye") == ["field-1", "field-2"]
+
+
+def test_typos(index):
+    assert index.search("amni") == ["field-1", "field-2"]
+    assert index.search("bofonda") == ["field-3"]
+    assert index.search("cacoa") == ["field-2", "field-3"]
+    assert index.search("xyzzy") == []
+
+
+def test_every_term_must_match(index):
+    assert index.search("cocoa kivu") == ["field-2"]
+    assert index.search("cocoa amani equateur") == []
+    assert index.search("amani cof") == ["field-1", "field-2"]
+
+
+def test_limit_and_within(index):
+    assert len(index.search("co", limit=2)) == 2
+    assert index.search("cocoa", within=[{"field-3"}]) == ["field-3"]
+
+
+def test_follows_changes():
+    cooperatives, farmers = Repository(COOPERATIVES), Repository(FARMERS)
+    fields = Repository(FIELDS)
+    visibility = VisibilityIndex(farmers, fields)
+    index = SearchIndex(fields, farmers, cooperatives, visibility)
+    farmers.update({**FARMERS[0], "cooperative_id": "coop-equateur"})
+    assert index.search("amani kivu") == []
+    assert index.search("amani equateur") == ["field-1", "field-2"]
+    cooperatives.update({"id": "coop-equateur", "name": "Tshopo Cacao"})
+    assert index.search("equateur") == []
+    assert index.search("tshopo") == ["field-1", "field-2", "field-3"]
+    fields.update({**FIELDS[0], "crop": "Tea"})
+    assert index.search("arabica") == [] and index.search("tea") == ["field-1"]
+    fields.remove("field-3")
+    assert index.search("bofunda") == []
\ No newline at end of file
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+from app.geo import PackedRTree, STRtree
+
+
+def _boxes(count: int, seed: int = 1) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    corner = rng.uniform(-10, 10, (count, 2))
+    size = rng.uniform(0, 1, (count, 2))
+    return np.column_stack([corner, corner + size])
+
+
+def _brute_force(boxes: np.ndarray, box) -> list[int]:
+    return np.flatnonzero(
+        (boxes[:, 0] <= box[2])
+        & (box[0] <= boxes[:, 2])
+        & (boxes[:, 1] <= box[3])
+        & (box[1] <= boxes[:, 3])
+    ).tolist()
+
+
+# Larger than the indexed boxes, so that most queries meet several.
+QUERIES = _boxes(50, seed=2) + [0, 0, 2, 2]
+
+
+@pytest.mark.parametrize("count", [0, 1, 16, 17, 300])
+def test_str_tree_matches_brute_force(count):
+    boxes = _boxes(count)
+    tree = STRtree([(tuple(b), i) for i, b in enumerate(boxes.tolist())])
+    assert len(tree) == count
+    for query in QUERIES.tolist():
+        assert sorted(tree.query(tuple(query))) == _brute_force(boxes, query)
+
+
+@pytest.mark.parametrize("count", [0, 1, 16, 17, 300])
+def test_packed_rtree_matches_brute_force(count):
+    boxes = _boxes(count)
+    tree = PackedRTree.build(boxes)
+    assert len(tree) == count
+    queries, items = tree.query_many(QUERIES)
+    for row, query in enumerate(QUERIES.tolist()):
+        assert sorted(items[queries == row].tolist()) == _brute_force(boxes, query)
+        assert sorted(tree.query(tuple(query)).tolist()) == _brute_force(boxes, query)
+
+
+def test_packed_rtree_from_mapped_arrays(tmp_path):
+    boxes = _boxes(1000)
+    for name, array in PackedRTree.build(boxes, node_capacity=8).arrays().items():
+        np.save(tmp_path / f"{name}.npy", array)
+    mapped = {
+        name: np.load(tmp_path / f"{name}.npy", mmap_mode="r")
+        for name in ("boxes", "levels", "order")
+    }
+    tree = PackedRTree(**mapped, node_capacity=8)
+    for query in QUERIES.tolist():
+        assert sorted(tree.query(tuple(query)).tolist()) == _brute_force(boxes, query)
\ No newline at end of file
@@ -0,0 +1,119 @@
+import random
+from app.store import KeyedSync, Patch
+
+
+class _Copy:
+    """The browser's copy of a list, patched as assets/keyed_sync.js does."""
+
+    def __init__(self):
+        self.version = None
+        self.records: dict[str, dict] = {}
+
+    def apply(self, patch: Patch) -> bool:
+        """Apply a patch, or return False if it asks for a resync."""
+        if patch["version"] == self.version:
+            return True
+        if not patch["reset"] and patch["base"] != self.version:
+            return False
+        records = {} if patch["reset"] else self.records
+        for op in patch["ops"]:
+            if op["op"] == "delete":
+                records.pop(op["id"], None)
+            else:
+                records[op["id"]] = op["record"]
+        if patch["order"]:
+            records = {i: records[i] for i in patch["order"]}
+        self.version = patch["version"]
+        self.records = records
+        return True
+
+
+def _records(*ids, crop="Cocoa") -> list[dict]:
+    return [{"id": i, "crop": crop} for i in ids]
+
+
+def test_first_patch_resets():
+    patch = KeyedSync().patch("client", "fields", _records("a", "b"))
+    assert patch["reset"] and patch["base"] == 0
+    assert [op["id"] for op in patch["ops"]] == ["a", "b"]
+
+
+def test_keyed_ops():
+    sync = KeyedSync()
+    records = _records(*"abcdefgh")
+    first = sync.patch("client", "fields", records)
+    changed = [
+        *records[1:7],
+        {"id": "h", "crop": "Coffee"},
+        *_records("i"),
+    ]
+    patch = sync.patch("client", "fields", changed)
+    assert not patch["reset"] and patch["base"] == first["version"]
+    assert [(op["op"], op["id"]) for op in patch["ops"]] == [
+        ("delete", "a"),
+        ("update", "h"),
+        ("insert", "i"),
+    ]
+    assert patch["order"] is None
+    # Equal records cost nothing, even as new objects.
+    same = sync.patch("client", "fields", [dict(r) for r in changed])
+    assert same["ops"] == [] and same["order"] is None
+
+
+def test_order():
+    sync = KeyedSync()
+    sync.patch("client", "fields", _records(*"abcd"))
+    swapped = sync.patch("client", "fields", _records(*"bacd"))
+    assert swapped["ops"] == [] and swapped["order"] == list("bacd")
+    sync.patch("client", "fields", _records(*"abcd"))
+    unordered = sync.patch("client", "fields", _records(*"bacd"), ordered=False)
+    assert unordered["order"] is None
+
+
+def test_large_change_resets():
+    sync = KeyedSync()
+    sync.patch("client", "fields", _records(*"abcd"))
+    patch = sync.patch("client", "fields", _records(*"abcd", crop="Coffee"))
+    assert patch["reset"] and len(patch["ops"]) == 4
+
+
+def test_streams_are_per_client_and_list():
+    sync = KeyedSync(maxsize=2)
+    sync.patch("one", "fields", _records("a"))
+    sync.patch("one", "map", _records("a"))
+    assert not sync.patch("one", "fields", _records("a"))["reset"]
+    # A third stream evicts the least recently patched one.
+    sync.patch("two", "fields", _records("a"))
+    assert sync.patch("one", "map", _records("a"))["reset"]
+    sync.reset("two", "fields")
+    assert sync.patch("two", "fields", _records("a"))["reset"]
+
+
+def test_copy_follows_random_changes():
+    rng = random.Random(3)
+    sync = KeyedSync()
+    copy = _Copy()
+    records = {f"f{i}": {"id": f"f{i}", "n": 0} for i in range(50)}
+    next_id = 50
+    for step in range(200):
+        for _ in range(rng.randint(0, 8)):
+            action = rng.random()
+            if action < 0.3 and records:
+                del records[rng.choice(list(records))]
+            elif action < 0.6:
+                records[f"f{next_id}"] = {"id": f"f{next_id}", "n": step}
+                next_id += 1
+            elif records:
+                record_id = rng.choice(list(records))
+                records[record_id] = {"id": record_id, "n": step}
+        listed = list(records.values())
+        if rng.random() < 0.2:
+            rng.shuffle(listed)
+        patch = sync.patch("client", "fields", listed)
+        if rng.random() < 0.1:
+            # A lost patch: the next one no longer follows the copy.
+            continue
+        if not copy.apply(patch):
+            sync.reset("client", "fields")
+            assert copy.apply(sync.patch("client", "fields", listed))
+        assert list(copy.records.values()) == listed
\ No newline at end of file
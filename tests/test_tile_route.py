@@ -0,0 +1,55 @@
+import math
+from starlette.testclient import TestClient
+from app.api import api
+from app.api.exports import EXPORT_TICKET
+from app.api.tiles import MVT_MEDIA_TYPE, TILE_TICKET
+from app.store import field_repo, ticket_store, visibility_index
+
+client = TestClient(api)
+
+
+def _tile(ticket: str, path: str = "0/0/0", **headers):
+    return client.get(f"/api/tiles/{path}.mvt?ticket={ticket}", headers=headers)
+
+
+def _tile_path(field: dict, z: int = 12) -> str:
+    lat, lng = math.radians(field["centroid"]["lat"]), field["centroid"]["lng"]
+    x = int((lng + 180) / 360 * 2**z)
+    y = int((1 - math.asinh(math.tan(lat)) / math.pi) / 2 * 2**z)
+    return f"{z}/{x}/{y}"
+
+
+def test_ticket_serves_many_tiles():
+    ticket = ticket_store.issue(TILE_TICKET, {"cooperative_ids": None})
+    for _ in range(3):
+        response = _tile(ticket)
+        assert response.status_code == 200
+        assert response.headers["content-type"] == MVT_MEDIA_TYPE
+        assert response.content
+
+
+def test_only_tile_tickets_accepted():
+    assert client.get("/api/tiles/0/0/0.mvt").status_code == 401
+    assert client.get("/api/tiles/0/0/0.mvt?token=abc").status_code == 401
+    ticket = ticket_store.issue(EXPORT_TICKET, {"cooperative_ids": None})
+    assert _tile(ticket).status_code == 401
+
+
+def test_expired_ticket_refused():
+    ticket = ticket_store.issue(TILE_TICKET, {"cooperative_ids": None}, lifetime=-1.0)
+    assert _tile(ticket).status_code == 401
+
+
+def test_tiles_limited_to_granted_cooperatives():
+    field = field_repo.all()[0]
+    own = visibility_index.cooperative_of(field["farmer_id"])
+    path = _tile_path(field)
+    for cooperative_ids, drawn in ((None, True), ([own], True), ([], False)):
+        ticket = ticket_store.issue(TILE_TICKET, {"cooperative_ids": cooperative_ids})
+        assert (field["id"].encode() in _tile(ticket, path).content) is drawn
+
+
+def test_tile_revalidated_by_etag():
+    ticket = ticket_store.issue(TILE_TICKET, {"cooperative_ids": None})
+    etag = _tile(ticket).headers["etag"]
+    assert _tile(ticket, **{"if-none-match": etag}).status_code == 304
\ No newline at end of file
@@ -0,0 +1,106 @@
+import pytest
+from app.store import Database, EventTable, TimelineStore
+from app.store.timeline import INSORT_LIMIT
+
+STAGES = ["Harvest", "Drying", "Transport"]
+
+
+def _event(field_id: str, day: int, n: int = 0, lot: str | None = None) -> dict:
+    event = {
+        "field_id": field_id,
+        "date": f"2024-03-{day:02d}",
+        "stage": STAGES[day % 3],
+        "description": f"{field_id} {day} {n}",
+    }
+    if lot:
+        event["lot"] = lot
+    return event
+
+
+def _store(path=":memory:", events=()) -> TimelineStore:
+    db = Database(path)
+    return TimelineStore(
+        EventTable(db, "timeline_events", columns=("field_id",)), events
+    )
+
+
+def _days(events: list[dict]) -> list[int]:
+    return [int(e["date"][-2:]) for e in events]
+
+
+@pytest.fixture
+def store() -> TimelineStore:
+    # Added out of order, one by one and in a batch above INSORT_LIMIT.
+    store = _store(events=[_event("field-a", day) for day in (5, 1, 3)])
+    store.add([_event("field-a", day) for day in (4, 2)])
+    store.add([_event("field-b", day % 28 + 1, day) for day in range(INSORT_LIMIT + 8)])
+    return store
+
+
+def test_pages(store):
+    assert _days(store.timeline("field-a")) == [5, 4, 3, 2, 1]
+    assert _days(store.timeline("field-a", oldest_first=True)) == [1, 2, 3, 4, 5]
+    assert _days(store.timeline("field-a", offset=1, limit=2)) == [4, 3]
+    assert _days(store.timeline("field-a", offset=1, limit=2, oldest_first=True)) == [
+        2,
+        3,
+    ]
+    assert store.timeline("field-a", offset=5) == []
+    assert store.timeline("field-a", offset=9, oldest_first=True) == []
+    assert store.timeline("field-c") == []
+
+
+def test_pages_cover_every_event_once(store):
+    for oldest_first in (False, True):
+        pages = [
+            store.timeline("field-b", offset=offset, limit=7, oldest_first=oldest_first)
+            for offset in range(0, 42, 7)
+        ]
+        events = [e for page in pages for e in page]
+        assert len(events) == store.count("field-b") == INSORT_LIMIT + 8
+        assert len({e["description"] for e in events}) == len(events)
+        days = _days(events)
+        assert days == sorted(days, reverse=not oldest_first)
+
+
+def test_date_ranges(store):
+    assert _days(store.timeline("field-a", start="2024-03-02", end="2024-03-04")) == [
+        4,
+        3,
+        2,
+    ]
+    assert _days(store.timeline("field-a", end="2024-03-02", limit=1)) == [2]
+    assert store.count("field-a", start="2024-03-04") == 2
+    # An event with a time on the end date is included.
+    store.add([{**_event("field-a", 6), "date": "2024-03-06T17:30:00"}])
+    assert len(store.timeline("field-a", start="2024-03-06", end="2024-03-06")) == 1
+
+
+def test_same_date_keeps_arrival_order():
+    store = _store()
+    store.add([_event("field-a", 1, n) for n in range(3)])
+    store.add([_event("field-a", 1, 3)])
+    descriptions = [
+        e["description"] for e in store.timeline("field-a", oldest_first=True)
+    ]
+    assert descriptions == [f"field-a 1 {n}" for n in range(4)]
+
+
+def test_lots_dates_and_stages(store):
+    store.add([_event("field-a", 7, lot="lot-1"), _event("field-b", 6, lot="lot-1")])
+    assert _days(store.lot("lot-1")) == [7, 6]
+    assert _days(store.between("2024-03-05", "2024-03-05")) == [5, 5, 5]
+    assert len(store.between()) == len(store) == 5 + INSORT_LIMIT + 8 + 2
+    assert store.stages("field-a") == set(STAGES)
+    assert [e["field_id"] for e in store.for_fields(["field-b", "field-a"])][-1] == (
+        "field-a"
+    )
+
+
+def test_reload(tmp_path):
+    path = tmp_path / "agritrace.db"
+    store = _store(path, [_event("field-a", day) for day in (2, 1)])
+    store.add([_event("field-a", 3)])
+    reloaded = _store(path, [_event("field-z", 9)])
+    assert reloaded.timeline("field-a") == store.timeline("field-a")
+    assert reloaded.timeline("field-z") == []
\ No newline at end of file
@@ -0,0 +1,109 @@
+import numpy as np
+from app.geo import RING_ISSUES, pack_rings, validate_rings
+from app.geo.validity import self_intersecting
+from app.store import field_repo, polygon_store
+
+SQUARE = np.array([[0.0, 0.0], [1.0, 0.0], [1.0, 1.0], [0.0, 1.0]])
+
+
+def _errors(ring, **options) -> list[str]:
+    return validate_rings([np.asarray(ring, dtype=float)], **options)[0]["errors"]
+
+
+def test_valid_ring():
+    (check,) = validate_rings([SQUARE])
+    assert check["errors"] == [] and check["repaired"] == []
+    assert check["ring"].tolist() == SQUARE.tolist()
+
+
+def test_issues():
+    assert _errors([[0, 0], [3, 0], [0, 2], [1, 3]]) == [
+        RING_ISSUES["self_intersection"]
+    ]
+    # A figure of eight whose loops touch at one vertex.
+    touching = [[0, 0], [2, 0], [1, 1], [2, 2], [0, 2], [1, 1]]
+    assert _errors(touching) == [RING_ISSUES["self_intersection"]]
+    assert _errors(SQUARE[::-1]) == [RING_ISSUES["clockwise"]]
+    assert _errors(SQUARE, closed=True) == [RING_ISSUES["unclosed"]]
+    assert _errors([[0, 0], [1, 0], [1, 0], [1, 1], [0, 1]]) == [
+        RING_ISSUES["duplicate_vertices"]
+    ]
+    assert _errors([[0, 0], [1, 0], [1, 0]]) == [
+        RING_ISSUES["duplicate_vertices"],
+        RING_ISSUES["too_few_vertices"],
+    ]
+    assert _errors([[0, 0], [1, 0], [2, 0]]) == [RING_ISSUES["degenerate"]]
+
+
+def test_repair():
+    ring = [[0, 1], [1, 1], [1, 1], [1, 0], [0, 0], [0, 1]]
+    (check,) = validate_rings([np.array(ring, dtype=float)], closed=True, repair=True)
+    assert check["errors"] == []
+    assert check["repaired"] == [
+        RING_ISSUES["duplicate_vertices"],
+        RING_ISSUES["clockwise"],
+    ]
+    assert check["ring"].tolist() == [[0, 0], [1, 0], [1, 1], [0, 1]]
+
+
+def test_orient():
+    (check,) = validate_rings([SQUARE[::-1]], orient=True)
+    assert check["errors"] == [] and check["repaired"] == []
+    assert check["ring"].tolist() == SQUARE.tolist()
+    # Orienting does not hide real defects.
+    assert _errors([[0, 0], [1, 0], [2, 0]], orient=True) == [RING_ISSUES["degenerate"]]
+
+
+def test_seed_fields_pass_as_drawn():
+    rings = [polygon_store.ring(f["id"]) for f in field_repo.all()]
+    assert any(check["errors"] for check in validate_rings(rings))
+    assert not any(check["errors"] for check in validate_rings(rings, orient=True))
+
+
+def _orient(a, b, c) -> float:
+    return np.sign((b[0] - a[0]) * (c[1] - a[1]) - (b[1] - a[1]) * (c[0] - a[0]))
+
+
+def _edges_meet(a, b, c, d) -> bool:
+    boxes_meet = all(
+        max(a[k], b[k]) >= min(c[k], d[k]) and max(c[k], d[k]) >= min(a[k], b[k])
+        for k in (0, 1)
+    )
+    return (
+        boxes_meet
+        and _orient(a, b, c) * _orient(a, b, d) <= 0
+        and _orient(c, d, a) * _orient(c, d, b) <= 0
+    )
+
+
+def _brute_force(ring: np.ndarray) -> bool:
+    """Whether any two non-adjacent edges of an unclosed ring meet."""
+    n = len(ring)
+    edges = [(ring[k], ring[(k + 1) % n]) for k in range(n)]
+    return any(
+        _edges_meet(*edges[i], *edges[j])
+        for i in range(n)
+        for j in range(i + 2, n)
+        if not (i == 0 and j == n - 1)
+    )
+
+
+def test_sweep_matches_brute_force():
+    rng = np.random.default_rng(7)
+    rings = []
+    for _ in range(300):
+        n = int(rng.integers(3, 12))
+        if rng.random() < 0.5:
+            # Star-shaped rings, sorted by angle, never cross themselves.
+            angles = np.sort(rng.uniform(0, 2 * np.pi, n))
+            radii = rng.uniform(0.5, 1.0, n)
+            ring = np.column_stack([radii * np.cos(angles), radii * np.sin(angles)])
+        else:
+            ring = rng.integers(0, 6, (n, 2)).astype(float)
+        # Consecutive repeats would be adjacent edges of zero length.
+        ring = ring[np.any(ring != np.roll(ring, 1, axis=0), axis=1)]
+        if len(ring) >= 3:
+            rings.append(ring)
+    flagged = self_intersecting(*pack_rings(rings))
+    assert flagged.tolist() == [_brute_force(ring) for ring in rings]
+    assert 0 < flagged.sum() < len(rings)
\ No newline at end of file
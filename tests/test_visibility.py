@@ -0,0 +1,76 @@
+from app.store import Repository, VisibilityIndex, visible_cooperative_ids
+
+
+def _setup() -> tuple[Repository, Repository, VisibilityIndex]:
+    farmers = Repository(
+        [
+            {"id": "farmer-a", "cooperative_id": "coop-1"},
+            {"id": "farmer-b", "cooperative_id": "coop-2"},
+        ]
+    )
+    fields = Repository(
+        [
+            {"id": "field-1", "farmer_id": "farmer-a"},
+            {"id": "field-2", "farmer_id": "farmer-a"},
+            {"id": "field-3", "farmer_id": "farmer-b"},
+        ]
+    )
+    return farmers, fields, VisibilityIndex(farmers, fields)
+
+
+def _ids(fields: list) -> list[str]:
+    return sorted(f["id"] for f in fields)
+
+
+def test_fields_by_cooperative():
+    _, _, index = _setup()
+    assert _ids(index.fields_for(["coop-1"])) == ["field-1", "field-2"]
+    assert _ids(index.fields_for(["coop-2", "coop-1"])) == [
+        "field-1",
+        "field-2",
+        "field-3",
+    ]
+    assert index.fields_for(["coop-3"]) == []
+    assert index.cooperative_of("farmer-b") == "coop-2"
+    assert sorted(index.farmer_field_ids("farmer-a")) == ["field-1", "field-2"]
+
+
+def test_farmer_moves_with_fields():
+    farmers, _, index = _setup()
+    assert _ids(index.fields_for(["coop-2"])) == ["field-3"]
+    farmers.update({"id": "farmer-a", "cooperative_id": "coop-2"})
+    assert index.fields_for(["coop-1"]) == []
+    assert _ids(index.fields_for(["coop-2"])) == ["field-1", "field-2", "field-3"]
+    farmers.remove("farmer-b")
+    assert _ids(index.fields_for(["coop-2"])) == ["field-1", "field-2"]
+
+
+def test_field_changes():
+    _, fields, index = _setup()
+    assert _ids(index.fields_for(["coop-1"])) == ["field-1", "field-2"]
+    fields.update({"id": "field-2", "farmer_id": "farmer-b"})
+    fields.remove("field-1")
+    fields.add({"id": "field-4", "farmer_id": "farmer-a"})
+    assert _ids(index.fields_for(["coop-1"])) == ["field-4"]
+    assert _ids(index.fields_for(["coop-2"])) == ["field-2", "field-3"]
+    # Cached lists hold the records as they are now.
+    fields.update({"id": "field-4", "farmer_id": "farmer-a", "crop": "Tea"})
+    assert index.fields_for(["coop-1"])[0]["crop"] == "Tea"
+
+
+def test_field_of_farmer_added_later():
+    farmers, fields, index = _setup()
+    fields.add({"id": "field-5", "farmer_id": "farmer-c"})
+    assert "field-5" not in _ids(index.fields_for(["coop-1"]))
+    farmers.add({"id": "farmer-c", "cooperative_id": "coop-1"})
+    assert "field-5" in _ids(index.fields_for(["coop-1"]))
+
+
+def test_visible_cooperative_ids():
+    assert visible_cooperative_ids(None) is None
+    assert visible_cooperative_ids({"role": "admin"}) is None
+    buyer = {"role": "buyer", "partnerships": ["coop-1", "coop-2"]}
+    assert visible_cooperative_ids(buyer) == ["coop-1", "coop-2"]
+    member = {"role": "cooperative", "cooperative_id": "coop-2"}
+    assert visible_cooperative_ids(member) == ["coop-2"]
+    assert visible_cooperative_ids({"role": "guest"}) == []
\ No newline at end of file